@@ -1,50 +1,227 @@
-from fastapi import APIRouter, Path, Query, HTTPException, Depends
-from typing import Dict, List, Optional
+from fastapi import APIRouter, Path, Query, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Literal, Optional, Union
 
-from app.schemas.movie import Movie
-from app.services.movie_service import MovieService
+from app.schemas.movie import Movie, MoviePage
+from app.api.etag import conditional_get
+from app.api.responses import FastJSONResponse
+from app.api.response_cache import cached_response, response_cache
+from app.core.config import settings
+from app.services.movie_service import InvalidBinsError, InvalidCursorError, InvalidWeightError, MovieService
 
-router = APIRouter(tags=["movies"])
+router = APIRouter(tags=["movies"], default_response_class=FastJSONResponse)
 
 def get_movie_service():
-    return MovieService()
+    return MovieService(settings.DATA_DIR)
 
-@router.get("/movies", response_model=Dict[str, Movie])
-def get_all_movies(movie_service: MovieService = Depends(get_movie_service)):
-    """Get all movies in the database."""
-    return movie_service.get_all_movies()
+@router.get("/movies", response_model=Union[MoviePage, Dict[str, Movie]], dependencies=[Depends(conditional_get)])
+def get_all_movies(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of movies per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    sort: Literal["title", "release_date", "vote_average"] = Query("title", description="Sort key"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort direction"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to include in each item"),
+    min_year: Optional[int] = Query(None, description="Earliest release year (inclusive)"),
+    max_year: Optional[int] = Query(None, description="Latest release year (inclusive)"),
+    min_rating: Optional[float] = Query(None, ge=0, le=10, description="Lowest vote average (inclusive)"),
+    max_rating: Optional[float] = Query(None, ge=0, le=10, description="Highest vote average (inclusive)"),
+    min_runtime: Optional[int] = Query(None, ge=0, description="Shortest runtime in minutes (inclusive)"),
+    max_runtime: Optional[int] = Query(None, ge=0, description="Longest runtime in minutes (inclusive)"),
+    genre: Optional[int] = Query(None, description="Only list movies with this genre ID"),
+    legacy: bool = Query(False, description="Return the old unpaginated {id: movie} dict"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """
+    Get a page of movies, or every movie keyed by ID when legacy=true.
+
+    Year, rating, runtime and genre filters narrow the paginated listing;
+    movies missing a filtered field (e.g. no runtime) are left out.
+    """
+    if legacy:
+        return cached_response(request, movie_service.get_all_movies)
+
+    field_list = None
+    if fields:
+        field_list = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = set(field_list) - set(Movie.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    ranges = {
+        "year": (min_year, max_year),
+        "vote_average": (min_rating, max_rating),
+        "runtime": (min_runtime, max_runtime),
+    }
+
+    def build():
+        try:
+            return movie_service.get_movies_page(limit, cursor, sort, order == "desc", field_list, ranges, genre)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return cached_response(request, build)
+
+@router.get("/movies/export")
+def export_movies(movie_service: MovieService = Depends(get_movie_service)):
+    """Stream every stored movie record as NDJSON (one JSON object per line)."""
+    return StreamingResponse(
+        movie_service.export_movies(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="movies.ndjson"'},
+    )
+
+@router.post("/movies/bulk")
+async def import_movies(request: Request, movie_service: MovieService = Depends(get_movie_service)):
+    """
+    Import movies from an NDJSON request body (one movie object per line).
 
-@router.get("/movies/{movie_id}", response_model=Movie)
+    The body is read as it streams in and validated in batches; all new
+    movies are then written in one storage transaction. Existing movies are
+    left untouched. Returns status counts and a result for every line.
+    """
+    importer = movie_service.start_import()
+    batch: List[bytes] = []
+    remainder = b""
+    async for chunk in request.stream():
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        batch.extend(lines)
+        if len(batch) >= settings.BULK_BATCH_SIZE:
+            await run_in_threadpool(importer.add_lines, batch)
+            batch = []
+    if remainder:
+        batch.append(remainder)
+    if batch:
+        await run_in_threadpool(importer.add_lines, batch)
+
+    return await run_in_threadpool(importer.commit)
+
+@router.get("/movies/{movie_id}", response_model=Movie, dependencies=[Depends(conditional_get)])
 def get_movie(
+    request: Request,
     movie_id: int = Path(..., description="The ID of the movie to retrieve"),
     movie_service: MovieService = Depends(get_movie_service)
 ):
     """Get a specific movie by ID."""
-    movie = movie_service.get_movie(movie_id)
-    if not movie:
-        raise HTTPException(status_code=404, detail=f"Movie with ID {movie_id} not found")
-    return movie
-
-@router.get("/random", response_model=Movie)
-def get_random_movie(movie_service: MovieService = Depends(get_movie_service)):
-    """Get a random movie."""
-    movie = movie_service.get_random_movie()
-    if not movie:
+    def build():
+        movie = movie_service.get_movie(movie_id)
+        if not movie:
+            raise HTTPException(status_code=404, detail=f"Movie with ID {movie_id} not found")
+        return movie
+
+    return cached_response(request, build)
+
+@router.get("/movies/{movie_id}/similar", response_model=List[Movie], dependencies=[Depends(conditional_get)])
+def get_similar_movies(
+    request: Request,
+    movie_id: int = Path(..., description="The ID of the movie to find similar movies for"),
+    k: int = Query(10, ge=1, le=50, description="Number of similar movies"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """Get the movies most like this one by genre, release year, rating and popularity."""
+    def build():
+        movies = movie_service.get_similar_movies(movie_id, k)
+        if movies is None:
+            raise HTTPException(status_code=404, detail=f"Movie with ID {movie_id} not found")
+        return movies
+
+    return cached_response(request, build)
+
+@router.get("/random", response_model=Union[Movie, List[Movie]])
+def get_random_movie(
+    n: Optional[int] = Query(None, ge=1, le=100, description="Return a list of this many distinct movies"),
+    exclude: Optional[str] = Query(None, description="Comma-separated movie IDs to skip"),
+    genre: Optional[int] = Query(None, description="Only pick movies with this genre ID"),
+    weight: Optional[str] = Query(
+        None, description="Weighted picks, e.g. popularity or vote_average:1,members:2 (popularity, vote_average, members)"
+    ),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """Get a random movie, or n distinct random movies when n is given."""
+    try:
+        exclude_ids = [int(movie_id) for movie_id in exclude.split(",") if movie_id.strip()] if exclude else []
+    except ValueError:
+        raise HTTPException(status_code=400, detail="exclude must be a comma-separated list of integers")
+
+    try:
+        weights = movie_service.parse_weights(weight) if weight else None
+    except InvalidWeightError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    movies = movie_service.get_random_movies(n or 1, exclude_ids, genre, weights)
+    if n is not None:
+        return movies
+    if not movies:
         raise HTTPException(status_code=404, detail="No movies found in database")
-    return movie
+    return movies[0]
 
-@router.get("/genres", response_model=List[Dict])
-def get_all_genres(movie_service: MovieService = Depends(get_movie_service)):
+@router.get("/search", response_model=List[Movie], dependencies=[Depends(conditional_get)])
+def search_movies(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Words to look for in titles and overviews; the last may be a prefix"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """Search movies by title, original title and overview, best match first."""
+    return cached_response(request, lambda: movie_service.search_movies(q, limit))
+
+@router.get("/stats", response_model=Dict, dependencies=[Depends(conditional_get)])
+def get_stats(
+    request: Request,
+    rating_bins: Optional[str] = Query(None, description="Comma-separated lower bounds of the rating histogram bins"),
+    runtime_bins: Optional[str] = Query(None, description="Comma-separated lower bounds of the runtime histogram bins"),
+    top: int = Query(10, ge=1, le=100, description="Number of top contributors"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """Get counts per genre, decade and user, rating/runtime histograms and totals."""
+    try:
+        rating_bounds = movie_service.parse_bins(rating_bins) if rating_bins else None
+        runtime_bounds = movie_service.parse_bins(runtime_bins) if runtime_bins else None
+    except InvalidBinsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return cached_response(request, lambda: movie_service.get_stats(rating_bounds, runtime_bounds, top))
+
+@router.get("/changes", response_model=Dict, dependencies=[Depends(conditional_get)])
+def get_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="A version from a previous response; omit to get the current version"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """
+    Get the movies and movie users added or changed after a version.
+
+    When `reset` is true the version is too old (or unknown) and the
+    client should reload everything, then continue from `version`.
+    """
+    return cached_response(request, lambda: movie_service.get_changes(since))
+
+@router.get("/genres", response_model=List[Dict], dependencies=[Depends(conditional_get)])
+def get_all_genres(request: Request, movie_service: MovieService = Depends(get_movie_service)):
     """Get all available genres with counts."""
-    return movie_service.get_all_genres()
+    return cached_response(request, movie_service.get_all_genres)
+
+@router.get("/genres/check")
+def check_genre_index(movie_service: MovieService = Depends(get_movie_service)):
+    """Rebuild the genre index from disk and report any drift from the live index."""
+    differences = movie_service.check_genre_index()
+    return {"consistent": not differences, "differences": differences}
+
+@router.get("/cache/stats")
+def get_response_cache_stats():
+    """Report hit/miss counters for the encoded response cache."""
+    return response_cache.stats()
 
-@router.get("/movies/genre/{genre_id}", response_model=List[Movie])
+@router.get("/movies/genre/{genre_id}", response_model=List[Movie], dependencies=[Depends(conditional_get)])
 def get_movies_by_genre(
+    request: Request,
     genre_id: int = Path(..., description="The ID of the genre to filter by"),
     movie_service: MovieService = Depends(get_movie_service)
 ):
     """Get movies filtered by genre."""
-    return movie_service.get_movies_by_genre(genre_id)
+    return cached_response(request, lambda: movie_service.get_movies_by_genre(genre_id))
 
 @router.post("/movies", response_model=Movie)
 def add_movie(
@@ -1,20 +1,42 @@
-from fastapi import APIRouter, Path, Query, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, Path, Query, HTTPException, Depends, Request
+from typing import Dict, List, Optional
 
+from app.api.etag import conditional_get
+from app.api.responses import FastJSONResponse
+from app.api.response_cache import cached_response
+from app.core.config import settings
+from app.schemas.movie import Movie
 from app.services.movie_service import MovieService
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], default_response_class=FastJSONResponse)
 
 def get_movie_service():
-    return MovieService()
+    return MovieService(settings.DATA_DIR)
 
-@router.get("/movies/{movie_id}/users", response_model=List[str])
+@router.get("/movies/users", response_model=Dict[str, List[str]], dependencies=[Depends(conditional_get)])
+def get_users_for_movies(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated movie IDs; omit for every movie"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """Get the users who added each of many movies in one request."""
+    if ids is None:
+        return cached_response(request, movie_service.get_users_for_movies)
+    
+    try:
+        movie_ids = [int(movie_id) for movie_id in ids.split(",") if movie_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    return cached_response(request, lambda: movie_service.get_users_for_movies(movie_ids))
+
+@router.get("/movies/{movie_id}/users", response_model=List[str], dependencies=[Depends(conditional_get)])
 def get_movie_users(
+    request: Request,
     movie_id: int = Path(..., description="The ID of the movie"),
     movie_service: MovieService = Depends(get_movie_service)
 ):
     """Get users who have added this movie."""
-    return movie_service.get_movie_users(movie_id)
+    return cached_response(request, lambda: movie_service.get_movie_users(movie_id))
 
 @router.post("/movies/{movie_id}/users")
 def add_user_to_movie(
@@ -27,3 +49,17 @@ def add_user_to_movie(
     if not success:
         raise HTTPException(status_code=400, detail="Failed to add user to movie")
     return {"status": "success"}
+
+@router.get("/users", response_model=Dict[str, int], dependencies=[Depends(conditional_get)])
+def get_user_counts(request: Request, movie_service: MovieService = Depends(get_movie_service)):
+    """Get the number of movies each user added."""
+    return cached_response(request, movie_service.get_user_counts)
+
+@router.get("/users/{user_id}/movies", response_model=List[Movie], dependencies=[Depends(conditional_get)])
+def get_user_movies(
+    request: Request,
+    user_id: str = Path(..., description="The Slack user ID"),
+    movie_service: MovieService = Depends(get_movie_service)
+):
+    """Get the movies a user added, sorted by title."""
+    return cached_response(request, lambda: movie_service.get_user_movies(user_id))
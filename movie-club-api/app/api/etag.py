@@ -0,0 +1,52 @@
+import hashlib
+
+from fastapi import HTTPException, Request, Response
+
+from app.api.compression import negotiate_encoding
+from app.core.config import settings
+from app.services.movie_service import MovieService
+
+def make_etag(request: Request, version: str) -> str:
+    """
+    Build a strong ETag from the catalog version, the exact path and query
+    and the negotiated content encoding.
+
+    Every read endpoint derives its body from the catalog, so the body can
+    only change when the version does; hashing the URL keeps different pages
+    and filters of the same version apart, and the encoding keeps gzip and
+    zstd representations apart.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    url = f"{request.url.path}?{request.url.query} {encoding}"
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+    return f'"{version}-{digest}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header (a list of tags or "*") against an ETag."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        # If-None-Match uses weak comparison
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+def conditional_get(request: Request, response: Response) -> None:
+    """
+    Dependency for read endpoints: answer 304 Not Modified before any work is
+    done when the client already has the current version, otherwise attach
+    the ETag to the response.
+
+    The version and ETag are kept on request.state for cached_response.
+    """
+    version = MovieService(settings.DATA_DIR).get_catalog_version()
+    etag = make_etag(request, version)
+    request.state.catalog_version = version
+    request.state.etag = etag
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
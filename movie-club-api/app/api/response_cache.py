@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.api.compression import compress, negotiate_encoding, should_compress
+from app.api.responses import dumps
+from app.core.config import settings
+
+class ResponseCache:
+    """
+    Encoded response bodies for read endpoints, keyed by path, query and
+    content encoding.
+
+    Every entry belongs to a single catalog version; the first lookup with a
+    newer version drops the whole cache, so a write invalidates everything
+    without tracking which routes it affected. Entries are evicted LRU past
+    `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[str] = None
+        # key -> (body, Content-Encoding or None)
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: str, version: str, body: Tuple[bytes, Optional[str]]) -> None:
+        with self._lock:
+            # Don't store a body built from a version that is already stale
+            if version != self._version:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+
+def cached_response(request: Request, build: Callable[[], Any]) -> Response:
+    """
+    Return the cached body for this request, or call `build` and cache its
+    JSON encoding, compressed when the client accepts it and the body is
+    large enough.
+
+    Must run after conditional_get, which records the catalog version and
+    ETag on request.state. Bodies are returned as a raw Response, so
+    FastAPI's response_model validation and encoding are skipped; `build`
+    must already return data shaped like the route's response_model.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    url = request.url.path + "?" + request.url.query
+    key = f"{url} {encoding}"
+    version = request.state.catalog_version
+
+    cached = response_cache.get(key, version)
+    if cached is None:
+        body = dumps(build())
+        if encoding and should_compress(body):
+            cached = (compress(body, encoding), encoding)
+        else:
+            cached = (body, None)
+        response_cache.put(key, version, cached)
+
+    body, content_encoding = cached
+    headers = {"ETag": request.state.etag, "Vary": "Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type="application/json", headers=headers)
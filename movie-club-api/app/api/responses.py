@@ -0,0 +1,33 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; see the "fast" extra in pyproject.toml
+    orjson = None
+
+# pydantic-core serializes models, dicts and lists straight to JSON bytes
+_adapter = TypeAdapter(Any)
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode a response body as compact UTF-8 JSON.
+
+    orjson is used for plain data when installed; pydantic models (and
+    everything when orjson is missing) go through pydantic-core, which
+    serializes them without building intermediate dicts.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return _adapter.dump_json(content)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with dumps() instead of json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
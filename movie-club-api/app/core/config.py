@@ -7,6 +7,25 @@ class Settings(BaseSettings):
     API_DESCRIPTION: str = "API for the Movie Club application"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
     DATA_DIR: str = os.getenv("DATA_DIR", "data")
+    # Seconds between full per-file mtime scans of the movie catalog
+    CATALOG_REFRESH_INTERVAL: float = float(os.getenv("CATALOG_REFRESH_INTERVAL", "30"))
+    # Catalog changes kept for /api/changes; older clients must resync fully
+    CHANGE_LOG_SIZE: int = int(os.getenv("CHANGE_LOG_SIZE", "10000"))
+    # Background folding of movie_users.journal into movie_users.json
+    MOVIE_USERS_COMPACT_INTERVAL: float = float(os.getenv("MOVIE_USERS_COMPACT_INTERVAL", "60"))
+    MOVIE_USERS_COMPACT_BYTES: int = int(os.getenv("MOVIE_USERS_COMPACT_BYTES", "65536"))
+    # "json" (one file per movie in DATA_DIR) or "sqlite"
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "json")
+    # Defaults to DATA_DIR/movie_club.db when empty
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "")
+    # NDJSON records validated per batch by POST /api/movies/bulk
+    BULK_BATCH_SIZE: int = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+    # Encoded response bodies kept for the current catalog version
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    ZSTD_LEVEL: int = int(os.getenv("ZSTD_LEVEL", "3"))
     
     model_config = {
         "env_file": ".env"
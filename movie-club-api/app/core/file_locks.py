@@ -0,0 +1,54 @@
+import os
+import json
+import fcntl
+import tempfile
+from contextlib import contextmanager
+from typing import Any
+
+@contextmanager
+def file_lock(lock_path: str, shared: bool = False):
+    """
+    Hold an advisory flock on `lock_path` for the duration of the block.
+
+    The API and the bot mount the same data directory, so every writer of a
+    shared file takes the same lock file before touching it.
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+def fsync_dir(directory: str) -> None:
+    """Persist directory entries (e.g. a rename) to disk."""
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs) -> None:
+    """
+    Write JSON to `path` via a temp file in the same directory plus rename.
+
+    Readers see either the old or the new file, never a truncated one, and a
+    crash mid-write leaves the old file in place.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_dir(directory)
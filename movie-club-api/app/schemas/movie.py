@@ -27,3 +27,9 @@ class Movie(BaseModel):
                 "vote_average": 8.4
             }
         }
+
+class MoviePage(BaseModel):
+    """One page of a cursor-paginated movie listing."""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    total: int
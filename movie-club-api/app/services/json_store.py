@@ -0,0 +1,201 @@
+import os
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.file_locks import atomic_write_json, fsync_dir
+from app.schemas.movie import Movie
+from app.services.movie_users_journal import MovieUsersJournal
+from app.services.storage import MovieStore
+
+# Files in the data directory that are not movie records
+NON_MOVIE_FILES = {"popular_movies.json", "movie_users.json"}
+
+class JsonMovieStore(MovieStore):
+    """
+    Stores each movie as data/<id>.json and movie users in movie_users.json
+    plus its append-only journal (see MovieUsersJournal).
+
+    Changes made by other processes are detected by mtime: the directory
+    mtime changes whenever a file is created or removed, and a full per-file
+    stat scan catches in-place rewrites of existing files.
+    """
+
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self.movie_users = MovieUsersJournal(data_dir)
+        # filename -> (mtime, movie ID loaded from it)
+        self._files: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._dir_mtime: Optional[float] = None
+
+    def load(self) -> Dict[str, Movie]:
+        self._files = {}
+        movies, _ = self.scan()
+        return movies
+
+    def has_changes(self) -> bool:
+        try:
+            return os.stat(self.data_dir).st_mtime != self._dir_mtime
+        except FileNotFoundError:
+            return False
+
+    def scan(self) -> Tuple[Dict[str, Movie], List[str]]:
+        """Stat every movie file and (re)load the ones whose mtime changed."""
+        changed = {}
+        removed = []
+
+        if not os.path.exists(self.data_dir):
+            return changed, removed
+
+        self._dir_mtime = os.stat(self.data_dir).st_mtime
+        seen = set()
+
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                filename = entry.name
+                if not self._is_movie_file(filename):
+                    continue
+
+                seen.add(filename)
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+
+                known = self._files.get(filename)
+                if known and known[0] == mtime:
+                    continue
+
+                movie = self._load_file(filename)
+                movie_id = str(movie.id) if movie else None
+                if known and known[1] and known[1] != movie_id:
+                    removed.append(known[1])
+                if movie:
+                    changed[movie_id] = movie
+                self._files[filename] = (mtime, movie_id)
+
+        # Drop movies whose files disappeared
+        for filename in list(self._files):
+            if filename not in seen:
+                _, movie_id = self._files.pop(filename)
+                if movie_id:
+                    removed.append(movie_id)
+
+        return changed, removed
+
+    def genre_index(self) -> Dict[int, Set[str]]:
+        index = {}
+        for movie in self._read_all():
+            for genre in movie.genres:
+                if genre.get("id") is not None:
+                    index.setdefault(genre["id"], set()).add(str(movie.id))
+        return index
+
+    def movie_exists(self, movie_id) -> bool:
+        return os.path.exists(self._movie_file(movie_id))
+
+    def save_movie(self, movie_data: Dict) -> None:
+        filename = f"{movie_data['id']}.json"
+        # Temp file plus rename, so scans never see a half-written movie
+        atomic_write_json(os.path.join(self.data_dir, filename), movie_data, indent=4)
+
+        # Remember our own write so the next scan doesn't reload it
+        mtime = os.stat(os.path.join(self.data_dir, filename)).st_mtime
+        self._files[filename] = (mtime, str(movie_data["id"]))
+
+    def save_movies(self, movies_data: Iterable[Dict]) -> None:
+        """
+        Write many movie files with one directory sync instead of one per file.
+
+        Every movie goes to a temp file, fsynced on its own; once all are
+        durable they are renamed into place and the directory is synced
+        once. Each file is still replaced atomically, but unlike SQLite a
+        crash during the renames can leave only some of the batch visible.
+        """
+        written = []
+        try:
+            for movie_data in movies_data:
+                filename = f"{movie_data['id']}.json"
+                tmp_path = os.path.join(self.data_dir, f".{filename}.bulk.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(movie_data, f, ensure_ascii=False, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                written.append((tmp_path, filename, str(movie_data["id"])))
+            for tmp_path, filename, movie_id in written:
+                path = os.path.join(self.data_dir, filename)
+                os.replace(tmp_path, path)
+                # Remember our own writes so the next scan doesn't reload them
+                self._files[filename] = (os.stat(path).st_mtime, movie_id)
+        finally:
+            for tmp_path, _, _ in written:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        fsync_dir(self.data_dir)
+
+    def get_movie_users(self, movie_id) -> List[str]:
+        return self.movie_users.get_movie_users(movie_id)
+
+    def add_user_to_movie(self, movie_id, user_id: str) -> bool:
+        return self.movie_users.add(movie_id, user_id)
+
+    def get_users_for_movies(self, movie_ids: List[int]) -> Dict[str, List[str]]:
+        return self.movie_users.get_many(movie_ids)
+
+    def get_all_movie_users(self) -> Dict[str, List[str]]:
+        return self.movie_users.get_all()
+
+    def poll_movie_users(self) -> List[Tuple[str, str]]:
+        self.movie_users.refresh()
+        return self.movie_users.drain_added()
+
+    def start_maintenance(self) -> None:
+        self.movie_users.start_compactor(
+            settings.MOVIE_USERS_COMPACT_INTERVAL, settings.MOVIE_USERS_COMPACT_BYTES
+        )
+
+    def stop_maintenance(self) -> None:
+        self.movie_users.stop_compactor()
+
+    def iter_movie_data(self) -> Iterator[Dict]:
+        """Yield the raw JSON of every movie file without touching change tracking."""
+        if not os.path.exists(self.data_dir):
+            return
+
+        for filename in sorted(os.listdir(self.data_dir)):
+            if not self._is_movie_file(filename):
+                continue
+            try:
+                with open(os.path.join(self.data_dir, filename), "r", encoding="utf-8") as f:
+                    movie_data = json.load(f)
+            except Exception as e:
+                print(f"Error loading movie data from {filename}: {e}")
+                continue
+            # Skip non-movie data files
+            if "title" in movie_data and "id" in movie_data:
+                yield movie_data
+
+    def _read_all(self) -> Iterator[Movie]:
+        for movie_data in self.iter_movie_data():
+            try:
+                yield Movie(**movie_data)
+            except Exception as e:
+                print(f"Error parsing movie {movie_data.get('id')}: {e}")
+
+    def _movie_file(self, movie_id) -> str:
+        return os.path.join(self.data_dir, f"{movie_id}.json")
+
+    def _is_movie_file(self, filename: str) -> bool:
+        return filename.endswith(".json") and filename not in NON_MOVIE_FILES
+
+    def _load_file(self, filename: str) -> Optional[Movie]:
+        try:
+            with open(os.path.join(self.data_dir, filename), "r", encoding="utf-8") as f:
+                movie_data = json.load(f)
+                # Skip non-movie data files
+                if "title" in movie_data and "id" in movie_data:
+                    return Movie(**movie_data)
+        except Exception as e:
+            print(f"Error loading movie data from {filename}: {e}")
+        return None
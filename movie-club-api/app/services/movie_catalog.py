@@ -0,0 +1,631 @@
+import bisect
+import heapq
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from app.core.config import settings
+from app.schemas.movie import Movie
+from app.services.sampling import IdArray
+from app.services.search_index import SearchIndex
+from app.services.similarity import SimilarityIndex
+from app.services.storage import MovieStore, create_store
+
+# Sort keys for paginated listings; ties are broken by movie ID
+SORT_KEYS: Dict[str, Callable[[Movie], Any]] = {
+    "title": lambda movie: movie.title.casefold(),
+    "release_date": lambda movie: movie.release_date or "",
+    "vote_average": lambda movie: movie.vote_average,
+}
+
+def _release_year(movie: Movie) -> Optional[int]:
+    year = (movie.release_date or "")[:4]
+    return int(year) if year.isdigit() else None
+
+# Numeric fields listings can be filtered on by range, each kept in a sorted
+# (value, id) list; movies without a value are left out of that list
+RANGE_KEYS: Dict[str, Callable[[Movie], Optional[float]]] = {
+    "year": _release_year,
+    "vote_average": lambda movie: movie.vote_average,
+    "runtime": lambda movie: movie.runtime,
+}
+
+# Weights available for weighted random picks, in IdArray column order;
+# "members" is the number of users who added the movie
+WEIGHT_KEYS = ["popularity", "vote_average", "members"]
+
+class MovieCatalog:
+    """
+    Process-wide, in-memory view of the movies held by a MovieStore.
+
+    The catalog is loaded once at startup and afterwards only applies the
+    movies the store reports as changed. A cheap change check (directory
+    mtime for JSON, the highest row sequence for SQLite) runs on every read
+    so writes from other processes (e.g. the bot) show up immediately; a
+    full scan runs at most every `refresh_interval` seconds to catch
+    anything it missed.
+
+    A genre_id -> movie-ID-set inverted index is maintained alongside the
+    movies so genre listings and genre filters never walk the whole catalog,
+    along with one sorted (key, id) list per SORT_KEYS entry for keyset
+    pagination and one sorted (value, id) list per RANGE_KEYS entry for
+    range filters. Movie IDs (overall and per genre) are kept in IdArrays with
+    one Fenwick-tree weight column per WEIGHT_KEYS entry, so uniform random
+    picks cost O(k) and weighted ones O(k log n). Member counts and a
+    user -> movie-IDs reverse index are kept current by polling the store
+    for newly added movie users; running totals plus the sorted range
+    lists answer catalog statistics without touching every movie. A BM25
+    SearchIndex over titles and overviews backs text search, and a
+    SimilarityIndex of feature vectors backs "more like this".
+
+    `version` increases monotonically whenever movies or movie users change
+    (here or in another process); together with the per-process `epoch` it
+    identifies a catalog state for ETags and caches. The last
+    `change_log_size` movie and movie-user changes are kept, tagged with the
+    version they produced, so clients can catch up from a version they saw.
+    """
+
+    def __init__(self, store: MovieStore, refresh_interval: float = 30.0, change_log_size: int = 10000):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.movies: Dict[str, Movie] = {}
+        self._ids = IdArray(len(WEIGHT_KEYS))
+        self._genre_index: Dict[int, IdArray] = {}
+        self._member_counts: Dict[str, int] = {}
+        self._user_movies: Dict[str, List[str]] = {}
+        self._runtime_total = 0
+        self._rating_total = 0.0
+        self._search_index = SearchIndex()
+        self._similarity_index = SimilarityIndex()
+        self._genre_names: Dict[int, str] = {}
+        self._sorted: Dict[str, List[Tuple[Any, int]]] = {sort: [] for sort in SORT_KEYS}
+        self._ranges: Dict[str, List[Tuple[float, int]]] = {key: [] for key in RANGE_KEYS}
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        # (version, movie ID, user ID or None for a movie change); deltas
+        # can be served from any version >= _changes_floor
+        self._changes: Deque[Tuple[int, str, Optional[str]]] = deque(maxlen=change_log_size)
+        self._changes_floor = 0
+        self._last_scan = 0.0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def load(self) -> None:
+        """Load every movie from the store."""
+        with self._lock:
+            self._member_counts = {}
+            self._user_movies = {}
+            self._last_scan = time.monotonic()
+            self.movies = self.store.load()
+            # Restart the change feed, then index members from scratch
+            self.store.poll_movie_users()
+            for movie_id, user_ids in self.store.get_all_movie_users().items():
+                self._member_counts[movie_id] = len(user_ids)
+                for user_id in user_ids:
+                    self._user_movies.setdefault(user_id, []).append(movie_id)
+
+            self._build_indexes()
+            self.version += 1
+            self._changes.clear()
+            self._changes_floor = self.version
+            self._loaded = True
+
+    def refresh(self, force: bool = False) -> None:
+        """Pick up movies that were added, changed or removed in the store."""
+        if not self._loaded:
+            self.load()
+            return
+
+        self.poll_movie_users()
+
+        has_changes = self.store.has_changes()
+        if (force or has_changes or
+                time.monotonic() - self._last_scan >= self.refresh_interval):
+            with self._lock:
+                self._last_scan = time.monotonic()
+                changed, removed = self.store.scan()
+                for movie_id in removed:
+                    self._remove(movie_id)
+                for movie_id, movie in changed.items():
+                    self._set(movie_id, movie)
+                # has_changes alone may be a false alarm (a temp file, or our
+                # own write, already counted by put); movie users are counted
+                # by poll_movie_users
+                if changed or removed:
+                    self.version += 1
+
+    def poll_movie_users(self) -> None:
+        """Apply movie users added since the last poll, here or in another process."""
+        if not self._loaded:
+            self.load()
+            return
+
+        with self._lock:
+            added = self.store.poll_movie_users()
+            for movie_id, user_id in added:
+                self._add_member(movie_id, user_id)
+            if added:
+                self.version += 1
+
+    def get_version(self) -> str:
+        """Get a token identifying the current catalog state, after a refresh."""
+        self.refresh()
+        return f"{self.epoch}-{self.version}"
+
+    def get_changes(self, since: Optional[str]) -> Dict[str, Any]:
+        """
+        Get what changed after a version returned by get_version.
+
+        Returns the new version plus the movies added or changed (current
+        state), the IDs of removed movies and the movie users added. When
+        `since` is missing, from another epoch or older than the retained
+        log, `reset` is true and the caller must reload everything.
+        """
+        self.refresh()
+        with self._lock:
+            version = f"{self.epoch}-{self.version}"
+            epoch, _, number = (since or "").partition("-")
+            if epoch != self.epoch or not number.isdigit() or not self._changes_floor <= int(number) <= self.version:
+                return {"version": version, "reset": True, "movies": [], "removed": [], "movie_users": {}}
+
+            # Walk back from the newest change; dicts keep first-seen order
+            movie_ids: Dict[str, None] = {}
+            movie_users: Dict[str, List[str]] = {}
+            for change_version, movie_id, user_id in reversed(self._changes):
+                if change_version <= int(number):
+                    break
+                if user_id is None:
+                    movie_ids[movie_id] = None
+                else:
+                    movie_users.setdefault(movie_id, []).append(user_id)
+            for user_ids in movie_users.values():
+                user_ids.reverse()
+
+            return {
+                "version": version,
+                "reset": False,
+                "movies": [self.movies[movie_id] for movie_id in movie_ids if movie_id in self.movies],
+                "removed": [int(movie_id) for movie_id in movie_ids if movie_id not in self.movies],
+                "movie_users": movie_users,
+            }
+
+    def get_all(self) -> Dict[str, Movie]:
+        """Get all movies keyed by movie ID."""
+        self.refresh()
+        return dict(self.movies)
+
+    def get(self, movie_id) -> Optional[Movie]:
+        """Get a specific movie by ID."""
+        self.refresh()
+        return self.movies.get(str(movie_id))
+
+    def put(self, movie: Movie) -> None:
+        """Record a movie that was just written to the store by this process."""
+        self.put_many([movie])
+
+    def put_many(self, movies: List[Movie]) -> None:
+        """Record many movies just written to the store, as a single version bump."""
+        if not movies:
+            return
+        with self._lock:
+            if len(movies) * 4 < len(self.movies) + len(movies):
+                for movie in movies:
+                    self._set(str(movie.id), movie)
+            else:
+                # A quarter or more of the catalog is new: sorting everything
+                # again beats inserting into the indexes one movie at a time
+                for movie in movies:
+                    self._log_change(str(movie.id))
+                    self.movies[str(movie.id)] = movie
+                self._build_indexes()
+            self.version += 1
+
+    def existing_ids(self, movie_ids: Iterable[int]) -> Set[int]:
+        """Get which of the given movie IDs are in the catalog, after one refresh."""
+        self.refresh()
+        with self._lock:
+            return {movie_id for movie_id in movie_ids if str(movie_id) in self.movies}
+
+    def get_genres(self) -> List[Dict[str, Union[int, str]]]:
+        """Get all genres with their live movie counts."""
+        self.refresh()
+        with self._lock:
+            return [
+                {"id": genre_id, "name": self._genre_names[genre_id], "count": len(movie_ids)}
+                for genre_id, movie_ids in self._genre_index.items()
+                if genre_id in self._genre_names
+            ]
+
+    def get_by_genre(self, genre_id: int) -> List[Movie]:
+        """Get the movies tagged with a genre."""
+        self.refresh()
+        with self._lock:
+            return [self.movies[str(movie_id)] for movie_id in self._genre_index.get(genre_id, ())]
+
+    def get_user_movies(self, user_id: str) -> List[Movie]:
+        """Get the movies a user added, in O(result) via the reverse index."""
+        self.refresh()
+        with self._lock:
+            return [
+                self.movies[movie_id] for movie_id in self._user_movies.get(user_id, ()) if movie_id in self.movies
+            ]
+
+    def get_user_counts(self) -> Dict[str, int]:
+        """Get the number of movies each user added."""
+        self.refresh()
+        with self._lock:
+            return {user_id: len(movie_ids) for user_id, movie_ids in self._user_movies.items()}
+
+    def get_stats(self, rating_bins: List[float], runtime_bins: List[float], top: int = 10) -> Dict[str, Any]:
+        """
+        Get catalog statistics from the running aggregates.
+
+        Histogram bins are given by their lower bounds; each bin runs up to
+        the next bound and the last one is open-ended. Every bin is two
+        bisects into a sorted range list, so no movie is visited.
+        """
+        self.refresh()
+        with self._lock:
+            count = len(self.movies)
+            years = self._ranges["year"]
+            decades = []
+            if years:
+                for decade in range(years[0][0] // 10 * 10, years[-1][0] + 1, 10):
+                    decade_count = bisect.bisect_left(years, (decade + 10,)) - bisect.bisect_left(years, (decade,))
+                    if decade_count:
+                        decades.append({"decade": decade, "count": decade_count})
+
+            user_counts = {user_id: len(movie_ids) for user_id, movie_ids in self._user_movies.items()}
+            return {
+                "movies": count,
+                "total_runtime": self._runtime_total,
+                "average_rating": round(self._rating_total / count, 2) if count else None,
+                "genres": sorted(
+                    (
+                        {"id": genre_id, "name": self._genre_names[genre_id], "count": len(movie_ids)}
+                        for genre_id, movie_ids in self._genre_index.items()
+                        if genre_id in self._genre_names
+                    ),
+                    key=lambda genre: -genre["count"],
+                ),
+                "decades": decades,
+                "users": user_counts,
+                "top_contributors": [
+                    {"user_id": user_id, "count": movie_count}
+                    for user_id, movie_count in heapq.nlargest(top, user_counts.items(), key=lambda item: item[1])
+                ],
+                "rating_histogram": self._histogram("vote_average", rating_bins),
+                "runtime_histogram": self._histogram("runtime", runtime_bins),
+            }
+
+    def _histogram(self, name: str, bins: List[float]) -> List[Dict[str, Any]]:
+        entries = self._ranges[name]
+        starts = [bisect.bisect_left(entries, (low,)) for low in bins] + [len(entries)]
+        return [
+            {"min": low, "max": bins[i + 1] if i + 1 < len(bins) else None, "count": starts[i + 1] - starts[i]}
+            for i, low in enumerate(bins)
+        ]
+
+    def sample(
+        self,
+        k: int,
+        exclude: Set[int] = frozenset(),
+        genre_id: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> List[Movie]:
+        """
+        Pick up to k distinct random movies, optionally within one genre.
+
+        `weights` maps WEIGHT_KEYS entries to coefficients; when given, each
+        movie is picked with probability proportional to the weighted sum.
+        """
+        self.refresh()
+        with self._lock:
+            if genre_id is None:
+                ids = self._ids
+            else:
+                ids = self._genre_index.get(genre_id, IdArray())
+            if weights:
+                coefficients = [weights.get(key, 0.0) for key in WEIGHT_KEYS]
+                picked = ids.sample_weighted(k, coefficients, exclude)
+            else:
+                picked = ids.sample(k, exclude)
+            return [self.movies[str(movie_id)] for movie_id in picked]
+
+    def get_page(
+        self,
+        sort: str,
+        descending: bool,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        genre_id: Optional[int] = None,
+    ) -> Tuple[List[Movie], Optional[Tuple[Any, int]], int]:
+        """
+        Get one page of movies ordered by a SORT_KEYS entry.
+
+        `after` is the (key, id) position of the last movie on the previous
+        page. `ranges` maps RANGE_KEYS entries to inclusive (low, high)
+        bounds, either of which may be None; with `genre_id` it limits the
+        listing to matching movies. Returns the movies, the position to
+        resume from (None on the last page) and the total number of
+        matching movies.
+        """
+        self.refresh()
+        with self._lock:
+            if ranges or genre_id is not None:
+                return self._get_filtered_page(sort, descending, limit, after, self._filter(ranges or {}, genre_id))
+
+            entries = self._sorted[sort]
+            if descending:
+                end = bisect.bisect_left(entries, after) if after is not None else len(entries)
+                window = entries[max(0, end - limit):end][::-1]
+                has_more = end - limit > 0
+            else:
+                start = bisect.bisect_right(entries, after) if after is not None else 0
+                window = entries[start:start + limit]
+                has_more = start + limit < len(entries)
+
+            movies = [self.movies[str(movie_id)] for _, movie_id in window]
+            next_after = window[-1] if window and has_more else None
+            return movies, next_after, len(entries)
+
+    def _get_filtered_page(
+        self, sort: str, descending: bool, limit: int, after: Optional[Tuple[Any, int]], movie_ids: List[int]
+    ) -> Tuple[List[Movie], Optional[Tuple[Any, int]], int]:
+        # Only the page (plus one, to tell whether more follow) is ordered
+        key = SORT_KEYS[sort]
+        entries = ((key(self.movies[str(movie_id)]), movie_id) for movie_id in movie_ids)
+        if descending:
+            if after is not None:
+                entries = (entry for entry in entries if entry < after)
+            window = heapq.nlargest(limit + 1, entries)
+        else:
+            if after is not None:
+                entries = (entry for entry in entries if entry > after)
+            window = heapq.nsmallest(limit + 1, entries)
+
+        has_more = len(window) > limit
+        window = window[:limit]
+        movies = [self.movies[str(movie_id)] for _, movie_id in window]
+        next_after = window[-1] if window and has_more else None
+        return movies, next_after, len(movie_ids)
+
+    def _filter(
+        self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]], genre_id: Optional[int]
+    ) -> List[int]:
+        """
+        Get the IDs of movies within every range and the genre.
+
+        Each range is a bisect slice of its sorted list; only the smallest
+        slice (or the genre, if smaller) is walked, and the other conditions
+        are checked per movie, so this costs O(log n + k) for the k movies
+        in the narrowest condition.
+        """
+        spans = []
+        for name, (low, high) in ranges.items():
+            entries = self._ranges[name]
+            start = 0 if low is None else bisect.bisect_left(entries, (low,))
+            end = len(entries) if high is None else bisect.bisect_right(entries, (high, math.inf))
+            spans.append((max(end - start, 0), name, start, end))
+
+        genre_ids = self._genre_index.get(genre_id, IdArray()) if genre_id is not None else None
+        spans.sort(key=lambda span: span[0])
+        if genre_ids is not None and (not spans or len(genre_ids) <= spans[0][0]):
+            candidates = list(genre_ids)
+            checks = spans
+        else:
+            _, _, start, end = spans[0]
+            candidates = [movie_id for _, movie_id in self._ranges[spans[0][1]][start:end]]
+            checks = spans[1:]
+
+        matches = []
+        for movie_id in candidates:
+            movie = self.movies[str(movie_id)]
+            if genre_ids is not None and movie_id not in genre_ids:
+                continue
+            if all(self._in_range(movie, name, ranges[name]) for _, name, _, _ in checks):
+                matches.append(movie_id)
+        return matches
+
+    @staticmethod
+    def _in_range(movie: Movie, name: str, bounds: Tuple[Optional[float], Optional[float]]) -> bool:
+        value = RANGE_KEYS[name](movie)
+        low, high = bounds
+        return value is not None and (low is None or value >= low) and (high is None or value <= high)
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[Movie, float]]:
+        """Get the movies best matching a text query, with their BM25 scores."""
+        self.refresh()
+        with self._lock:
+            return [
+                (self.movies[str(movie_id)], score)
+                for movie_id, score in self._search_index.search(query, limit)
+            ]
+
+    def similar(self, movie_id: int, k: int = 10) -> Optional[List[Tuple[Movie, float]]]:
+        """Get the k movies most like a movie, with their scores; None if it doesn't exist."""
+        self.refresh()
+        with self._lock:
+            if movie_id not in self._similarity_index:
+                return None
+            return [
+                (self.movies[str(other_id)], score)
+                for other_id, score in self._similarity_index.similar(movie_id, k)
+            ]
+
+    def check_genre_index(self) -> Dict[int, Dict[str, List[str]]]:
+        """
+        Rebuild the genre index from storage and diff it against the live one.
+
+        Returns a mapping of genre ID to the movie IDs that are missing from
+        or unexpectedly present in the live index; empty when consistent.
+        """
+        expected_index = self.store.genre_index()
+
+        with self._lock:
+            live = {
+                genre_id: {str(movie_id) for movie_id in movie_ids}
+                for genre_id, movie_ids in self._genre_index.items()
+            }
+
+        differences = {}
+        for genre_id in set(live) | set(expected_index):
+            expected = expected_index.get(genre_id, set())
+            actual = live.get(genre_id, set())
+            if expected != actual:
+                differences[genre_id] = {
+                    "missing": sorted(expected - actual),
+                    "unexpected": sorted(actual - expected),
+                }
+        return differences
+
+    def _log_change(self, movie_id: str, user_id: Optional[str] = None) -> None:
+        # Every caller bumps the version once after applying its changes
+        if len(self._changes) == self._changes.maxlen:
+            self._changes_floor = max(self._changes_floor, self._changes[0][0])
+        self._changes.append((self.version + 1, movie_id, user_id))
+
+    def _build_indexes(self) -> None:
+        """Build every index from self.movies in bulk instead of inserting movie by movie."""
+        self._genre_names = {}
+        genre_entries: Dict[int, List[Tuple[int, Tuple[float, ...]]]] = {}
+        for movie_id, movie in self.movies.items():
+            for genre_id in self._genre_ids(movie):
+                genre_entries.setdefault(genre_id, []).append((movie.id, self._weights(movie)))
+        self._ids = IdArray.build(
+            ((movie.id, self._weights(movie)) for movie in self.movies.values()), len(WEIGHT_KEYS)
+        )
+        self._genre_index = {
+            genre_id: IdArray.build(entries, len(WEIGHT_KEYS)) for genre_id, entries in genre_entries.items()
+        }
+        self._sorted = {
+            sort: sorted((key(movie), movie.id) for movie in self.movies.values())
+            for sort, key in SORT_KEYS.items()
+        }
+        self._ranges = {
+            name: sorted(
+                (value, movie.id) for movie in self.movies.values() if (value := key(movie)) is not None
+            )
+            for name, key in RANGE_KEYS.items()
+        }
+        self._runtime_total = sum(value for value, _ in self._ranges["runtime"])
+        self._rating_total = sum(movie.vote_average for movie in self.movies.values())
+        self._search_index.build(self.movies.values())
+        self._similarity_index.build(self.movies.values())
+
+    def _set(self, movie_id: str, movie: Movie) -> None:
+        self._log_change(movie_id)
+        if movie_id in self.movies:
+            self._unindex(movie_id)
+        self.movies[movie_id] = movie
+        self._index(movie_id, movie)
+
+    def _remove(self, movie_id: str) -> None:
+        if movie_id in self.movies:
+            self._log_change(movie_id)
+            self._unindex(movie_id)
+            del self.movies[movie_id]
+
+    def _index(self, movie_id: str, movie: Movie) -> None:
+        for sort, key in SORT_KEYS.items():
+            bisect.insort(self._sorted[sort], (key(movie), movie.id))
+        for name, key in RANGE_KEYS.items():
+            value = key(movie)
+            if value is not None:
+                bisect.insort(self._ranges[name], (value, movie.id))
+        self._runtime_total += movie.runtime or 0
+        self._rating_total += movie.vote_average
+        self._search_index.add(movie)
+        self._similarity_index.add(movie)
+        weights = self._weights(movie)
+        self._ids.add(movie.id, weights)
+        for genre_id in self._genre_ids(movie):
+            movie_ids = self._genre_index.get(genre_id)
+            if movie_ids is None:
+                movie_ids = self._genre_index[genre_id] = IdArray(len(WEIGHT_KEYS))
+            movie_ids.add(movie.id, weights)
+
+    def _genre_ids(self, movie: Movie) -> List[int]:
+        """Get a movie's genre IDs, recording genre names along the way."""
+        genre_ids = []
+        for genre in movie.genres:
+            genre_id = genre.get("id")
+            genre_name = genre.get("name")
+            if genre_id is None:
+                continue
+            genre_ids.append(genre_id)
+            if genre_id and genre_name:
+                self._genre_names.setdefault(genre_id, genre_name)
+        return genre_ids
+
+    def _weights(self, movie: Movie) -> Tuple[float, ...]:
+        # Same order as WEIGHT_KEYS; negative weights are meaningless
+        return (
+            max(movie.popularity, 0.0),
+            max(movie.vote_average, 0.0),
+            float(self._member_counts.get(str(movie.id), 0)),
+        )
+
+    def _add_member(self, movie_id: str, user_id: str) -> None:
+        self._log_change(movie_id, user_id)
+        self._user_movies.setdefault(user_id, []).append(movie_id)
+        count = self._member_counts.get(movie_id, 0) + 1
+        self._member_counts[movie_id] = count
+        movie = self.movies.get(movie_id)
+        if movie is None:
+            return
+        column = WEIGHT_KEYS.index("members")
+        self._ids.set_weight(movie.id, column, count)
+        for genre_id in self._genre_ids(movie):
+            self._genre_index[genre_id].set_weight(movie.id, column, count)
+
+    def _unindex(self, movie_id: str) -> None:
+        movie = self.movies[movie_id]
+        for sort, key in SORT_KEYS.items():
+            entries = self._sorted[sort]
+            position = bisect.bisect_left(entries, (key(movie), movie.id))
+            if position < len(entries) and entries[position][1] == movie.id:
+                del entries[position]
+        for name, key in RANGE_KEYS.items():
+            value = key(movie)
+            if value is None:
+                continue
+            entries = self._ranges[name]
+            position = bisect.bisect_left(entries, (value, movie.id))
+            if position < len(entries) and entries[position][1] == movie.id:
+                del entries[position]
+        self._runtime_total -= movie.runtime or 0
+        self._rating_total -= movie.vote_average
+        self._search_index.remove(movie)
+        self._similarity_index.discard(movie.id)
+        self._ids.discard(movie.id)
+
+        for genre in movie.genres:
+            genre_id = genre.get("id")
+            movie_ids = self._genre_index.get(genre_id)
+            if movie_ids is None:
+                continue
+            movie_ids.discard(movie.id)
+            if not movie_ids:
+                del self._genre_index[genre_id]
+                self._genre_names.pop(genre_id, None)
+
+_catalogs: Dict[str, MovieCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(data_dir: str = "data") -> MovieCatalog:
+    """Get the shared catalog for a data directory, creating it on first use."""
+    catalog = _catalogs.get(data_dir)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(data_dir)
+            if catalog is None:
+                catalog = MovieCatalog(
+                    create_store(data_dir), settings.CATALOG_REFRESH_INTERVAL, settings.CHANGE_LOG_SIZE
+                )
+                _catalogs[data_dir] = catalog
+    return catalog
@@ -1,149 +1,328 @@
 import os
+import base64
 import json
-import random
+import math
 import re
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 from app.schemas.movie import Movie
+from app.services.movie_catalog import RANGE_KEYS, SORT_KEYS, WEIGHT_KEYS, get_catalog
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+class InvalidWeightError(ValueError):
+    """Raised when a random-pick weight specification cannot be parsed."""
+
+# Python type of each SORT_KEYS key, for validating decoded cursors
+CURSOR_KEY_TYPES = {
+    "title": str,
+    "release_date": str,
+    "vote_average": (int, float),
+}
+
+class BulkImport:
+    """
+    One NDJSON import: records are validated batch by batch as they arrive,
+    then every new movie is written in a single store transaction.
+
+    Each non-blank line gets a result: "created", "exists" (already in the
+    catalog; it is not overwritten), "duplicate" (its ID appeared earlier
+    in the same upload) or "invalid" with an error message. If the write
+    itself fails, every would-be "created" record is marked "failed".
+    """
+
+    def __init__(self, service: "MovieService"):
+        self.service = service
+        self.results: List[Dict[str, Any]] = []
+        self._line = 0
+        self._seen: Set[int] = set()
+        self._pending: List[Tuple[int, Dict, Movie]] = []
+
+    def add_lines(self, lines: List[bytes]) -> None:
+        """Validate a batch of NDJSON lines."""
+        parsed = []
+        for line in lines:
+            self._line += 1
+            if not line.strip():
+                continue
+            try:
+                movie_data = json.loads(line)
+                if not isinstance(movie_data, dict):
+                    raise ValueError("expected a JSON object")
+                movie = Movie.model_validate(movie_data)
+            except Exception as e:
+                self.results.append({"line": self._line, "id": None, "status": "invalid", "error": str(e)})
+                continue
+            # Results stay in line order; the status is filled in below
+            parsed.append((len(self.results), movie_data, movie))
+            self.results.append({"line": self._line, "id": movie.id, "status": None})
+
+        existing = self.service.catalog.existing_ids(movie.id for _, _, movie in parsed)
+        for index, movie_data, movie in parsed:
+            if movie.id in self._seen:
+                status = "duplicate"
+            elif movie.id in existing:
+                status = "exists"
+            else:
+                status = "created"
+                self._pending.append((index, movie_data, movie))
+            self._seen.add(movie.id)
+            self.results[index]["status"] = status
+
+    def commit(self) -> Dict[str, Any]:
+        """Write every new movie in one transaction and get the report."""
+        if self._pending:
+            try:
+                self.service.store.save_movies(movie_data for _, movie_data, _ in self._pending)
+            except Exception as e:
+                print(f"Error importing {len(self._pending)} movies: {e}")
+                for index, _, _ in self._pending:
+                    self.results[index].update(status="failed", error=str(e))
+            else:
+                # Update the shared catalog in place, as one version bump
+                self.service.catalog.put_many([movie for _, _, movie in self._pending])
+            self._pending = []
+
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return {"counts": counts, "results": self.results}
+
+class InvalidBinsError(ValueError):
+    """Raised when histogram bins cannot be parsed."""
+
+# Lower bounds of the default stats histogram bins
+DEFAULT_RATING_BINS = [float(rating) for rating in range(10)]
+DEFAULT_RUNTIME_BINS = [0.0, 60.0, 90.0, 120.0, 150.0, 180.0]
 
 class MovieService:
     def __init__(self, data_dir="data"):
         self.data_dir = data_dir
-        self.tracking_file = os.path.join(data_dir, 'movie_users.json')
         os.makedirs(data_dir, exist_ok=True)
+        self.catalog = get_catalog(data_dir)
+        self.store = self.catalog.store
     
     def get_all_movies(self) -> Dict[str, Movie]:
-        """Get all movies from the data directory."""
-        movies = {}
-        
-        if not os.path.exists(self.data_dir):
-            return {}
-            
-        for filename in os.listdir(self.data_dir):
-            if (filename.endswith(".json") and 
-                filename != "popular_movies.json" and 
-                filename != "movie_users.json"):
-                try:
-                    with open(os.path.join(self.data_dir, filename), "r", encoding="utf-8") as f:
-                        movie_data = json.load(f)
-                        # Skip non-movie data files
-                        if "title" in movie_data and "id" in movie_data:
-                            movie_id = str(movie_data["id"])
-                            movies[movie_id] = Movie(**movie_data)
-                except Exception as e:
-                    print(f"Error loading movie data from {filename}: {e}")
-                    
-        return movies
+        """Get all movies from the shared in-memory catalog."""
+        return self.catalog.get_all()
+    
+    def get_movies_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort: str = "title",
+        descending: bool = False,
+        fields: Optional[List[str]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        genre_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of movies plus an opaque cursor for the next page.
+
+        Pages are keyset-paginated on (sort key, id), so they stay stable
+        while movies are added. `fields` limits each item to those keys.
+        `ranges` maps RANGE_KEYS entries to inclusive (low, high) bounds
+        and, like `genre_id`, narrows the listing; `total` counts matches.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        after = None
+        if cursor:
+            after = self._decode_cursor(cursor, sort, descending)
+
+        ranges = {name: bounds for name, bounds in (ranges or {}).items() if bounds != (None, None)}
+        unknown = set(ranges) - set(RANGE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown range keys: {', '.join(sorted(unknown))}")
+
+        movies, next_after, total = self.catalog.get_page(sort, descending, limit, after, ranges, genre_id)
+
+        include = set(fields) | {"id"} if fields else None
+        return {
+            "items": [movie.model_dump(include=include) for movie in movies],
+            "next_cursor": self._encode_cursor(next_after, sort, descending) if next_after else None,
+            "total": total,
+        }
+
+    @staticmethod
+    def _encode_cursor(after: Tuple[Any, int], sort: str, descending: bool) -> str:
+        payload = json.dumps([sort, descending, after[0], after[1]], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, int]:
+        try:
+            cursor_sort, cursor_descending, key, movie_id = json.loads(base64.urlsafe_b64decode(cursor))
+        except Exception:
+            raise InvalidCursorError("Malformed cursor")
+        if cursor_sort != sort or cursor_descending != descending:
+            raise InvalidCursorError("Cursor was issued for a different sort order")
+        # Keys are compared with the sorted index, so a wrong type would be a 500
+        key_types = CURSOR_KEY_TYPES[sort]
+        if (not isinstance(key, key_types) or isinstance(key, bool)
+                or not isinstance(movie_id, int) or isinstance(movie_id, bool)):
+            raise InvalidCursorError("Malformed cursor")
+        return key, movie_id
     
     def get_movie(self, movie_id: int) -> Optional[Movie]:
         """Get a specific movie by ID."""
-        movie_file = os.path.join(self.data_dir, f"{movie_id}.json")
-        
-        if os.path.exists(movie_file):
-            try:
-                with open(movie_file, "r", encoding="utf-8") as f:
-                    movie_data = json.load(f)
-                    return Movie(**movie_data)
-            except Exception as e:
-                print(f"Error loading movie {movie_id}: {e}")
-                
-        return None
+        return self.catalog.get(movie_id)
     
     def get_random_movie(self) -> Optional[Movie]:
         """Get a random movie."""
-        movies = self.get_all_movies()
-        if not movies:
-            return None
-            
-        movie_id = random.choice(list(movies.keys()))
-        return movies[movie_id]
+        movies = self.get_random_movies(1)
+        return movies[0] if movies else None
+    
+    def get_random_movies(
+        self,
+        n: int,
+        exclude: Optional[List[int]] = None,
+        genre_id: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> List[Movie]:
+        """
+        Get up to n distinct random movies, skipping `exclude`, optionally
+        within a genre. `weights` maps WEIGHT_KEYS entries to coefficients
+        for weighted picks; uniform when omitted.
+        """
+        return self.catalog.sample(n, set(exclude or ()), genre_id, weights)
+    
+    @staticmethod
+    def parse_weights(spec: str) -> Dict[str, float]:
+        """
+        Parse "key[:coefficient],..." (e.g. "popularity" or
+        "vote_average:1,members:2") into WEIGHT_KEYS coefficients.
+        """
+        weights = {}
+        for part in spec.split(","):
+            key, _, coefficient = part.strip().partition(":")
+            if not key:
+                continue
+            if key not in WEIGHT_KEYS:
+                raise InvalidWeightError(f"Unknown weight '{key}', expected one of: {', '.join(WEIGHT_KEYS)}")
+            try:
+                value = float(coefficient) if coefficient else 1.0
+            except ValueError:
+                raise InvalidWeightError(f"Invalid coefficient for '{key}': {coefficient}")
+            if not value >= 0 or value == float("inf"):
+                raise InvalidWeightError(f"Coefficient for '{key}' must be a finite non-negative number")
+            weights[key] = value
+        return weights
+    
+    def search_movies(self, query: str, limit: int = 20) -> List[Movie]:
+        """Full-text search over titles and overviews, best match first."""
+        return [movie for movie, _ in self.catalog.search(query, limit)]
+    
+    def get_similar_movies(self, movie_id: int, k: int = 10) -> Optional[List[Movie]]:
+        """Get the k movies most like a movie by genre, year, rating and popularity; None if it doesn't exist."""
+        similar = self.catalog.similar(movie_id, k)
+        return None if similar is None else [movie for movie, _ in similar]
     
     def get_movie_users(self, movie_id: int) -> List[str]:
         """Get users who added a movie."""
-        movie_id = str(movie_id)
-        
-        if os.path.exists(self.tracking_file):
-            try:
-                with open(self.tracking_file, "r", encoding="utf-8") as f:
-                    tracking_data = json.load(f)
-                    return tracking_data.get(movie_id, [])
-            except Exception as e:
-                print(f"Error loading movie tracking data: {e}")
-                
-        return []
+        return self.store.get_movie_users(movie_id)
+    
+    def get_users_for_movies(self, movie_ids: Optional[List[int]] = None) -> Dict[str, List[str]]:
+        """Get users for many movies at once, or the whole map when no IDs are given."""
+        if movie_ids is None:
+            return self.store.get_all_movie_users()
+        return self.store.get_users_for_movies(movie_ids)
     
     def add_user_to_movie(self, movie_id: int, user_id: str) -> bool:
         """Add a user to a movie."""
-        movie_id = str(movie_id)
-        
-        # Load existing tracking data
-        tracking_data = {}
-        if os.path.exists(self.tracking_file):
-            try:
-                with open(self.tracking_file, "r", encoding="utf-8") as f:
-                    tracking_data = json.load(f)
-            except Exception as e:
-                print(f"Error loading tracking data: {e}")
-        
-        # Add the user to the movie
-        if movie_id not in tracking_data:
-            tracking_data[movie_id] = []
-            
-        if user_id not in tracking_data[movie_id]:
-            tracking_data[movie_id].append(user_id)
-            
-            # Save the updated tracking data
-            try:
-                with open(self.tracking_file, "w", encoding="utf-8") as f:
-                    json.dump(tracking_data, f, indent=4, ensure_ascii=False)
-                return True
-            except Exception as e:
-                print(f"Error saving tracking data: {e}")
-                
-        return False
+        added = self.store.add_user_to_movie(movie_id, user_id)
+        if added:
+            # Index the new pair (counts, reverse index) right away
+            self.catalog.poll_movie_users()
+        return added
+    
+    def get_user_movies(self, user_id: str) -> List[Movie]:
+        """Get the movies a user added, sorted by title."""
+        return sorted(self.catalog.get_user_movies(user_id), key=lambda movie: movie.title.casefold())
+    
+    def get_user_counts(self) -> Dict[str, int]:
+        """Get the number of movies each user added."""
+        return self.catalog.get_user_counts()
+    
+    def get_stats(
+        self,
+        rating_bins: Optional[List[float]] = None,
+        runtime_bins: Optional[List[float]] = None,
+        top: int = 10,
+    ) -> Dict[str, Any]:
+        """Get catalog statistics: counts per genre, decade and user, histograms and totals."""
+        return self.catalog.get_stats(rating_bins or DEFAULT_RATING_BINS, runtime_bins or DEFAULT_RUNTIME_BINS, top)
+    
+    @staticmethod
+    def parse_bins(spec: str) -> List[float]:
+        """Parse comma-separated, strictly increasing bin lower bounds."""
+        try:
+            bins = [float(bound) for bound in spec.split(",") if bound.strip()]
+        except ValueError:
+            raise InvalidBinsError(f"Bins must be comma-separated numbers: {spec}")
+        if not bins or len(bins) > 100:
+            raise InvalidBinsError("Give between 1 and 100 bins")
+        if any(low >= high for low, high in zip(bins, bins[1:])) or not all(math.isfinite(b) for b in bins):
+            raise InvalidBinsError("Bins must be finite and strictly increasing")
+        return bins
+    
+    def get_changes(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Get the movies and movie users changed after a catalog version (see MovieCatalog.get_changes)."""
+        return self.catalog.get_changes(since)
+    
+    def get_catalog_version(self) -> str:
+        """Get a token that changes whenever movies or movie users change."""
+        return self.catalog.get_version()
         
     def get_all_genres(self) -> List[Dict[str, Union[int, str, int]]]:
         """Get all available genres with counts."""
-        movies = self.get_all_movies().values()
-        genre_counts = {}
-        
-        for movie in movies:
-            for genre in movie.genres:
-                genre_id = genre.get("id")
-                genre_name = genre.get("name")
-                
-                if genre_id and genre_name:
-                    if genre_id not in genre_counts:
-                        genre_counts[genre_id] = {"id": genre_id, "name": genre_name, "count": 0}
-                    
-                    genre_counts[genre_id]["count"] += 1
-        
-        return list(genre_counts.values())
+        return self.catalog.get_genres()
     
     def get_movies_by_genre(self, genre_id: int) -> List[Movie]:
         """Get movies filtered by genre."""
-        movies = self.get_all_movies().values()
-        return [m for m in movies if any(g.get("id") == genre_id for g in m.genres)]
+        return self.catalog.get_by_genre(genre_id)
+    
+    def check_genre_index(self) -> Dict[int, Dict[str, List[str]]]:
+        """Diff the live genre index against one rebuilt from storage."""
+        return self.catalog.check_genre_index()
         
+    def start_import(self) -> BulkImport:
+        """Start a bulk NDJSON import; feed it with add_lines, then commit."""
+        return BulkImport(self)
+    
+    def export_movies(self, chunk_size: int = 500) -> Iterator[bytes]:
+        """Yield the stored movie records as NDJSON, a chunk of lines at a time."""
+        chunk = []
+        for line in self.store.iter_movie_lines():
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield ("\n".join(chunk) + "\n").encode("utf-8")
+                chunk = []
+        if chunk:
+            yield ("\n".join(chunk) + "\n").encode("utf-8")
+    
     def add_movie(self, movie_data: Dict) -> Optional[Movie]:
-        """Add a new movie to the data directory."""
+        """Add a new movie to the configured store."""
         if not movie_data or "id" not in movie_data:
             return None
             
         movie_id = movie_data["id"]
-        movie_file = os.path.join(self.data_dir, f"{movie_id}.json")
         
         # Check if movie already exists
-        if os.path.exists(movie_file):
+        if self.store.movie_exists(movie_id):
             return self.get_movie(movie_id)
             
         try:
             # Ensure the movie data is valid by parsing it through the Movie model
             movie = Movie(**movie_data)
             
-            # Save the movie data to a file
-            with open(movie_file, "w", encoding="utf-8") as f:
-                json.dump(movie_data, f, indent=4, ensure_ascii=False)
+            # Save the movie data
+            self.store.save_movie(movie_data)
+            
+            # Update the shared catalog in place instead of waiting for a rescan
+            self.catalog.put(movie)
             
             return movie
         except Exception as e:
@@ -0,0 +1,284 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.file_locks import atomic_write_json, file_lock
+
+class _PendingAdd:
+    """An add waiting for the next group commit."""
+
+    def __init__(self, movie_id: str, user_id: str):
+        self.movie_id = movie_id
+        self.user_id = user_id
+        self.result = False
+        self.done = False
+
+class MovieUsersJournal:
+    """
+    Movie -> users tracking backed by a snapshot plus an append-only journal.
+
+    movie_users.json keeps its existing format and acts as the snapshot.
+    Every add appends one line to movie_users.journal, so writes cost O(1)
+    I/O regardless of history size. At load time the journal is replayed on
+    top of the snapshot into set-backed maps; compaction folds the journal
+    back into the snapshot and truncates it.
+
+    Lines appended by other processes sharing the data directory are picked
+    up on the next read by tailing the journal from the last offset read.
+
+    Appends and compaction hold an advisory lock on movie_users.lock, so
+    the API and the bot can write concurrently without losing updates.
+    Concurrent adds within a process are group-committed: whichever thread
+    gets the commit lock first writes every queued line with one fsync.
+    """
+
+    def __init__(self, data_dir: str = "data"):
+        self.snapshot_file = os.path.join(data_dir, 'movie_users.json')
+        self.journal_file = os.path.join(data_dir, 'movie_users.journal')
+        self.lock_file = os.path.join(data_dir, 'movie_users.lock')
+        self.movie_users: Dict[str, List[str]] = {}
+        self._members: Dict[str, Set[str]] = {}
+        self._offset = 0
+        self._journal_id = None
+        self._snapshot_id = None
+        self._lock = threading.RLock()
+        self._commit_lock = threading.Lock()
+        self._pending: List[_PendingAdd] = []
+        self._pending_lock = threading.Lock()
+        self._lock_depth = 0
+        # Pairs applied since the last drain_added(), oldest first
+        self._added: List[Tuple[str, str]] = []
+        self.commits = 0
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.load()
+
+    def load(self) -> None:
+        """
+        Read the snapshot and replay the whole journal on top of it.
+
+        Pairs are never removed, so on a reload (after another process
+        compacted) the maps are kept and only pairs not seen yet are added.
+        """
+        # A shared lock keeps a concurrent compaction from swapping the
+        # snapshot between reading it and reading the journal
+        with self._lock, self._file_lock(shared=True):
+            self._offset = 0
+            self._snapshot_id = _snapshot_id(self.snapshot_file)
+
+            if os.path.exists(self.snapshot_file):
+                try:
+                    with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                        for movie_id, user_ids in json.load(f).items():
+                            for user_id in user_ids:
+                                self._apply(movie_id, user_id)
+                except Exception as e:
+                    print(f"Error loading movie tracking data: {e}")
+
+            self._journal_id = _file_id(self.journal_file)
+            self._replay()
+
+    def refresh(self) -> None:
+        """Apply journal lines written since the last read, reloading after compaction."""
+        with self._lock:
+            if (_file_id(self.journal_file) != self._journal_id or
+                    _snapshot_id(self.snapshot_file) != self._snapshot_id):
+                self.load()
+                return
+            try:
+                size = os.path.getsize(self.journal_file)
+            except FileNotFoundError:
+                return
+            if size < self._offset:
+                # Truncated by a compaction in another process
+                self.load()
+            elif size > self._offset:
+                self._replay()
+
+    def get_movie_users(self, movie_id) -> List[str]:
+        """Get users who added a movie."""
+        self.refresh()
+        return list(self.movie_users.get(str(movie_id), []))
+
+    def get_many(self, movie_ids) -> Dict[str, List[str]]:
+        """Get users for many movies with a single refresh."""
+        self.refresh()
+        with self._lock:
+            return {str(movie_id): list(self.movie_users.get(str(movie_id), [])) for movie_id in movie_ids}
+
+    def get_all(self) -> Dict[str, List[str]]:
+        """Get the whole movie ID -> user IDs map."""
+        self.refresh()
+        with self._lock:
+            return {movie_id: list(user_ids) for movie_id, user_ids in self.movie_users.items()}
+
+    def drain_added(self) -> List[Tuple[str, str]]:
+        """Get and forget the (movie ID, user ID) pairs applied since the last call."""
+        with self._lock:
+            added, self._added = self._added, []
+            return added
+
+    def add(self, movie_id, user_id: str) -> bool:
+        """Record that a user added a movie. Returns False if already recorded."""
+        movie_id = str(movie_id)
+        # Pairs are never removed, so a known pair can be rejected without locking
+        if user_id in self._members.get(movie_id, ()):
+            return False
+
+        request = _PendingAdd(movie_id, user_id)
+        with self._pending_lock:
+            self._pending.append(request)
+
+        with self._commit_lock:
+            # A previous leader may already have committed this request
+            if not request.done:
+                self._commit_pending()
+        return request.result
+
+    def _commit_pending(self) -> None:
+        """Write every queued add to the journal under one lock and one fsync."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        with self._lock, self._file_lock():
+            try:
+                # See lines other processes wrote before deduplicating
+                self.refresh()
+                lines = []
+                accepted = {}
+                for request in batch:
+                    key = (request.movie_id, request.user_id)
+                    if request.user_id in self._members.get(request.movie_id, ()) or key in accepted:
+                        continue
+                    accepted[key] = True
+                    lines.append(json.dumps(
+                        {"movie_id": request.movie_id, "user_id": request.user_id}, ensure_ascii=False
+                    ) + "\n")
+
+                if lines:
+                    with open(self.journal_file, "a", encoding="utf-8") as f:
+                        f.write("".join(lines))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self.commits += 1
+
+                    if self._journal_id is None:
+                        self._journal_id = _file_id(self.journal_file)
+                    # The offset is left alone: the next refresh re-reads our
+                    # own lines, which is a no-op thanks to the membership sets.
+                    for movie_id, user_id in accepted:
+                        self._apply(movie_id, user_id)
+
+                for request in batch:
+                    request.result = (request.movie_id, request.user_id) in accepted
+                    # Report duplicates within the batch only once
+                    accepted.pop((request.movie_id, request.user_id), None)
+            except Exception as e:
+                print(f"Error saving tracking data: {e}")
+            finally:
+                for request in batch:
+                    request.done = True
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot and truncate the journal."""
+        with self._lock, self._file_lock():
+            self.refresh()
+            if not self._offset:
+                return
+
+            atomic_write_json(self.snapshot_file, self.movie_users, indent=4)
+
+            with open(self.journal_file, "w", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+
+            self._offset = 0
+            self._journal_id = _file_id(self.journal_file)
+            self._snapshot_id = _snapshot_id(self.snapshot_file)
+
+    def start_compactor(self, interval: float, threshold_bytes: int) -> None:
+        """Compact in a background thread whenever the journal grows past a threshold."""
+        if self._compactor:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    if os.path.getsize(self.journal_file) >= threshold_bytes:
+                        self.compact()
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    print(f"Error compacting movie tracking journal: {e}")
+
+        self._stop.clear()
+        self._compactor = threading.Thread(target=run, name="movie-users-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self) -> None:
+        """Stop the background compactor and fold any pending journal lines."""
+        if not self._compactor:
+            return
+        self._stop.set()
+        self._compactor.join()
+        self._compactor = None
+        self.compact()
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        """Take the cross-process lock unless this thread already holds it (call under self._lock)."""
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+
+        with file_lock(self.lock_file, shared=shared):
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+
+    def _replay(self) -> None:
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partially written line; pick it up on the next read
+                    break
+                self._offset += len(line)
+                try:
+                    event = json.loads(line)
+                    self._apply(event["movie_id"], event["user_id"])
+                except Exception as e:
+                    print(f"Skipping bad movie tracking journal line: {e}")
+
+    def _apply(self, movie_id: str, user_id: str) -> None:
+        members = self._members.setdefault(movie_id, set())
+        if user_id not in members:
+            members.add(user_id)
+            self.movie_users.setdefault(movie_id, []).append(user_id)
+            self._added.append((movie_id, user_id))
+
+def _snapshot_id(path: str):
+    # Compaction replaces the snapshot, so its inode and mtime both change
+    try:
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def _file_id(path: str):
+    try:
+        stat = os.stat(path)
+        return stat.st_dev, stat.st_ino
+    except FileNotFoundError:
+        return None
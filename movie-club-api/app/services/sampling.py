@@ -0,0 +1,218 @@
+import heapq
+import random
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+class FenwickTree:
+    """
+    Prefix sums over a growable list of non-negative weights.
+
+    Point updates, appends and removing the last weight are O(log n); so is
+    finding the position a uniform draw in [0, total) lands on, which is
+    what weighted sampling needs.
+    """
+
+    def __init__(self, values: Iterable[float] = ()):
+        self._values = array("d", values)
+        # 1-based; node i holds the sum of values (i - lowbit(i), i]
+        tree = array("d", [0.0])
+        tree.extend(self._values)
+        size = len(self._values)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def value(self, position: int) -> float:
+        return self._values[position]
+
+    def total(self) -> float:
+        return self._prefix(len(self._values))
+
+    def append(self, value: float) -> None:
+        self._values.append(value)
+        i = len(self._values)
+        self._tree.append(value + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+
+    def set(self, position: int, value: float) -> None:
+        delta = value - self._values[position]
+        self._values[position] = value
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def pop(self) -> None:
+        # No other node covers the last position, so it can just be dropped
+        self._values.pop()
+        self._tree.pop()
+
+    def find(self, target: float) -> int:
+        """Get the position whose cumulative weight range contains `target`."""
+        size = len(self._values)
+        position = 0
+        step = 1 << size.bit_length()
+        while step:
+            candidate = position + step
+            if candidate <= size and self._tree[candidate] <= target:
+                position = candidate
+                target -= self._tree[candidate]
+            step >>= 1
+        return min(position, size - 1)
+
+    def _prefix(self, i: int) -> float:
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+class IdArray:
+    """
+    Compact, unordered set of movie IDs backed by an int64 array.
+
+    Adds and removals are O(1) (removal swaps the last ID into the hole),
+    and any position can be indexed, so k random members can be drawn in
+    O(k) without materializing the set.
+
+    With `weights` > 0 the array also keeps that many weight columns per
+    ID, each in a FenwickTree aligned with the ID positions, so weighted
+    draws cost O(log n) each.
+    """
+
+    def __init__(self, weights: int = 0):
+        self._ids = array("q")
+        self._positions: Dict[int, int] = {}
+        self._trees = [FenwickTree() for _ in range(weights)]
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[int, Sequence[float]]], weights: int = 0) -> "IdArray":
+        """Build from (movie ID, weights) pairs in O(n)."""
+        ids = cls(weights)
+        columns: List[List[float]] = [[] for _ in range(weights)]
+        for movie_id, row in entries:
+            if movie_id in ids._positions:
+                continue
+            ids._positions[movie_id] = len(ids._ids)
+            ids._ids.append(movie_id)
+            for column, value in zip(columns, row):
+                column.append(value)
+        ids._trees = [FenwickTree(column) for column in columns]
+        return ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return movie_id in self._positions
+
+    def add(self, movie_id: int, weights: Sequence[float] = ()) -> None:
+        if movie_id not in self._positions:
+            self._positions[movie_id] = len(self._ids)
+            self._ids.append(movie_id)
+            for tree, value in zip(self._trees, weights):
+                tree.append(value)
+
+    def discard(self, movie_id: int) -> None:
+        position = self._positions.pop(movie_id, None)
+        if position is None:
+            return
+        last = self._ids.pop()
+        if position < len(self._ids):
+            self._ids[position] = last
+            self._positions[last] = position
+        for tree in self._trees:
+            if position < len(self._ids):
+                tree.set(position, tree.value(len(self._ids)))
+            tree.pop()
+
+    def set_weight(self, movie_id: int, column: int, value: float) -> None:
+        position = self._positions.get(movie_id)
+        if position is not None:
+            self._trees[column].set(position, value)
+
+    def sample(self, k: int, exclude: Set[int] = frozenset()) -> List[int]:
+        """
+        Draw up to k distinct IDs not in `exclude`, uniformly at random.
+
+        Rejection sampling keeps this O(k) while k and `exclude` are small
+        relative to the set; when too many draws are rejected it falls back
+        to filtering the whole array.
+        """
+        size = len(self._ids)
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        attempts = 0
+        max_attempts = 4 * k + 16
+        while len(chosen) < k and attempts < max_attempts and size:
+            attempts += 1
+            movie_id = self._ids[random.randrange(size)]
+            if movie_id in seen or movie_id in exclude:
+                continue
+            seen.add(movie_id)
+            chosen.append(movie_id)
+
+        if len(chosen) < k and attempts >= max_attempts:
+            remaining = [movie_id for movie_id in self._ids if movie_id not in seen and movie_id not in exclude]
+            chosen.extend(random.sample(remaining, min(k - len(chosen), len(remaining))))
+        return chosen
+
+    def sample_weighted(self, k: int, coefficients: Sequence[float], exclude: Set[int] = frozenset()) -> List[int]:
+        """
+        Draw up to k distinct IDs not in `exclude`, each with probability
+        proportional to the coefficient-weighted sum of its weight columns.
+
+        A draw first picks a column in proportion to its coefficient times
+        its total, then a position within that column's tree. Repeats and
+        excluded IDs are redrawn, which is equivalent to sampling without
+        replacement; if too many draws are rejected the rest are picked
+        exactly from the explicit weights. IDs with zero weight are never
+        picked, and an all-zero set is sampled uniformly.
+        """
+        totals = [coefficient * tree.total() for coefficient, tree in zip(coefficients, self._trees)]
+        grand_total = sum(totals)
+        if grand_total <= 0:
+            return self.sample(k, exclude)
+
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        attempts = 0
+        max_attempts = 4 * k + 16
+        while len(chosen) < k and attempts < max_attempts:
+            attempts += 1
+            target = random.random() * grand_total
+            column = 0
+            while column < len(totals) - 1 and target >= totals[column]:
+                target -= totals[column]
+                column += 1
+            if coefficients[column] <= 0:
+                continue
+            position = self._trees[column].find(target / coefficients[column])
+            if self._weight(position, coefficients) <= 0:
+                continue
+            movie_id = self._ids[position]
+            if movie_id in seen or movie_id in exclude:
+                continue
+            seen.add(movie_id)
+            chosen.append(movie_id)
+
+        if len(chosen) < k and attempts >= max_attempts:
+            # Efraimidis-Spirakis: the k largest u^(1/w) keys are a weighted
+            # sample without replacement
+            keyed = []
+            for position, movie_id in enumerate(self._ids):
+                weight = self._weight(position, coefficients)
+                if weight > 0 and movie_id not in seen and movie_id not in exclude:
+                    keyed.append((random.random() ** (1.0 / weight), movie_id))
+            chosen.extend(movie_id for _, movie_id in heapq.nlargest(k - len(chosen), keyed))
+        return chosen
+
+    def _weight(self, position: int, coefficients: Sequence[float]) -> float:
+        return sum(coefficient * tree.value(position) for coefficient, tree in zip(coefficients, self._trees))
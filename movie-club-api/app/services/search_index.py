@@ -0,0 +1,383 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+from app.schemas.movie import Movie
+
+# Field boosts: a term in the title counts as three in the overview
+FIELD_WEIGHTS = {"title": 3.0, "original_title": 2.0, "overview": 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Vocabulary terms a trailing query prefix may expand to, and their weight
+# relative to an exact match
+PREFIX_EXPANSIONS = 20
+PREFIX_WEIGHT = 0.5
+
+# Terms in at least this many movies also keep their postings in impact
+# order, so a query can stop reading them early; the order is dropped
+# again below half of it
+IMPACT_ORDER_MIN = 1000
+# Postings read from an impact-ordered group before the first threshold update
+IMPACT_CHUNK = 256
+# Movies to look up in a term's postings are found by bisection while they
+# are fewer than 1/KNOWN_LOOKUP_RATIO of the postings, by one pass otherwise
+KNOWN_LOOKUP_RATIO = 16
+# Leading common terms whose best postings seed the score threshold
+SEED_TERMS = 4
+# Best postings per seeded term, as a multiple of the result limit
+SEED_POOL = 3
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has he her his in is it its of on or "
+    "she that the their they this to was were which who will with".split()
+)
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into casefolded, accent-stripped word tokens."""
+    if not text:
+        return []
+    text = text.casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return _WORD.findall(text)
+
+class SearchIndex:
+    """
+    Inverted index over movie titles, original titles and overviews.
+
+    Each term maps to two parallel arrays, movie IDs in ascending order and
+    field-boosted term frequencies, which keeps a 50k-movie catalog to a
+    few bytes per posting and lets a movie's frequency be found by
+    bisection. Queries are scored with BM25; the last query token also
+    matches vocabulary terms it is a prefix of (at PREFIX_WEIGHT), so
+    partially typed words still find results.
+
+    Only the top `limit` results are needed, so search() prunes with
+    MaxScore: terms are read in order of the most they can add to a score,
+    and once the rest could no longer lift an unseen movie past the
+    current `limit`-th best score, they only update movies already
+    found. Common terms (IMPACT_ORDER_MIN) also keep their postings grouped
+    by frequency and sorted by movie length within a group, that is, in
+    decreasing score order, so reading one stops where the next posting
+    can't reach the top. Results are the same as scoring every posting.
+
+    Movies are added and removed one at a time as the catalog changes; a
+    changed movie must be removed (as its old version) before it is added
+    again, since removal re-tokenizes the movie instead of storing
+    per-movie terms.
+    """
+
+    def __init__(self):
+        # term -> (movie IDs ascending, weighted term frequencies)
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        # term -> frequency -> (movie IDs, movie lengths ascending), for common terms
+        self._impacts: Dict[str, Dict[float, Tuple[array, array]]] = {}
+        self._vocabulary: List[str] = []
+        self._lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def build(self, movies: Iterable[Movie]) -> None:
+        """Index many movies at once, replacing the current contents."""
+        self._postings = {}
+        self._impacts = {}
+        self._lengths = {}
+        self._total_length = 0.0
+        # In ID order, so every posting is an append
+        for movie in sorted(movies, key=lambda movie: movie.id):
+            self._add_postings(movie, keep_impacts=False)
+        self._vocabulary = sorted(self._postings)
+        for term, (ids, _) in self._postings.items():
+            if len(ids) >= IMPACT_ORDER_MIN:
+                self._build_impacts(term)
+
+    def add(self, movie: Movie) -> None:
+        for term in self._add_postings(movie):
+            bisect.insort(self._vocabulary, term)
+
+    def remove(self, movie: Movie) -> None:
+        if movie.id not in self._lengths:
+            return
+        length = self._lengths.pop(movie.id)
+        self._total_length -= length
+        for term, frequency in self._term_frequencies(movie).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            ids, frequencies = postings
+            position = bisect.bisect_left(ids, movie.id)
+            if position < len(ids) and ids[position] == movie.id:
+                del ids[position]
+                del frequencies[position]
+
+            groups = self._impacts.get(term)
+            if groups is not None:
+                if len(ids) < IMPACT_ORDER_MIN // 2:
+                    del self._impacts[term]
+                elif frequency in groups:
+                    group_ids, group_lengths = groups[frequency]
+                    position = group_ids.index(movie.id)
+                    del group_ids[position]
+                    del group_lengths[position]
+
+            if not ids:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                if position < len(self._vocabulary) and self._vocabulary[position] == term:
+                    del self._vocabulary[position]
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """Get up to `limit` (movie ID, score) pairs, best match first."""
+        tokens = [token for token in tokenize(query) if token not in STOPWORDS] or tokenize(query)
+        if not tokens or not self._lengths or limit <= 0:
+            return []
+
+        # term -> query weight; exact matches win over prefix expansions
+        terms: Dict[str, float] = {}
+        for token in tokens:
+            terms[token] = 1.0
+        for term in self._expand_prefix(tokens[-1]):
+            terms.setdefault(term, PREFIX_WEIGHT)
+
+        count = len(self._lengths)
+        average_length = self._total_length / count or 1.0
+        # A posting scores weight * f / (f + norm_a + norm_b * movie length)
+        norm_a = K1 * (1 - B)
+        norm_b = K1 * B / average_length
+
+        # (most the term can add to a score, term weight, term), best first
+        plan = []
+        for term, query_weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            ids, frequencies = postings
+            document_frequency = len(ids)
+            idf = math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+            weight = query_weight * idf * (K1 + 1)
+            groups = self._impacts.get(term)
+            if groups is not None:
+                # The shortest movie of each frequency group bounds that group
+                bound = max(weight * frequency / (frequency + norm_a + norm_b * group_lengths[0])
+                            for frequency, (_, group_lengths) in groups.items() if group_lengths)
+            else:
+                # A movie is at least as long as the frequency, so the highest frequency bounds every posting
+                top = max(frequencies)
+                bound = weight * top / (top + norm_a + norm_b * top)
+            plan.append((bound, weight, term))
+        plan.sort(reverse=True)
+        # rest[i]: the most terms i and later can add to a score together
+        rest = [0.0] * (len(plan) + 1)
+        for i in range(len(plan) - 1, -1, -1):
+            rest[i] = rest[i + 1] + plan[i][0]
+
+        # Some `limit` movies are known to score at least this much
+        floor = self._seed_threshold(plan, limit, norm_a, norm_b)
+        scores: Dict[int, float] = {}
+        threshold = floor
+        # Postings walked since the threshold was worked out; scores only
+        # grow, so an older threshold is still a floor, just a lower one
+        walked = 0
+        for i, (_, weight, term) in enumerate(plan):
+            ids, frequencies = self._postings[term]
+            if walked * 4 >= len(scores):
+                threshold = _kth_score(scores, limit, threshold)
+                walked = 0
+            if rest[i] <= threshold:
+                # No movie without a score yet can make the top any more
+                scores = {movie_id: score for movie_id, score in scores.items() if score + rest[i] > threshold}
+                self._score_known(scores, scores.keys(), ids, frequencies, weight, norm_a, norm_b)
+            elif term in self._impacts:
+                self._score_impacts(scores, term, weight, norm_a, norm_b, rest[i + 1], limit, threshold)
+                threshold = _kth_score(scores, limit, threshold)
+            else:
+                walked += len(ids)
+                lengths = self._lengths
+                for movie_id, frequency in zip(ids, frequencies):
+                    norm = norm_a + norm_b * lengths[movie_id]
+                    scores[movie_id] = scores.get(movie_id, 0.0) + weight * frequency / (frequency + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def _score_impacts(self, scores: Dict[int, float], term: str, weight: float, norm_a: float,
+                       norm_b: float, rest: float, limit: int, floor: float) -> None:
+        """
+        Add a common term's postings to `scores`, reading each frequency
+        group only while its postings (shortest movies first) can still
+        lift a movie into the top `limit` together with `rest`.
+        """
+        ids, frequencies = self._postings[term]
+        known = set(scores)
+        # The most any unread posting could add
+        unread = 0.0
+        for frequency, (group_ids, group_lengths) in sorted(self._impacts[term].items(), reverse=True):
+            position = 0
+            # Doubled after every chunk, so the threshold is recomputed O(log n) times
+            chunk = IMPACT_CHUNK
+            while position < len(group_ids):
+                end = min(len(group_ids), position + chunk)
+                threshold = _kth_score(scores, limit, floor)
+                if threshold > rest:
+                    # From this length on, a posting plus `rest` can't beat the threshold
+                    cutoff = (weight * frequency / (threshold - rest) - frequency - norm_a) / norm_b
+                    end = bisect.bisect_left(group_lengths, cutoff, position, end)
+                if end <= position:
+                    break
+                for movie_id, length in zip(group_ids[position:end], group_lengths[position:end]):
+                    norm = norm_a + norm_b * length
+                    scores[movie_id] = scores.get(movie_id, 0.0) + weight * frequency / (frequency + norm)
+                if known:
+                    known.difference_update(group_ids[position:end])
+                position = end
+                chunk *= 2
+            if position < len(group_ids):
+                unread = max(unread, weight * frequency / (frequency + norm_a + norm_b * group_lengths[position]))
+
+        # Movies found by earlier terms may be among the unread postings
+        if known and unread:
+            threshold = _kth_score(scores, limit, floor)
+            candidates = [movie_id for movie_id in known if scores[movie_id] + unread + rest > threshold]
+            self._score_known(scores, candidates, ids, frequencies, weight, norm_a, norm_b)
+
+    def _seed_threshold(self, plan: List[Tuple[float, float, str]], limit: int, norm_a: float,
+                        norm_b: float) -> float:
+        """
+        Get a score that `limit` movies are known to reach: the best postings
+        of the leading common terms, scored on those terms alone.
+        """
+        seeded = [(weight, term) for _, weight, term in plan if term in self._impacts][:SEED_TERMS]
+        # More than `limit` per term, since the best movies for a single
+        # term rarely have the others
+        pool = limit * SEED_POOL
+        candidates = set()
+        for weight, term in seeded:
+            # Each group's first postings are its best
+            best = []
+            for frequency, (group_ids, group_lengths) in self._impacts[term].items():
+                for movie_id, length in zip(group_ids[:pool], group_lengths[:pool]):
+                    best.append((weight * frequency / (frequency + norm_a + norm_b * length), movie_id))
+            candidates.update(movie_id for _, movie_id in heapq.nlargest(pool, best))
+        if len(candidates) < limit:
+            return 0.0
+
+        scores = dict.fromkeys(candidates, 0.0)
+        for weight, term in seeded:
+            ids, frequencies = self._postings[term]
+            self._score_known(scores, candidates, ids, frequencies, weight, norm_a, norm_b)
+        # Slightly under, so a movie tying the threshold (perhaps summed in
+        # another order) isn't pruned
+        return _kth_score(scores, limit) * (1 - 1e-9)
+
+    def _score_known(self, scores: Dict[int, float], movie_ids: Iterable[int], ids: array, frequencies: array,
+                     weight: float, norm_a: float, norm_b: float) -> None:
+        """
+        Add a term's score to movies already in `scores`: looking each up
+        by bisection, or in one pass over the postings when there are many.
+        """
+        lengths = self._lengths
+        movie_ids = set(movie_ids)
+        if len(movie_ids) * KNOWN_LOOKUP_RATIO < len(ids):
+            for movie_id in movie_ids:
+                position = bisect.bisect_left(ids, movie_id)
+                if position < len(ids) and ids[position] == movie_id:
+                    frequency = frequencies[position]
+                    norm = norm_a + norm_b * lengths[movie_id]
+                    scores[movie_id] += weight * frequency / (frequency + norm)
+        else:
+            for movie_id, frequency in zip(ids, frequencies):
+                if movie_id in movie_ids:
+                    norm = norm_a + norm_b * lengths[movie_id]
+                    scores[movie_id] += weight * frequency / (frequency + norm)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Get the most common vocabulary terms that extend `prefix`."""
+        if len(prefix) < 2:
+            return []
+        start = bisect.bisect_right(self._vocabulary, prefix)
+        candidates = []
+        for term in self._vocabulary[start:start + PREFIX_EXPANSIONS * 10]:
+            if not term.startswith(prefix):
+                break
+            candidates.append(term)
+        return heapq.nlargest(PREFIX_EXPANSIONS, candidates, key=lambda term: len(self._postings[term][0]))
+
+    def _add_postings(self, movie: Movie, keep_impacts: bool = True) -> List[str]:
+        """
+        Add a movie's postings; returns terms that are new to the vocabulary.
+        With `keep_impacts` false the caller builds the impact order afterwards.
+        """
+        if movie.id in self._lengths:
+            return []
+
+        frequencies = self._term_frequencies(movie)
+        length = sum(frequencies.values())
+        self._lengths[movie.id] = length
+        self._total_length += length
+
+        new_terms = []
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("q"), array("f"))
+                new_terms.append(term)
+            ids, term_frequencies = postings
+            if not ids or ids[-1] < movie.id:
+                ids.append(movie.id)
+                term_frequencies.append(frequency)
+            else:
+                position = bisect.bisect_left(ids, movie.id)
+                ids.insert(position, movie.id)
+                term_frequencies.insert(position, frequency)
+
+            if not keep_impacts:
+                continue
+            groups = self._impacts.get(term)
+            if groups is not None:
+                group_ids, group_lengths = groups.setdefault(frequency, (array("q"), array("d")))
+                position = bisect.bisect_right(group_lengths, length)
+                group_ids.insert(position, movie.id)
+                group_lengths.insert(position, length)
+            elif len(ids) >= IMPACT_ORDER_MIN:
+                self._build_impacts(term)
+        return new_terms
+
+    def _build_impacts(self, term: str) -> None:
+        ids, frequencies = self._postings[term]
+        lengths = self._lengths
+        postings: Dict[float, List[Tuple[float, int]]] = {}
+        for movie_id, frequency in zip(ids, frequencies):
+            postings.setdefault(frequency, []).append((lengths[movie_id], movie_id))
+        groups = {}
+        for frequency, entries in postings.items():
+            entries.sort()
+            groups[frequency] = (array("q", [movie_id for _, movie_id in entries]),
+                                 array("d", [length for length, _ in entries]))
+        self._impacts[term] = groups
+
+    @staticmethod
+    def _term_frequencies(movie: Movie) -> Dict[str, float]:
+        frequencies: Dict[str, float] = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(movie, field) or ""):
+                if term in STOPWORDS:
+                    continue
+                frequencies[term] = frequencies.get(term, 0.0) + field_weight
+        return frequencies
+
+def _kth_score(scores: Dict[int, float], k: int, floor: float = 0.0) -> float:
+    """The k-th best score so far (`floor` with fewer than k, or if higher), a floor for the final k-th best."""
+    if len(scores) < k:
+        return floor
+    return max(floor, heapq.nlargest(k, scores.values())[-1])
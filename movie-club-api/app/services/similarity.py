@@ -0,0 +1,176 @@
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+from app.schemas.movie import Movie
+
+try:
+    import numpy as np
+except ImportError:  # Optional; the pure-Python path gives the same results
+    np = None
+
+# How much each feature counts towards the distance between two movies. A
+# movie's genres together have length GENRE_WEIGHT; 70 years, 7 rating
+# points or a 1000x popularity gap each move a movie YEAR_WEIGHT,
+# RATING_WEIGHT or POPULARITY_WEIGHT away.
+GENRE_WEIGHT = 1.0
+YEAR_WEIGHT = 1.0
+RATING_WEIGHT = 1.0
+POPULARITY_WEIGHT = 0.7
+
+# Columns 0-2 are year, rating and popularity; genres get columns after them
+_SCALAR_COLUMNS = 3
+
+# Scores are rounded before ranking so both paths order movies identically
+_SCORE_DIGITS = 9
+
+class SimilarityIndex:
+    """
+    Nearest neighbours of movies by genre, release year, rating and popularity.
+
+    Each movie is a feature vector (one column per genre, plus scaled year,
+    vote average and log popularity). Movies are ranked by squared
+    Euclidean distance to the query, computed as q.r - |r|^2 / 2, which is
+    a single matrix-vector product over the stored rows.
+
+    With NumPy the rows live in one float64 matrix that grows by doubling,
+    so adding a movie is amortized O(1) and a query is one batched product.
+    Without it the same scores are computed row by row from sparse dicts,
+    which is slower but returns the same neighbours.
+    """
+
+    def __init__(self, use_numpy: bool = np is not None):
+        self.use_numpy = use_numpy and np is not None
+        self._ids = array("q")
+        self._positions: Dict[int, int] = {}
+        self._genre_columns: Dict[int, int] = {}
+        self._half_norms = array("d")
+        # Sparse rows for the pure-Python path
+        self._rows: List[Dict[int, float]] = []
+        self._matrix = np.zeros((0, _SCALAR_COLUMNS)) if self.use_numpy else None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return movie_id in self._positions
+
+    def build(self, movies: Iterable[Movie]) -> None:
+        """Index many movies at once, replacing the current contents."""
+        self._ids = array("q")
+        self._positions = {}
+        self._genre_columns = {}
+        rows = []
+        for movie in movies:
+            if movie.id in self._positions:
+                continue
+            self._positions[movie.id] = len(self._ids)
+            self._ids.append(movie.id)
+            rows.append(self._features(movie))
+
+        if self.use_numpy:
+            self._matrix = np.zeros((len(rows), _SCALAR_COLUMNS + len(self._genre_columns)))
+            for position, row in enumerate(rows):
+                self._matrix[position, list(row)] = list(row.values())
+            self._rows = []
+        else:
+            self._rows = rows
+        self._half_norms = array("d", (_half_norm(row) for row in rows))
+
+    def add(self, movie: Movie) -> None:
+        if movie.id in self._positions:
+            return
+        row = self._features(movie)
+        position = len(self._ids)
+        self._positions[movie.id] = position
+        self._ids.append(movie.id)
+        self._half_norms.append(_half_norm(row))
+
+        if not self.use_numpy:
+            self._rows.append(row)
+            return
+
+        rows, columns = self._matrix.shape
+        needed = _SCALAR_COLUMNS + len(self._genre_columns)
+        if position >= rows or needed > columns:
+            grown = np.zeros((
+                rows if position < rows else max(rows * 2, 16),
+                columns if needed <= columns else max(columns * 2, needed),
+            ))
+            grown[:rows, :columns] = self._matrix
+            self._matrix = grown
+        self._matrix[position, list(row)] = list(row.values())
+
+    def discard(self, movie_id: int) -> None:
+        position = self._positions.pop(movie_id, None)
+        if position is None:
+            return
+        # Move the last row into the hole, like IdArray
+        last = len(self._ids) - 1
+        last_id = self._ids.pop()
+        half_norm = self._half_norms.pop()
+        if self.use_numpy:
+            self._matrix[position] = self._matrix[last]
+            self._matrix[last] = 0.0
+        else:
+            row = self._rows.pop()
+        if position < last:
+            self._ids[position] = last_id
+            self._positions[last_id] = position
+            self._half_norms[position] = half_norm
+            if not self.use_numpy:
+                self._rows[position] = row
+
+    def similar(self, movie_id: int, k: int = 10) -> List[Tuple[int, float]]:
+        """Get up to k (movie ID, score) pairs closest to a movie, best first."""
+        position = self._positions.get(movie_id)
+        if position is None or k <= 0:
+            return []
+        size = len(self._ids)
+
+        if self.use_numpy:
+            query = self._matrix[position]
+            scores = np.round(self._matrix[:size] @ query - np.frombuffer(self._half_norms, dtype=np.float64),
+                              _SCORE_DIGITS)
+            scores[position] = -np.inf
+            k = min(k, size - 1)
+            if k <= 0:
+                return []
+            # Everything tied with the k-th best is a candidate, so ties
+            # are broken by movie ID exactly as in the pure-Python path
+            threshold = np.partition(scores, size - k)[size - k]
+            candidates = np.nonzero(scores >= threshold)[0]
+            ranked = sorted(
+                ((float(scores[candidate]), self._ids[candidate]) for candidate in candidates),
+                key=lambda item: (-item[0], item[1]),
+            )
+            return [(candidate_id, score) for score, candidate_id in ranked[:k]]
+
+        query = self._rows[position]
+        scored = []
+        for other, row in enumerate(self._rows):
+            if other == position:
+                continue
+            dot = sum(value * query.get(column, 0.0) for column, value in row.items())
+            scored.append((round(dot - self._half_norms[other], _SCORE_DIGITS), self._ids[other]))
+        best = heapq.nsmallest(k, scored, key=lambda item: (-item[0], item[1]))
+        return [(candidate_id, score) for score, candidate_id in best]
+
+    def _features(self, movie: Movie) -> Dict[int, float]:
+        """Get a movie's sparse feature vector, assigning columns to new genres."""
+        year = (movie.release_date or "")[:4]
+        row = {
+            # Decades are 0.14 apart; movies without a date sit at 2000
+            0: YEAR_WEIGHT * ((int(year) if year.isdigit() else 2000) - 1900) / 70,
+            1: RATING_WEIGHT * max(movie.vote_average, 0.0) / 7,
+            2: POPULARITY_WEIGHT * math.log10(1 + max(movie.popularity, 0.0)) / 3,
+        }
+        genre_ids = list(dict.fromkeys(genre.get("id") for genre in movie.genres if genre.get("id") is not None))
+        for genre_id in genre_ids:
+            column = self._genre_columns.setdefault(genre_id, _SCALAR_COLUMNS + len(self._genre_columns))
+            row[column] = GENRE_WEIGHT / math.sqrt(len(genre_ids))
+        return row
+
+def _half_norm(row: Dict[int, float]) -> float:
+    return sum(value * value for value in row.values()) / 2
@@ -0,0 +1,259 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from app.schemas.movie import Movie
+from app.services.storage import MovieStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    release_date TEXT,
+    vote_average REAL,
+    popularity REAL,
+    runtime INTEGER,
+    data TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_movies_seq ON movies(seq);
+CREATE INDEX IF NOT EXISTS idx_movies_title ON movies(title);
+
+CREATE TABLE IF NOT EXISTS genres (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS movie_genres (
+    genre_id INTEGER NOT NULL,
+    movie_id INTEGER NOT NULL,
+    PRIMARY KEY (genre_id, movie_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_movie_genres_movie ON movie_genres(movie_id);
+
+CREATE TABLE IF NOT EXISTS movie_users (
+    movie_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    UNIQUE (movie_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_movie_users_user ON movie_users(user_id);
+"""
+
+class SqliteMovieStore(MovieStore):
+    """
+    Stores movies and movie users in a single SQLite database.
+
+    The database runs in WAL mode so readers never block the single writer.
+    Each thread gets its own connection. Every movie write takes the next
+    `seq`, so changes from other processes show up as MAX(seq) moving past
+    the last scanned value and are picked up incrementally through the
+    indexed column. Writes made through this store are skipped, like the
+    JSON store's own writes, since the caller records them in the catalog.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._last_seq = 0
+        self._last_user_rowid = 0
+        # Guards _last_seq, which scans and writes on any thread advance
+        self._seq_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def load(self) -> Dict[str, Movie]:
+        self._last_seq = 0
+        movies, _ = self.scan()
+        return movies
+
+    def has_changes(self) -> bool:
+        # A store-wide token: PRAGMA data_version is per connection, and
+        # connections are per thread. New movie users are found by
+        # poll_movie_users instead.
+        max_seq = self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM movies").fetchone()[0]
+        with self._seq_lock:
+            return max_seq > self._last_seq
+
+    def scan(self) -> Tuple[Dict[str, Movie], List[str]]:
+        with self._seq_lock:
+            last_seq = self._last_seq
+        rows = self._conn().execute(
+            "SELECT data, seq FROM movies WHERE seq > ? ORDER BY seq", (last_seq,)
+        ).fetchall()
+
+        changed = {}
+        for data, seq in rows:
+            try:
+                movie = Movie(**json.loads(data))
+                changed[str(movie.id)] = movie
+            except Exception as e:
+                print(f"Error loading movie data from row {seq}: {e}")
+        if rows:
+            with self._seq_lock:
+                self._last_seq = max(self._last_seq, rows[-1][1])
+
+        # Movies are never deleted through the API
+        return changed, []
+
+    def genre_index(self) -> Dict[int, Set[str]]:
+        index = {}
+        for genre_id, movie_id in self._conn().execute("SELECT genre_id, movie_id FROM movie_genres"):
+            index.setdefault(genre_id, set()).add(str(movie_id))
+        return index
+
+    def movie_exists(self, movie_id) -> bool:
+        row = self._conn().execute("SELECT 1 FROM movies WHERE id = ?", (int(movie_id),)).fetchone()
+        return row is not None
+
+    def save_movie(self, movie_data: Dict) -> None:
+        self.save_movies([movie_data])
+
+    def save_movies(self, movies_data: Iterable[Dict]) -> None:
+        """Upsert many movie records in one transaction."""
+        conn = self._conn()
+        with _transaction(conn):
+            first_seq = seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM movies").fetchone()[0]
+            for movie_data in movies_data:
+                seq += 1
+                self._write_movie(conn, movie_data, seq)
+        with self._seq_lock:
+            # Skip our own rows in the next scan, unless other writers'
+            # rows came before them and still need to be picked up
+            if first_seq == self._last_seq:
+                self._last_seq = seq
+
+    def iter_movie_data(self) -> Iterator[Dict]:
+        for line in self.iter_movie_lines():
+            yield json.loads(line)
+
+    def iter_movie_lines(self) -> Iterator[str]:
+        # Rows are stored as single-line JSON already. Read in keyset-paged
+        # batches, each on the calling thread's connection, since a
+        # streaming response may resume this generator on another thread.
+        last_id = None
+        while True:
+            rows = self._conn().execute(
+                "SELECT id, data FROM movies WHERE id > ? ORDER BY id LIMIT 1000",
+                (last_id if last_id is not None else -2**63,),
+            ).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield data
+            last_id = rows[-1][0]
+
+    def _write_movie(self, conn: sqlite3.Connection, movie_data: Dict, seq: int) -> None:
+        movie_id = int(movie_data["id"])
+        conn.execute(
+            "INSERT OR REPLACE INTO movies "
+            "(id, title, release_date, vote_average, popularity, runtime, data, seq) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                movie_id,
+                movie_data["title"],
+                movie_data.get("release_date") or "",
+                movie_data.get("vote_average") or 0.0,
+                movie_data.get("popularity") or 0.0,
+                movie_data.get("runtime"),
+                json.dumps(movie_data, ensure_ascii=False),
+                seq,
+            ),
+        )
+        conn.execute("DELETE FROM movie_genres WHERE movie_id = ?", (movie_id,))
+        for genre in movie_data.get("genres") or []:
+            genre_id = genre.get("id")
+            if genre_id is None:
+                continue
+            if genre.get("name"):
+                conn.execute(
+                    "INSERT OR IGNORE INTO genres (id, name) VALUES (?, ?)", (genre_id, genre["name"])
+                )
+            conn.execute(
+                "INSERT OR IGNORE INTO movie_genres (genre_id, movie_id) VALUES (?, ?)", (genre_id, movie_id)
+            )
+
+    def get_movie_users(self, movie_id) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT user_id FROM movie_users WHERE movie_id = ? ORDER BY rowid", (int(movie_id),)
+        )
+        return [user_id for (user_id,) in rows]
+
+    def get_users_for_movies(self, movie_ids: List[int]) -> Dict[str, List[str]]:
+        result = {str(movie_id): [] for movie_id in movie_ids}
+        ids = [int(movie_id) for movie_id in movie_ids]
+        conn = self._conn()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for movie_id, user_id in conn.execute(
+                f"SELECT movie_id, user_id FROM movie_users WHERE movie_id IN ({placeholders}) ORDER BY rowid",
+                chunk,
+            ):
+                result[str(movie_id)].append(user_id)
+        return result
+
+    def get_all_movie_users(self) -> Dict[str, List[str]]:
+        tracking_data = {}
+        for movie_id, user_id in self._conn().execute(
+            "SELECT movie_id, user_id FROM movie_users ORDER BY rowid"
+        ):
+            tracking_data.setdefault(str(movie_id), []).append(user_id)
+        return tracking_data
+
+    def poll_movie_users(self) -> List[Tuple[str, str]]:
+        # Pairs are never deleted, so rowids only grow
+        rows = self._conn().execute(
+            "SELECT rowid, movie_id, user_id FROM movie_users WHERE rowid > ? ORDER BY rowid",
+            (self._last_user_rowid,),
+        ).fetchall()
+        if rows:
+            self._last_user_rowid = rows[-1][0]
+        return [(str(movie_id), user_id) for _, movie_id, user_id in rows]
+
+    def add_user_to_movie(self, movie_id, user_id: str) -> bool:
+        try:
+            cursor = self._conn().execute(
+                "INSERT OR IGNORE INTO movie_users (movie_id, user_id) VALUES (?, ?)", (int(movie_id), user_id)
+            )
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error saving tracking data: {e}")
+            return False
+
+    def add_movie_users(self, tracking_data: Dict[str, List[str]]) -> None:
+        """Import a whole movie ID -> user IDs map in one transaction."""
+        conn = self._conn()
+        with _transaction(conn):
+            conn.executemany(
+                "INSERT OR IGNORE INTO movie_users (movie_id, user_id) VALUES (?, ?)",
+                [(int(movie_id), user_id) for movie_id, user_ids in tracking_data.items() for user_id in user_ids],
+            )
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    """Run a block inside BEGIN IMMEDIATE ... COMMIT on an autocommit connection."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
@@ -0,0 +1,106 @@
+import os
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from app.core.config import settings
+from app.schemas.movie import Movie
+
+class MovieStore(ABC):
+    """
+    Base class for the persistence layer behind the movie catalog.
+
+    A store owns the on-disk representation of movies and movie_users and
+    tracks which movies changed since it was last loaded or scanned, so the
+    in-memory catalog can be kept up to date incrementally.
+    """
+
+    @abstractmethod
+    def load(self) -> Dict[str, Movie]:
+        """Load every movie keyed by movie ID and reset change tracking."""
+        pass
+
+    @abstractmethod
+    def has_changes(self) -> bool:
+        """Cheaply check whether another process may have written movies."""
+        pass
+
+    @abstractmethod
+    def scan(self) -> Tuple[Dict[str, Movie], List[str]]:
+        """Get the movies added or changed and the IDs removed since the last load/scan."""
+        pass
+
+    @abstractmethod
+    def genre_index(self) -> Dict[int, Set[str]]:
+        """Build a genre_id -> movie ID set index straight from storage."""
+        pass
+
+    @abstractmethod
+    def movie_exists(self, movie_id) -> bool:
+        """Check whether a movie is stored."""
+        pass
+
+    @abstractmethod
+    def save_movie(self, movie_data: Dict) -> None:
+        """Persist a new movie record."""
+        pass
+
+    def save_movies(self, movies_data: Iterable[Dict]) -> None:
+        """Persist many movie records, as one transaction where the backend allows it."""
+        for movie_data in movies_data:
+            self.save_movie(movie_data)
+
+    @abstractmethod
+    def iter_movie_data(self) -> Iterator[Dict]:
+        """Yield the raw record of every stored movie without touching change tracking."""
+        pass
+
+    def iter_movie_lines(self) -> Iterator[str]:
+        """Yield every stored movie as a single line of JSON (without the newline)."""
+        for movie_data in self.iter_movie_data():
+            yield json.dumps(movie_data, ensure_ascii=False)
+
+    @abstractmethod
+    def get_movie_users(self, movie_id) -> List[str]:
+        """Get users who added a movie."""
+        pass
+
+    def get_users_for_movies(self, movie_ids: List[int]) -> Dict[str, List[str]]:
+        """Get users for many movies at once, keyed by movie ID."""
+        return {str(movie_id): self.get_movie_users(movie_id) for movie_id in movie_ids}
+
+    @abstractmethod
+    def get_all_movie_users(self) -> Dict[str, List[str]]:
+        """Get the whole movie ID -> user IDs map."""
+        pass
+
+    @abstractmethod
+    def add_user_to_movie(self, movie_id, user_id: str) -> bool:
+        """Record that a user added a movie. Returns False if already recorded."""
+        pass
+
+    @abstractmethod
+    def poll_movie_users(self) -> List[Tuple[str, str]]:
+        """
+        Get the (movie ID, user ID) pairs added since the previous call,
+        including pairs added by other processes. The first call returns
+        every stored pair.
+        """
+        pass
+
+    def start_maintenance(self) -> None:
+        """Start any background housekeeping the store needs."""
+        pass
+
+    def stop_maintenance(self) -> None:
+        """Stop background housekeeping and flush pending state."""
+        pass
+
+def create_store(data_dir: str) -> MovieStore:
+    """Create the store selected by the STORAGE_BACKEND setting."""
+    if settings.STORAGE_BACKEND == "sqlite":
+        from app.services.sqlite_store import SqliteMovieStore
+        return SqliteMovieStore(settings.SQLITE_PATH or os.path.join(data_dir, "movie_club.db"))
+
+    from app.services.json_store import JsonMovieStore
+    return JsonMovieStore(data_dir)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk NDJSON import and streaming export.
+
+Starts the app against a fresh temporary data directory (or SQLite
+database with --backend sqlite), streams N synthetic movies into
+POST /api/movies/bulk, then downloads GET /api/movies/export, and reports
+throughput for both next to a plain write of the same NDJSON to disk.
+
+Usage:
+    python benchmark_bulk.py [--movies 100000] [--backend json|sqlite]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+def make_lines(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    for movie_id in range(1, count + 1):
+        yield json.dumps({
+            "id": movie_id,
+            "title": f"Movie {movie_id}",
+            "overview": "A synthetic movie. " * rnd.randint(2, 10),
+            "release_date": f"{rnd.randint(1930, 2025)}-01-01",
+            "vote_average": round(rnd.uniform(2, 9), 1),
+            "popularity": rnd.paretovariate(1.2),
+            "runtime": rnd.randint(70, 200),
+            "genres": [{"id": 18, "name": "Drama"}],
+        }).encode("utf-8") + b"\n"
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk movie import and export')
+    parser.add_argument('--movies', type=int, default=100000)
+    parser.add_argument('--backend', choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="movie-club-bulk-")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["SQLITE_PATH"] = os.path.join(data_dir, "movie_club.db")
+
+    # Imported late so the settings pick up the environment above
+    from fastapi.testclient import TestClient
+    from main import app
+
+    payload = b"".join(make_lines(args.movies))
+    megabytes = len(payload) / 1e6
+    print(f"{args.movies} movies, {megabytes:.1f} MB of NDJSON, {args.backend} backend in {data_dir}")
+
+    start = time.perf_counter()
+    with open(os.path.join(data_dir, "baseline.ndjson"), "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    elapsed = time.perf_counter() - start
+    print(f"plain write  {elapsed:6.2f} s  {megabytes / elapsed:7.1f} MB/s")
+    os.unlink(os.path.join(data_dir, "baseline.ndjson"))
+
+    with TestClient(app) as client:
+        chunks = (payload[i:i + 65536] for i in range(0, len(payload), 65536))
+        start = time.perf_counter()
+        response = client.post("/api/movies/bulk", content=chunks,
+                               headers={"Content-Type": "application/x-ndjson"})
+        elapsed = time.perf_counter() - start
+        print(f"import       {elapsed:6.2f} s  {args.movies / elapsed:9.0f} movies/s  {response.json()['counts']}")
+
+        start = time.perf_counter()
+        exported = 0
+        with client.stream("GET", "/api/movies/export") as response:
+            for chunk in response.iter_bytes():
+                exported += chunk.count(b"\n")
+        elapsed = time.perf_counter() - start
+        print(f"export       {elapsed:6.2f} s  {exported / elapsed:9.0f} movies/s  ({exported} lines)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark response encoding and compression for the movie listings.
+
+For synthetic catalogs of several sizes, measures the time to produce one
+response body and its size on the wire for:
+
+    fastapi  - response_model validation + json.dumps (the old default path)
+    dumps    - app.api.responses.dumps (orjson when installed)
+    +gzip    - dumps followed by gzip at GZIP_LEVEL
+    +zstd    - dumps followed by zstd at ZSTD_LEVEL (needs zstandard)
+
+for both the legacy full-catalog dict and one 500-movie page.
+
+Usage:
+    python benchmark_responses.py [--sizes 1000 10000 50000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict
+
+from pydantic import TypeAdapter
+
+from app.api.compression import compress, zstandard
+from app.api.responses import dumps, orjson
+from app.schemas.movie import Movie
+
+WORDS = ("love war space night dark city ghost king river dream fire blood "
+         "summer secret last lost road house girl man world story").split()
+GENRES = [(28, "Action"), (18, "Drama"), (35, "Comedy"), (27, "Horror"),
+          (878, "Science Fiction"), (10749, "Romance"), (53, "Thriller")]
+
+def make_movies(count: int, seed: int = 1) -> Dict[str, Movie]:
+    rnd = random.Random(seed)
+    movies = {}
+    for movie_id in range(1, count + 1):
+        title = " ".join(rnd.sample(WORDS, 3)).title()
+        movies[str(movie_id)] = Movie(
+            id=movie_id,
+            title=title,
+            original_title=title,
+            overview=" ".join(rnd.choices(WORDS, k=60)).capitalize() + ".",
+            release_date=f"{rnd.randint(1950, 2024)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            popularity=rnd.random() * 100,
+            vote_average=round(rnd.random() * 10, 1),
+            vote_count=rnd.randint(0, 5000),
+            genres=[{"id": g, "name": n} for g, n in rnd.sample(GENRES, rnd.randint(1, 3))],
+            runtime=rnd.randint(70, 200),
+            poster_path=f"/{movie_id}.jpg",
+        )
+    return movies
+
+def fastapi_default(adapter: TypeAdapter, content) -> bytes:
+    # What FastAPI does with a response_model before these changes
+    value = adapter.validate_python(content)
+    data = adapter.dump_python(value, mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def timed(func, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+def report(label: str, adapter: TypeAdapter, content, repeat: int) -> None:
+    encode_ms, body = timed(lambda: dumps(content), repeat)
+    variants = [
+        ("fastapi", *timed(lambda: fastapi_default(adapter, content), repeat)),
+        ("dumps", encode_ms, body),
+    ]
+    encodings = ["gzip"] + (["zstd"] if zstandard is not None else [])
+    for encoding in encodings:
+        compress_ms, compressed = timed(lambda: compress(body, encoding), repeat)
+        variants.append((f"+{encoding}", encode_ms + compress_ms, compressed))
+
+    for name, ms, payload in variants:
+        print(f"  {label:<12} {name:<8} {ms:>9.2f} ms {len(payload) / 1024:>10.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark response encoding and compression')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'pydantic-core'}, "
+          f"zstd: {'available' if zstandard is not None else 'not installed'}")
+
+    catalog_adapter = TypeAdapter(Dict[str, Movie])
+    page_adapter = TypeAdapter(Dict[str, object])
+
+    for size in args.sizes:
+        movies = make_movies(size)
+        page = {
+            "items": [movie.model_dump() for movie in list(movies.values())[:500]],
+            "next_cursor": "x" * 40,
+            "total": size,
+        }
+        print(f"\n{size} movies")
+        report("full catalog", catalog_adapter, movies, args.repeat)
+        report("500 page", page_adapter, page, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark the movie search index on a synthetic catalog.
+
+Builds a catalog whose titles and overviews are drawn from a Zipf-like
+vocabulary (so a few words are very common and most are rare, as in real
+text), then reports index build time and p50/p99 latency over many distinct exact,
+multi-word, prefix and title-like queries, next to a naive scan that
+substring-matches every title and overview.
+
+Usage:
+    python benchmark_search.py [--movies 50000] [--vocabulary 20000] [--queries 50] [--repeat 5]
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from app.schemas.movie import Movie
+from app.services.search_index import SearchIndex
+
+SYLLABLES = "ka lo mi ra ne to su vi da pe ho ri ze an el or un is at om".split()
+
+def make_vocabulary(size: int, rnd: random.Random):
+    words = set()
+    for length in itertools.count(2):
+        for parts in itertools.product(SYLLABLES, repeat=length):
+            words.add("".join(parts))
+            if len(words) >= size:
+                words = sorted(words)
+                rnd.shuffle(words)
+                return words
+
+def make_movies(count: int, vocabulary_size: int, seed: int = 1):
+    rnd = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rnd)
+    # Zipf: the word at rank r is drawn with weight 1/r
+    cumulative = list(itertools.accumulate(1.0 / rank for rank in range(1, len(vocabulary) + 1)))
+
+    def words(k):
+        return [vocabulary[i] for i in _choices(rnd, cumulative, k)]
+
+    movies = []
+    for movie_id in range(1, count + 1):
+        title = " ".join(words(rnd.randint(1, 4))).title()
+        movies.append(Movie(
+            id=movie_id,
+            title=title,
+            original_title=title,
+            overview=" ".join(words(rnd.randint(20, 80))).capitalize() + ".",
+        ))
+    return movies, vocabulary
+
+def _choices(rnd, cumulative, k):
+    import bisect
+    total = cumulative[-1]
+    return [bisect.bisect_left(cumulative, rnd.random() * total) for _ in range(k)]
+
+def naive_search(movies, query, limit=20):
+    words = query.lower().split()
+    hits = []
+    for movie in movies:
+        text = f"{movie.title} {movie.original_title} {movie.overview}".lower()
+        score = sum(text.count(word) for word in words)
+        if score:
+            hits.append((score, movie.id))
+    hits.sort(reverse=True)
+    return hits[:limit]
+
+def timed(func, queries, repeat):
+    """Run func on every query `repeat` times; returns each call's latency in ms."""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the movie search index')
+    parser.add_argument('--movies', type=int, default=50000)
+    parser.add_argument('--vocabulary', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=50, help='Distinct queries per kind')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    movies, vocabulary = make_movies(args.movies, args.vocabulary)
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.build(movies)
+    print(f"Indexed {len(index)} movies ({len(vocabulary)}-word vocabulary) "
+          f"in {time.perf_counter() - start:.2f} s")
+
+    rnd = random.Random(2)
+    count = args.queries
+    queries = {
+        "common word": vocabulary[:count],
+        "rare word": rnd.sample(vocabulary[2000:], count),
+        "two words": [f"{rnd.choice(vocabulary[:100])} {rnd.choice(vocabulary[100:5000])}" for _ in range(count)],
+        "prefix": [word[:3] for word in rnd.sample(vocabulary[:1000], count)],
+        "title-like": [movie.title for movie in rnd.sample(movies, count)],
+    }
+    print(f"\n{count} queries per kind, each run {args.repeat} times")
+    print(f"{'query':<12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'naive p50':>10}  example")
+    for label, texts in queries.items():
+        latencies = timed(index.search, texts, args.repeat)
+        naive = timed(lambda query: naive_search(movies, query), texts[:3], 1)
+        print(f"{label:<12} {percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.99):>8.2f} "
+              f"{max(latencies):>8.2f} {percentile(naive, 0.5):>10.2f}  {texts[0]!r}")
+
+    updated = movies[0].model_copy(update={"title": "Brand New Title"})
+    start = time.perf_counter()
+    index.remove(movies[0])
+    index.add(updated)
+    print(f"\nUpdating one movie took {(time.perf_counter() - start) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
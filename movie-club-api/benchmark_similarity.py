@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark "more like this" lookups on a synthetic catalog.
+
+Builds the SimilarityIndex over random movies (1-3 of 19 genres, years
+1930-2025, random ratings and long-tailed popularity), then reports build
+time and per-query latency for the NumPy and pure-Python paths, checks
+that both return the same neighbours, and times adding movies one by one.
+
+Usage:
+    python benchmark_similarity.py [--movies 50000] [--queries 50]
+"""
+
+import argparse
+import random
+import time
+
+from app.schemas.movie import Movie
+from app.services import similarity
+from app.services.similarity import SimilarityIndex
+
+GENRE_IDS = [12, 14, 16, 18, 27, 28, 35, 36, 37, 53, 80, 99, 878, 9648, 10402, 10749, 10751, 10752, 10770]
+
+def make_movies(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    return [
+        Movie(
+            id=movie_id,
+            title=f"Movie {movie_id}",
+            release_date=f"{rnd.randint(1930, 2025)}-01-01",
+            vote_average=round(rnd.uniform(2, 9), 1),
+            popularity=rnd.paretovariate(1.2),
+            genres=[{"id": genre_id, "name": str(genre_id)} for genre_id in rnd.sample(GENRE_IDS, rnd.randint(1, 3))],
+        )
+        for movie_id in range(1, count + 1)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark similar-movie lookups')
+    parser.add_argument('--movies', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    movies = make_movies(args.movies)
+    query_ids = random.Random(2).sample([movie.id for movie in movies], args.queries)
+
+    paths = {"numpy": True, "python": False} if similarity.np is not None else {"python": False}
+    if similarity.np is None:
+        print("NumPy is not installed; timing the pure-Python path only")
+
+    results = {}
+    for label, use_numpy in paths.items():
+        index = SimilarityIndex(use_numpy)
+        start = time.perf_counter()
+        index.build(movies)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results[label] = [index.similar(movie_id, 10) for movie_id in query_ids]
+        query_ms = (time.perf_counter() - start) / len(query_ids) * 1000
+
+        added = SimilarityIndex(use_numpy)
+        start = time.perf_counter()
+        for movie in movies:
+            added.add(movie)
+        add_us = (time.perf_counter() - start) / len(movies) * 1e6
+        print(f"{label:<7} build {build_s:6.2f} s   query {query_ms:8.2f} ms   add {add_us:6.1f} us/movie")
+
+    if len(results) == 2:
+        same = results["numpy"] == results["python"]
+        print(f"\nBoth paths return the same neighbours: {same}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+from app.api.compression import CompressionMiddleware
 from app.api.endpoints import movies, users
 from app.core.config import settings
+from app.services.movie_catalog import get_catalog
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the movie catalog once so requests are served from memory
+    catalog = get_catalog(settings.DATA_DIR)
+    catalog.load()
+    print(f"Loaded {len(catalog.movies)} movies from {settings.DATA_DIR}")
+    catalog.store.start_maintenance()
+    yield
+    catalog.store.stop_maintenance()
 
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -20,9 +35,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(movies.router, prefix="/api")
+# gzip/zstd by Accept-Encoding (cached read responses arrive pre-compressed)
+app.add_middleware(CompressionMiddleware)
+
+# Include routers (users first so /movies/users isn't matched as /movies/{movie_id})
 app.include_router(users.router, prefix="/api")
+app.include_router(movies.router, prefix="/api")
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
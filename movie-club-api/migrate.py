@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+One-shot migration from the JSON data directory to the SQLite store.
+
+Imports every data/<id>.json movie and movie_users.json into the SQLite
+database. Safe to re-run: existing rows are replaced, not duplicated.
+
+Usage:
+    python migrate.py [--data-dir data] [--db data/movie_club.db]
+"""
+
+import argparse
+import os
+
+from app.core.config import settings
+from app.services.json_store import JsonMovieStore
+from app.services.sqlite_store import SqliteMovieStore
+
+def migrate(data_dir: str, db_path: str) -> None:
+    """Copy movies and movie users from a JSON data directory into SQLite."""
+    json_store = JsonMovieStore(data_dir)
+    sqlite_store = SqliteMovieStore(db_path)
+
+    movies = list(json_store.iter_movie_data())
+    sqlite_store.save_movies(movies)
+    print(f"Imported {len(movies)} movies")
+
+    tracking_data = json_store.get_all_movie_users()
+    sqlite_store.add_movie_users(tracking_data)
+    print(f"Imported users for {len(tracking_data)} movies")
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate Movie Club JSON data into SQLite')
+    parser.add_argument('--data-dir', default=settings.DATA_DIR, help='JSON data directory to import')
+    parser.add_argument('--db', default=None, help='SQLite database path (default: <data-dir>/movie_club.db)')
+    args = parser.parse_args()
+
+    db_path = args.db or settings.SQLITE_PATH or os.path.join(args.data_dir, "movie_club.db")
+    print(f"Migrating {args.data_dir} -> {db_path}")
+    migrate(args.data_dir, db_path)
+    print("Done. Set STORAGE_BACKEND=sqlite to serve from the database.")
+
+if __name__ == "__main__":
+    main()
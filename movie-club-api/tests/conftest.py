@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from main import app
+
+@pytest.fixture
+def data_dir(tmp_path):
+    # Catalogs are cached per data directory, so every test gets a fresh one
+    return str(tmp_path)
+
+@pytest.fixture
+def write_movies(data_dir):
+    """Write movie dicts as DATA_DIR/{id}.json files, like the migration does."""
+    def write(movies):
+        for movie in movies:
+            with open(os.path.join(data_dir, f"{movie['id']}.json"), "w", encoding="utf-8") as f:
+                json.dump(movie, f)
+    return write
+
+@pytest.fixture
+def storage_backend():
+    """STORAGE_BACKEND for the client's catalog; override to run against SQLite."""
+    return "json"
+
+@pytest.fixture
+def client(data_dir, storage_backend, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", data_dir)
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", storage_backend)
+    with TestClient(app) as client:
+        yield client
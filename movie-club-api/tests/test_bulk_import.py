@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services.movie_service import MovieService
+
+def _ndjson(*records):
+    return "".join((record if isinstance(record, str) else json.dumps(record)) + "\n" for record in records)
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage_backend(request):
+    return request.param
+
+def test_reports_every_line(client, data_dir, storage_backend):
+    assert client.post("/api/movies", json={"id": 1, "title": "Existing"}).status_code == 200
+
+    body = _ndjson(
+        {"id": 1, "title": "Existing, again"},
+        {"id": 2, "title": "Two"},
+        "",
+        "{not json",
+        [1, 2, 3],
+        {"id": 3},
+        {"id": 2, "title": "Two, again"},
+        {"id": 4, "title": "Four", "vote_average": 7.5},
+    )
+    response = client.post("/api/movies/bulk", content=body)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert [(result["line"], result["id"], result["status"]) for result in report["results"]] == [
+        (1, 1, "exists"),
+        (2, 2, "created"),
+        (4, None, "invalid"),
+        (5, None, "invalid"),
+        (6, None, "invalid"),
+        (7, 2, "duplicate"),
+        (8, 4, "created"),
+    ]
+    assert all(result["error"] for result in report["results"] if result["status"] == "invalid")
+    assert report["counts"] == {"exists": 1, "created": 2, "invalid": 3, "duplicate": 1}
+
+    assert client.get("/api/movies/1").json()["title"] == "Existing"
+    assert client.get("/api/movies/2").json()["title"] == "Two"
+    assert client.get("/api/movies/4").json()["vote_average"] == 7.5
+    assert os.path.exists(os.path.join(data_dir, "movie_club.db" if storage_backend == "sqlite" else "2.json"))
+
+def test_lines_split_across_chunks_and_batches(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_BATCH_SIZE", 2)
+    body = _ndjson(*({"id": movie_id, "title": f"Movie {movie_id}"} for movie_id in range(1, 8)),
+                   {"id": 3, "title": "Duplicate from an earlier batch"})
+    # No trailing newline on the last line
+    body = body.rstrip("\n").encode()
+
+    def chunks():
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    report = client.post("/api/movies/bulk", content=chunks()).json()
+
+    assert [result["line"] for result in report["results"]] == list(range(1, 9))
+    assert report["counts"] == {"created": 7, "duplicate": 1}
+    assert client.get("/api/movies", params={"limit": 1}).json()["total"] == 7
+
+def test_failed_write_marks_created_records(data_dir, monkeypatch):
+    service = MovieService(data_dir)
+
+    def fail(movies_data):
+        list(movies_data)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(service.store, "save_movies", fail)
+    importer = service.start_import()
+    importer.add_lines([json.dumps({"id": 1, "title": "One"}).encode(), b"oops"])
+    report = importer.commit()
+
+    assert [(result["id"], result["status"]) for result in report["results"]] == [(1, "failed"), (None, "invalid")]
+    assert report["results"][0]["error"] == "disk full"
+    assert service.get_movie(1) is None
+
+def test_export_round_trips(client):
+    body = _ndjson(*({"id": movie_id, "title": f"Movie {movie_id}", "genres": [{"id": 18, "name": "Drama"}]}
+                     for movie_id in range(1, 4)))
+    client.post("/api/movies/bulk", content=body)
+
+    exported = client.get("/api/movies/export")
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in exported.text.splitlines()]
+    assert sorted(record["id"] for record in records) == [1, 2, 3]
+
+    # Importing the export again changes nothing
+    report = client.post("/api/movies/bulk", content=exported.content).json()
+    assert report["counts"] == {"exists": 3}
@@ -0,0 +1,110 @@
+import os
+
+from app.services.json_store import JsonMovieStore
+from app.services.movie_catalog import MovieCatalog
+
+def _catalog(data_dir, change_log_size=100):
+    catalog = MovieCatalog(JsonMovieStore(data_dir), change_log_size=change_log_size)
+    catalog.load()
+    return catalog
+
+def test_without_since_returns_reset(data_dir):
+    catalog = _catalog(data_dir)
+
+    changes = catalog.get_changes(None)
+
+    assert changes["reset"] is True
+    assert changes["version"] == catalog.get_version()
+
+def test_since_current_version_is_empty(data_dir, write_movies):
+    write_movies([{"id": 1, "title": "One"}])
+    catalog = _catalog(data_dir)
+
+    changes = catalog.get_changes(catalog.get_version())
+
+    assert changes == {"version": catalog.get_version(), "reset": False, "movies": [], "removed": [],
+                       "movie_users": {}}
+
+def test_since_returns_changes_after_that_version(data_dir, write_movies):
+    write_movies([{"id": 1, "title": "One"}, {"id": 2, "title": "Two"}])
+    catalog = _catalog(data_dir)
+    start = catalog.get_version()
+
+    write_movies([{"id": 3, "title": "Three"}, {"id": 1, "title": "One (Director's Cut)"}])
+    catalog.refresh()
+    middle = catalog.get_version()
+    os.remove(os.path.join(data_dir, "2.json"))
+    catalog.store.add_user_to_movie(3, "U1")
+    catalog.store.add_user_to_movie(3, "U2")
+    catalog.refresh(force=True)
+
+    changes = catalog.get_changes(start)
+    assert changes["reset"] is False
+    assert changes["version"] == catalog.get_version()
+    assert sorted((movie.id, movie.title) for movie in changes["movies"]) == [(1, "One (Director's Cut)"),
+                                                                           (3, "Three")]
+    assert changes["removed"] == [2]
+    assert changes["movie_users"] == {"3": ["U1", "U2"]}
+
+    # A later version only sees what came after it
+    changes = catalog.get_changes(middle)
+    assert changes["movies"] == []
+    assert changes["removed"] == [2]
+    assert changes["movie_users"] == {"3": ["U1", "U2"]}
+
+def test_too_old_or_foreign_version_resets(data_dir, write_movies):
+    catalog = _catalog(data_dir, change_log_size=2)
+    start = catalog.get_version()
+    write_movies([{"id": 1, "title": "One"}])
+    catalog.refresh()
+    recent = catalog.get_version()
+    write_movies([{"id": 2, "title": "Two"}, {"id": 3, "title": "Three"}])
+    catalog.refresh()
+
+    # Three changes were logged but only two are kept
+    assert catalog.get_changes(start)["reset"] is True
+    assert catalog.get_changes(recent)["reset"] is False
+    for since in ("garbage", f"other-{catalog.version}", f"{catalog.epoch}-{catalog.version + 1}"):
+        assert catalog.get_changes(since)["reset"] is True
+
+def test_reload_starts_a_new_log(data_dir, write_movies):
+    catalog = _catalog(data_dir)
+    version = catalog.get_version()
+
+    catalog.load()
+
+    assert catalog.get_changes(version)["reset"] is True
+
+def test_changes_endpoint(client, write_movies):
+    write_movies([{"id": 1, "title": "One"}])
+    version = client.get("/api/changes").json()["version"]
+
+    assert client.post("/api/movies", json={"id": 2, "title": "Two"}).status_code == 200
+    assert client.post("/api/movies/1/users", params={"user_id": "U1"}).status_code == 200
+
+    changes = client.get("/api/changes", params={"since": version}).json()
+    assert changes["reset"] is False
+    assert [movie["id"] for movie in changes["movies"]] == [2]
+    assert changes["movie_users"] == {"1": ["U1"]}
+
+    # Nothing new since the returned version
+    changes = client.get("/api/changes", params={"since": changes["version"]}).json()
+    assert (changes["movies"], changes["removed"], changes["movie_users"]) == ([], [], {})
+
+def test_unrelated_directory_changes_keep_the_version(data_dir, write_movies):
+    write_movies([{"id": 1, "title": "One"}])
+    catalog = _catalog(data_dir)
+    version = catalog.get_version()
+
+    # The temp file of an atomic write moves the directory mtime
+    with open(os.path.join(data_dir, ".movie_users.json.tmp"), "w") as f:
+        f.write("{}")
+    os.remove(os.path.join(data_dir, ".movie_users.json.tmp"))
+    assert catalog.get_version() == version
+
+    # A movie user is one change, however the directory moves afterwards
+    catalog.store.add_user_to_movie(1, "U1")
+    catalog.store.movie_users.compact()
+    version = catalog.get_version()
+    catalog.refresh(force=True)
+    assert catalog.get_version() == version
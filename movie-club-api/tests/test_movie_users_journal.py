@@ -0,0 +1,178 @@
+import json
+import multiprocessing
+import os
+import threading
+
+from app.services.movie_users_journal import MovieUsersJournal
+
+def _append_lines(journal_file, lines, partial=""):
+    with open(journal_file, "a", encoding="utf-8") as f:
+        for movie_id, user_id in lines:
+            f.write(json.dumps({"movie_id": movie_id, "user_id": user_id}) + "\n")
+        f.write(partial)
+
+def test_replays_journal_on_top_of_snapshot(data_dir):
+    with open(os.path.join(data_dir, "movie_users.json"), "w", encoding="utf-8") as f:
+        json.dump({"1": ["U1"]}, f)
+    _append_lines(os.path.join(data_dir, "movie_users.journal"), [("1", "U2"), ("2", "U1"), ("1", "U1")])
+
+    journal = MovieUsersJournal(data_dir)
+
+    assert journal.get_all() == {"1": ["U1", "U2"], "2": ["U1"]}
+
+def test_partial_line_is_applied_once_complete(data_dir):
+    # A crash (or a writer in another process) mid-append leaves a line without its newline
+    journal_file = os.path.join(data_dir, "movie_users.journal")
+    _append_lines(journal_file, [("1", "U1")], partial='{"movie_id": "1", "us')
+
+    journal = MovieUsersJournal(data_dir)
+    assert journal.get_movie_users(1) == ["U1"]
+
+    with open(journal_file, "a", encoding="utf-8") as f:
+        f.write('er_id": "U2"}\n')
+    assert journal.get_movie_users(1) == ["U1", "U2"]
+
+def test_bad_line_is_skipped(data_dir):
+    journal_file = os.path.join(data_dir, "movie_users.journal")
+    _append_lines(journal_file, [("1", "U1")], partial="not json\n")
+    _append_lines(journal_file, [("1", "U2")])
+
+    assert MovieUsersJournal(data_dir).get_movie_users(1) == ["U1", "U2"]
+
+def test_add_rejects_known_pairs(data_dir):
+    journal = MovieUsersJournal(data_dir)
+
+    assert journal.add(1, "U1")
+    assert not journal.add("1", "U1")
+    assert MovieUsersJournal(data_dir).get_movie_users(1) == ["U1"]
+
+def test_compaction_keeps_every_pair(data_dir):
+    journal = MovieUsersJournal(data_dir)
+    for user_id in ("U1", "U2", "U3"):
+        journal.add(7, user_id)
+
+    journal.compact()
+
+    assert os.path.getsize(journal.journal_file) == 0
+    assert MovieUsersJournal(data_dir).get_movie_users(7) == ["U1", "U2", "U3"]
+
+def test_sees_compaction_by_another_instance(data_dir):
+    reader = MovieUsersJournal(data_dir)
+    writer = MovieUsersJournal(data_dir)
+    writer.add(1, "U1")
+    writer.compact()
+    writer.add(1, "U2")
+
+    assert reader.get_movie_users(1) == ["U1", "U2"]
+
+def test_concurrent_adds_are_group_committed(data_dir):
+    journal = MovieUsersJournal(data_dir)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def add(user_id):
+        barrier.wait()
+        # Every thread also races to add the same pair
+        results.append((journal.add(1, user_id), journal.add(2, "shared")))
+
+    threads = [threading.Thread(target=add, args=(f"U{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(added for added, _ in results)
+    assert sum(shared for _, shared in results) == 1
+    assert journal.commits <= 16
+    assert sorted(MovieUsersJournal(data_dir).get_movie_users(1)) == sorted(f"U{i}" for i in range(8))
+
+def _add_from_process(data_dir, worker, start, results):
+    journal = MovieUsersJournal(data_dir)
+    start.wait()
+    added = []
+    for i in range(25):
+        added.append(journal.add(i, f"W{worker}"))
+        # Pairs every process tries to add; the flock makes exactly one win
+        added.append(journal.add(i, "shared"))
+    results.put(added)
+
+def test_concurrent_appends_from_processes(data_dir):
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    queue = context.Queue()
+    processes = [context.Process(target=_add_from_process, args=(data_dir, worker, start, queue))
+                 for worker in range(4)]
+    for process in processes:
+        process.start()
+    start.set()
+    results = [queue.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+
+    assert all(all(added[0::2]) for added in results)
+    assert sum(sum(added[1::2]) for added in results) == 25
+
+    with open(os.path.join(data_dir, "movie_users.journal"), encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 4 * 25 + 25
+
+    movie_users = MovieUsersJournal(data_dir).get_all()
+    assert all(sorted(movie_users[str(i)]) == ["W0", "W1", "W2", "W3", "shared"] for i in range(25))
+
+def _add_from_threads(data_dir, worker, start, results):
+    journal = MovieUsersJournal(data_dir)
+    start.wait()
+    rejected = []
+
+    def add(thread):
+        for i in range(50):
+            user_id = f"W{worker}-{thread}-{i}"
+            journal.add(i % 10, user_id)
+            # A second add of the same pair must be rejected
+            if journal.add(i % 10, user_id):
+                rejected.append(user_id)
+
+    threads = [threading.Thread(target=add, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(rejected)
+
+def _compact_until(data_dir, stop):
+    journal = MovieUsersJournal(data_dir)
+    while not stop.is_set():
+        journal.compact()
+        stop.wait(0.01)
+
+def test_no_lost_updates_while_another_process_compacts(data_dir):
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    stop = context.Event()
+    queue = context.Queue()
+    compactor = context.Process(target=_compact_until, args=(data_dir, stop))
+    processes = [context.Process(target=_add_from_threads, args=(data_dir, worker, start, queue))
+                 for worker in range(4)]
+    compactor.start()
+    for process in processes:
+        process.start()
+    start.set()
+    results = [queue.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    stop.set()
+    compactor.join()
+
+    assert results == [[]] * 4
+    assert compactor.exitcode == 0
+    expected = sorted((str(i % 10), f"W{worker}-{thread}-{i}")
+                      for worker in range(4) for thread in range(4) for i in range(50))
+    pairs = sorted((movie_id, user_id) for movie_id, users in MovieUsersJournal(data_dir).get_all().items()
+                   for user_id in users)
+    assert pairs == expected
+
+    # Nothing is lost in the snapshot either, once the journal is folded in
+    MovieUsersJournal(data_dir).compact()
+    with open(os.path.join(data_dir, "movie_users.json"), encoding="utf-8") as f:
+        snapshot = json.load(f)
+    assert sorted((movie_id, user_id) for movie_id, users in snapshot.items() for user_id in users) == expected
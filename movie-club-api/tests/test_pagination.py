@@ -0,0 +1,93 @@
+import base64
+import json
+
+import pytest
+
+MOVIES = [
+    {
+        "id": movie_id,
+        "title": f"Movie {chr(ord('A') + movie_id % 7)}{movie_id}",
+        "release_date": f"{1990 + movie_id % 5}-01-01" if movie_id % 6 else "",
+        # Plenty of ties, which are broken by ID
+        "vote_average": float(movie_id % 4),
+        "genres": [{"id": 18, "name": "Drama"}] if movie_id % 2 else [],
+    }
+    for movie_id in range(1, 24)
+]
+
+SORT_KEYS = {
+    "title": lambda movie: movie["title"].casefold(),
+    "release_date": lambda movie: movie["release_date"],
+    "vote_average": lambda movie: movie["vote_average"],
+}
+
+def _walk(client, **params):
+    ids, cursor = [], None
+    while True:
+        response = client.get("/api/movies", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids, page["total"]
+
+def _cursor(*parts):
+    return base64.urlsafe_b64encode(json.dumps(list(parts)).encode()).decode()
+
+@pytest.mark.parametrize("sort", SORT_KEYS)
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_walk_visits_every_movie_in_order(client, write_movies, sort, order):
+    write_movies(MOVIES)
+    key = SORT_KEYS[sort]
+    expected = [movie["id"] for movie in sorted(MOVIES, key=lambda movie: (key(movie), movie["id"]),
+                                                reverse=order == "desc")]
+
+    assert _walk(client, sort=sort, order=order, limit=5) == (expected, len(MOVIES))
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_filtered_walk(client, write_movies, order):
+    write_movies(MOVIES)
+    drama = [movie for movie in MOVIES if movie["genres"] and movie["vote_average"] >= 1]
+    expected = [movie["id"] for movie in sorted(drama, key=lambda movie: (movie["vote_average"], movie["id"]),
+                                                reverse=order == "desc")]
+
+    assert _walk(client, sort="vote_average", order=order, limit=4, genre=18, min_rating=1) == (expected, len(drama))
+
+def test_walk_is_stable_when_movies_are_added(client, write_movies):
+    write_movies(MOVIES)
+    first = client.get("/api/movies", params={"limit": 5}).json()
+    # Sorts before everything already listed, so it must not shift the next page
+    write_movies([{"id": 100, "title": "AAA"}])
+
+    rest, total = _walk(client, limit=5, cursor=first["next_cursor"])
+    assert total == len(MOVIES) + 1
+    expected = [movie["id"] for movie in sorted(MOVIES, key=lambda movie: (movie["title"].casefold(), movie["id"]))]
+    assert [item["id"] for item in first["items"]] + rest == expected
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    _cursor("title", False, "movie a7"),
+    _cursor("vote_average", False, 2.0, 5),
+    _cursor("title", True, "movie a7", 7),
+    _cursor("title", False, 3.5, 7),
+    _cursor("title", False, "movie a7", "7"),
+    _cursor("title", False, "movie a7", True),
+])
+def test_invalid_cursor_is_rejected(client, write_movies, cursor):
+    write_movies(MOVIES)
+
+    response = client.get("/api/movies", params={"cursor": cursor})
+
+    assert response.status_code == 400
+
+def test_numeric_cursor_on_rating_sort(client, write_movies):
+    write_movies(MOVIES)
+
+    def status(key):
+        return client.get("/api/movies", params={"sort": "vote_average",
+                                                 "cursor": _cursor("vote_average", False, key, 5)}).status_code
+
+    assert status(2) == 200
+    assert status(2.0) == 200
+    assert status("2") == 400
@@ -0,0 +1,145 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.sampling import FenwickTree, IdArray
+
+@pytest.fixture(autouse=True)
+def seeded():
+    random.seed(12345)
+
+def test_sample_is_distinct():
+    ids = IdArray.build((movie_id, ()) for movie_id in range(100))
+
+    for k in (1, 10, 100):
+        picked = ids.sample(k)
+        assert len(picked) == len(set(picked)) == k
+        assert set(picked) <= set(range(100))
+
+def test_sample_more_than_available():
+    ids = IdArray.build((movie_id, ()) for movie_id in range(5))
+
+    assert sorted(ids.sample(10)) == [0, 1, 2, 3, 4]
+    assert IdArray().sample(3) == []
+
+def test_sample_skips_excluded():
+    ids = IdArray.build((movie_id, ()) for movie_id in range(50))
+
+    assert not set(ids.sample(10, exclude={0, 1, 2})) & {0, 1, 2}
+    # Nearly everything excluded forces the filtering fallback
+    assert sorted(ids.sample(10, exclude=set(range(47)))) == [47, 48, 49]
+
+def test_discard_keeps_positions_consistent():
+    ids = IdArray.build((movie_id, ()) for movie_id in range(10))
+    for movie_id in (0, 9, 4):
+        ids.discard(movie_id)
+    ids.discard(42)
+    ids.add(10)
+
+    assert sorted(ids) == [1, 2, 3, 5, 6, 7, 8, 10]
+    assert 4 not in ids and 10 in ids
+    assert sorted(ids.sample(20)) == [1, 2, 3, 5, 6, 7, 8, 10]
+
+def test_sample_is_roughly_uniform():
+    ids = IdArray.build((movie_id, ()) for movie_id in range(10))
+
+    counts = Counter(movie_id for _ in range(5000) for movie_id in ids.sample(2))
+
+    assert all(800 <= counts[movie_id] <= 1200 for movie_id in range(10))
+
+def test_fenwick_tree_matches_prefix_sums():
+    values = [random.uniform(0, 5) for _ in range(37)]
+    tree = FenwickTree(values)
+    for _ in range(50):
+        position = random.randrange(len(values))
+        values[position] = random.uniform(0, 5)
+        tree.set(position, values[position])
+    for value in (1.5, 0.0, 2.5):
+        values.append(value)
+        tree.append(value)
+    values.pop()
+    tree.pop()
+
+    assert tree.total() == pytest.approx(sum(values))
+    start = 0.0
+    for position, value in enumerate(values):
+        # The middle of each position's cumulative range lands on it; zero weights have no range
+        if value:
+            assert tree.find(start + value / 2) == position
+        start += value
+
+def test_weighted_sample_follows_weights():
+    ids = IdArray.build(((movie_id, (weight,)) for movie_id, weight in enumerate([1, 2, 3, 4, 0])), weights=1)
+
+    counts = Counter(ids.sample_weighted(1, [1.0])[0] for _ in range(10000))
+
+    assert counts[4] == 0
+    for movie_id, weight in enumerate([1, 2, 3, 4]):
+        assert counts[movie_id] / 10000 == pytest.approx(weight / 10, abs=0.02)
+
+def test_weighted_sample_combines_columns():
+    # Column 0 favours ID 0, column 1 favours ID 1; coefficients pick the mix
+    ids = IdArray.build([(0, (9.0, 0.0)), (1, (0.0, 1.0)), (2, (1.0, 1.0))], weights=2)
+
+    counts = Counter(ids.sample_weighted(1, [0.0, 1.0])[0] for _ in range(4000))
+    assert counts[0] == 0
+    assert counts[1] / 4000 == pytest.approx(0.5, abs=0.03)
+
+    counts = Counter(ids.sample_weighted(1, [1.0, 9.0])[0] for _ in range(4000))
+    assert counts[0] / 4000 == pytest.approx(9 / 28, abs=0.03)
+
+def test_weighted_sample_is_distinct_and_skips_excluded():
+    ids = IdArray.build(((movie_id, (float(movie_id % 3),)) for movie_id in range(30)), weights=1)
+    positive = {movie_id for movie_id in range(30) if movie_id % 3}
+
+    picked = ids.sample_weighted(10, [1.0], exclude={1, 2})
+    assert len(set(picked)) == 10
+    assert set(picked) <= positive - {1, 2}
+
+    # Asking for more than the positive-weight IDs returns exactly those
+    assert set(ids.sample_weighted(30, [1.0])) == positive
+
+def test_weighted_sample_tracks_updates():
+    ids = IdArray.build(((movie_id, (1.0,)) for movie_id in range(6)), weights=1)
+    ids.discard(2)
+    ids.set_weight(5, 0, 0.0)
+    ids.set_weight(0, 0, 0.0)
+    ids.add(6, (1.0,))
+
+    assert sorted(ids.sample_weighted(10, [1.0])) == [1, 3, 4, 6]
+
+def test_all_zero_weights_fall_back_to_uniform():
+    ids = IdArray.build(((movie_id, (0.0,)) for movie_id in range(4)), weights=1)
+
+    assert sorted(ids.sample_weighted(4, [1.0])) == [0, 1, 2, 3]
+    assert sorted(ids.sample_weighted(4, [0.0])) == [0, 1, 2, 3]
+
+def test_random_endpoint(client, write_movies):
+    write_movies([
+        {"id": movie_id, "title": f"Movie {movie_id}", "genres": [{"id": 35, "name": "Comedy"}] if movie_id < 5 else []}
+        for movie_id in range(20)
+    ])
+
+    picked = [movie["id"] for movie in client.get("/api/random", params={"n": 8, "exclude": "0,1,2"}).json()]
+    assert len(set(picked)) == 8 and not set(picked) & {0, 1, 2}
+
+    comedies = [movie["id"] for movie in client.get("/api/random", params={"n": 10, "genre": 35}).json()]
+    assert sorted(comedies) == [0, 1, 2, 3, 4]
+
+    assert client.get("/api/random", params={"exclude": "x"}).status_code == 400
+
+def test_weighted_random_endpoint(client, write_movies):
+    write_movies([{"id": movie_id, "title": f"Movie {movie_id}", "popularity": float(movie_id % 2)}
+                  for movie_id in range(20)])
+
+    picked = [movie["id"] for movie in client.get("/api/random", params={"n": 20, "weight": "popularity"}).json()]
+    assert sorted(picked) == list(range(1, 20, 2))
+
+    # Members are counted as users add movies
+    assert client.post("/api/movies/4/users", params={"user_id": "U1"}).status_code == 200
+    picked = [movie["id"] for movie in client.get("/api/random", params={"n": 5, "weight": "members"}).json()]
+    assert picked == [4]
+
+    for weight in ("rating", "popularity:x", "popularity:-1"):
+        assert client.get("/api/random", params={"weight": weight}).status_code == 400
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from app.schemas.movie import Movie
+from app.services import search_index
+from app.services.search_index import SearchIndex, tokenize
+
+MOVIES = [
+    Movie(id=1, title="The Matrix", overview="A hacker learns reality is a simulation."),
+    Movie(id=2, title="The Matrix Reloaded", overview="Neo and the rebels fight the machines."),
+    Movie(id=3, title="Hackers", overview="Teenage hackers uncover a conspiracy."),
+    Movie(id=4, title="Amélie", original_title="Le Fabuleux Destin d'Amélie Poulain",
+          overview="A shy waitress in Paris quietly helps the people around her."),
+    Movie(id=5, title="Paris, Texas", overview="A drifter walks out of the desert."),
+    Movie(id=6, title="Simulacra", overview="Documentary about matrix algebra and simulation."),
+]
+
+def _index(movies=MOVIES):
+    index = SearchIndex()
+    index.build(movies)
+    return index
+
+def _ids(index, query, limit=20):
+    return [movie_id for movie_id, _ in index.search(query, limit)]
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Amélie's CAFÉ") == ["amelie", "s", "cafe"]
+    assert tokenize("") == []
+
+def test_title_match_ranks_above_overview_match():
+    # "matrix" is in the titles of 1 and 2 but only the overview of 6
+    ids = _ids(_index(), "matrix")
+
+    assert set(ids[:2]) == {1, 2}
+    assert ids[2] == 6
+
+def test_shorter_document_ranks_higher_for_same_match():
+    index = _index([Movie(id=1, title="Heat"), Movie(id=2, title="Heat Wave Over The Long Hot City Streets")])
+
+    assert _ids(index, "heat") == [1, 2]
+
+def test_rare_terms_weigh_more():
+    # "simulation" is in 1 and 6; "reality" only in 1
+    ids = _ids(_index(), "reality simulation")
+
+    assert ids[0] == 1
+    assert 6 in ids
+
+def test_stopwords_are_ignored_unless_nothing_else_is_left():
+    index = _index()
+
+    assert _ids(index, "the matrix") == _ids(index, "matrix")
+    assert _ids(index, "the") == []
+
+def test_accented_and_original_titles_match():
+    assert _ids(_index(), "amelie")[0] == 4
+    assert _ids(_index(), "fabuleux") == [4]
+
+def test_last_token_matches_as_prefix():
+    index = _index()
+
+    assert set(_ids(index, "hack")) == {1, 3}
+    assert set(_ids(index, "simul")) == {1, 6}
+    # Only the last token expands, and single characters don't
+    assert _ids(index, "hack matrix") == _ids(index, "matrix")
+    assert _ids(index, "h") == []
+
+def test_exact_match_beats_prefix_match():
+    index = _index([Movie(id=1, title="Star"), Movie(id=2, title="Stardust")])
+
+    assert _ids(index, "star") == [1, 2]
+
+def test_limit():
+    assert len(_ids(_index(), "a matrix paris hackers", limit=2)) == 2
+
+def test_add_and_remove_keep_index_current():
+    index = _index()
+    index.remove(MOVIES[0])
+    index.add(Movie(id=7, title="Hackerman"))
+
+    assert 1 not in _ids(index, "matrix")
+    assert set(_ids(index, "hacker")) == {3, 7}
+    assert len(index) == len(MOVIES)
+
+    # Removing every movie with a term drops it from the vocabulary too
+    index.remove(MOVIES[2])
+    index.remove(Movie(id=7, title="Hackerman"))
+    assert _ids(index, "hack") == []
+
+def test_pruned_search_matches_scoring_every_posting(monkeypatch):
+    # Small enough thresholds that common terms are impact ordered and read in several chunks
+    monkeypatch.setattr(search_index, "IMPACT_ORDER_MIN", 40)
+    monkeypatch.setattr(search_index, "IMPACT_CHUNK", 8)
+    rng = random.Random(7)
+    words = [f"w{number}" for number in range(300)]
+
+    def movie(movie_id):
+        # Skewed so that a few words are in most movies
+        def text(count):
+            return " ".join(words[int(rng.paretovariate(1.0)) % len(words)] for _ in range(count))
+        return Movie(id=movie_id, title=text(rng.randint(1, 4)), overview=text(rng.randint(5, 40)))
+
+    movies = [movie(movie_id) for movie_id in range(1, 801)]
+    index = _index(movies)
+    for old in rng.sample(movies, 100):
+        index.remove(old)
+    for movie_id in range(801, 901):
+        index.add(movie(movie_id))
+
+    # "w1" and "w2" also expand to w10-w19, w100-w199 and so on
+    queries = ["w1", "w2", "w1 w3", "w4 w40", "w5 w6 w7", "w60"]
+    queries += [rng.choice(movies).title for _ in range(20)]
+    for query in queries:
+        # A limit past the catalog size prunes nothing
+        every = [score for _, score in index.search(query, limit=len(index) + 1)]
+        for limit in (1, 5, 20):
+            scores = [score for _, score in index.search(query, limit)]
+            assert scores == pytest.approx(every[:limit]), (query, limit)
+
+def test_search_endpoint(client, write_movies):
+    write_movies([movie.model_dump() for movie in MOVIES])
+
+    response = client.get("/api/search", params={"q": "paris"})
+
+    assert response.status_code == 200
+    assert [movie["id"] for movie in response.json()] == [5, 4]
+    assert client.get("/api/search", params={"q": ""}).status_code == 422
@@ -0,0 +1,42 @@
+import os
+import threading
+
+from app.schemas.movie import Movie
+from app.services.movie_catalog import MovieCatalog
+from app.services.sqlite_store import SqliteMovieStore
+
+def _in_thread(function):
+    # Each thread gets its own SQLite connection
+    thread = threading.Thread(target=function)
+    thread.start()
+    thread.join()
+
+def test_own_writes_are_not_external_changes(data_dir):
+    catalog = MovieCatalog(SqliteMovieStore(os.path.join(data_dir, "movie_club.db")))
+    catalog.load()
+    # What MovieService.add_movie does
+    catalog.store.save_movie({"id": 1, "title": "One"})
+    catalog.put(Movie(id=1, title="One"))
+    version = catalog.get_version()
+
+    for _ in range(4):
+        _in_thread(catalog.get_version)
+        _in_thread(catalog.store.has_changes)
+
+    assert catalog.get_version() == version
+    assert not catalog.store.has_changes()
+
+def test_other_process_writes_are_picked_up(data_dir):
+    path = os.path.join(data_dir, "movie_club.db")
+    catalog = MovieCatalog(SqliteMovieStore(path))
+    catalog.load()
+    version = catalog.get_version()
+
+    # Another process (e.g. the bot) with its own store on the same file
+    SqliteMovieStore(path).save_movie({"id": 2, "title": "Two"})
+
+    assert catalog.get_version() != version
+    assert catalog.get(2).title == "Two"
+    version = catalog.get_version()
+    _in_thread(catalog.get_version)
+    assert catalog.get_version() == version
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark blocking ApiClient calls against AsyncApiClient fan-out.
+
+Starts a stub Movie Club API on localhost that sleeps a random delay
+before answering GET /api/movies/{id} and GET /api/movies/{id}/users.
+It then loads a poll's worth of candidates plus their users, first
+one request at a time with ApiClient and then concurrently with
+AsyncApiClient. Each round reports wall time next to the sum and the
+max of the injected delays. The async side runs at most API_CONCURRENCY
+requests at once, so set API_CONCURRENCY=16 to send all 16 in one wave.
+
+Usage:
+    python benchmark_async_api.py [--movies 8] [--latency-ms 100] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.api_client import ApiClient
+from src.async_api_client import AsyncApiClient
+
+class StubServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops concurrent connects into SYN retries
+    request_queue_size = 128
+
+class StubApi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # Path -> injected delay in seconds, set per round
+    delays = {}
+
+    def do_GET(self):
+        time.sleep(self.delays.get(self.path, 0))
+        parts = self.path.strip("/").split("/")
+        movie_id = int(parts[2])
+        data = ["U1", "U2"] if parts[-1] == "users" else {"id": movie_id, "title": f"Movie {movie_id}"}
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def load_blocking(client, movie_ids):
+    movies = {movie_id: client.get_movie(movie_id) for movie_id in movie_ids}
+    users = {movie_id: client.get_movie_users(movie_id) for movie_id in movie_ids}
+    return movies, users
+
+async def load_async(client, movie_ids):
+    try:
+        return await asyncio.gather(client.get_movies_many(movie_ids), client.get_movie_users_many(movie_ids))
+    finally:
+        await AsyncApiClient.close_pool()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark blocking vs async API fan-out')
+    parser.add_argument('--movies', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", 0), StubApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    rnd = random.Random(1)
+
+    print(f"{args.movies} movies + their users = {2 * args.movies} requests per round, "
+          f"delays up to {args.latency_ms:.0f} ms")
+    print(f"{'round':>5}  {'sum of delays':>13}  {'max delay':>9}  {'blocking':>9}  {'async':>9}")
+    for round_number in range(1, args.rounds + 1):
+        movie_ids = list(range(round_number * 100, round_number * 100 + args.movies))
+        StubApi.delays = {
+            path: rnd.uniform(0.5, 1.0) * args.latency_ms / 1000
+            for movie_id in movie_ids
+            for path in (f"/api/movies/{movie_id}", f"/api/movies/{movie_id}/users")
+        }
+
+        ApiClient._users_cache.clear()
+        start = time.perf_counter()
+        load_blocking(ApiClient(base_url), movie_ids)
+        blocking_s = time.perf_counter() - start
+
+        ApiClient._users_cache.clear()
+        start = time.perf_counter()
+        asyncio.run(load_async(AsyncApiClient(base_url), movie_ids))
+        async_s = time.perf_counter() - start
+
+        delays = StubApi.delays.values()
+        print(f"{round_number:>5}  {sum(delays) * 1000:10.0f} ms  {max(delays) * 1000:6.0f} ms  "
+              f"{blocking_s * 1000:6.0f} ms  {async_s * 1000:6.0f} ms")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark running slash commands on the CommandRunner pool against the
+old thread-plus-new-event-loop per command.
+
+Fires a burst of commands at both and reports wall time, peak thread
+count and peak traced memory. One burst uses no-op commands, which
+measures per-command overhead; the other uses commands that await 50 ms
+and then block for 10 ms, like a command making one async API call and
+one Slack call.
+
+Usage:
+    python benchmark_commands.py [--commands 500] [--workers 8]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+
+from src.command_runner import CommandRunner
+
+async def noop_command():
+    pass
+
+async def working_command():
+    await asyncio.sleep(0.05)
+    time.sleep(0.01)
+
+def run_thread_per_command(command, count):
+    """What slack_bot did before: a new thread and event loop for every command."""
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(command())
+        finally:
+            loop.close()
+
+    threads = []
+    for _ in range(count):
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+def measure(label, start_burst, wait):
+    peak_threads = threading.active_count()
+    tracemalloc.start()
+    start = time.perf_counter()
+    start_burst()
+    while not wait():
+        peak_threads = max(peak_threads, threading.active_count())
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<20} {elapsed * 1000:8.0f} ms  {peak_threads:5d} threads  {peak_memory / 1e6:6.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark slash command execution')
+    parser.add_argument('--commands', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    for name, command in (("no-op", noop_command), ("50 ms await + 10 ms block", working_command)):
+        print(f"{args.commands} x {name} commands")
+
+        threads = []
+        measure("thread per command",
+                lambda: threads.extend(run_thread_per_command(command, args.commands)),
+                lambda: not any(thread.is_alive() for thread in threads))
+
+        runner = CommandRunner(workers=args.workers, max_queue=args.commands)
+        measure(f"runner ({args.workers} workers)",
+                lambda: [runner.submit(name, command) for _ in range(args.commands)],
+                lambda: runner.metrics()["completed"] == args.commands)
+        runner.shutdown(5)
+
+if __name__ == "__main__":
+    main()
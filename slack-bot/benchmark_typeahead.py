@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the movie title typeahead on a synthetic catalog.
+
+Builds a TitleIndex over made-up titles, then "types" a handful of real
+titles (plus a typo) one keystroke at a time and reports per-keystroke
+latency of the index next to a linear scan over every title. Slack gives
+an options handler 3 seconds in total, network included.
+
+Usage:
+    python benchmark_typeahead.py [--movies 50000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.handlers.title_index import TitleIndex, normalize_title
+from src.models.movie import Movie
+
+WORDS = (
+    "the a of night day star war love dark last lost city king queen house river "
+    "blue red black white ghost dream road home man woman girl boy story time "
+    "secret return rise fall heart fire ice sea moon sun shadow empire garden"
+).split()
+
+def make_movies(count, seed=1):
+    rnd = random.Random(seed)
+    movies = []
+    for movie_id in range(1, count + 1):
+        title = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 5))).title()
+        movies.append(Movie({
+            "id": movie_id,
+            "title": f"{title} {movie_id % 97 or ''}".strip(),
+            "release_date": f"{rnd.randint(1930, 2025)}-01-01",
+        }))
+    return movies
+
+def linear_search(movies, query, limit=20):
+    query = normalize_title(query)
+    hits = [movie for movie in movies if query in normalize_title(movie.title)]
+    hits.sort(key=lambda movie: len(movie.title))
+    return hits[:limit]
+
+def keystrokes(search, text):
+    latencies = []
+    for end in range(1, len(text) + 1):
+        start = time.perf_counter()
+        search(text[:end])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<8} p50 {statistics.median(latencies):8.2f} ms   "
+          f"p95 {p95:8.2f} ms   max {latencies[-1]:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the movie title typeahead')
+    parser.add_argument('--movies', type=int, default=50000)
+    args = parser.parse_args()
+
+    movies = make_movies(args.movies)
+
+    start = time.perf_counter()
+    index = TitleIndex(movies)
+    print(f"Indexed {len(index)} titles in {time.perf_counter() - start:.2f} s")
+
+    typed = [movie.title for movie in movies[:: max(1, len(movies) // 8)]]
+    typed.append("Shadwo Empire")  # Typo, served by the fuzzy fallback
+
+    index_latencies, linear_latencies = [], []
+    for text in typed:
+        index_latencies += keystrokes(index.search, text)
+        linear_latencies += keystrokes(lambda query: linear_search(movies, query), text)
+
+    print(f"{len(index_latencies)} keystrokes over {len(typed)} titles")
+    report("index", index_latencies)
+    report("linear", linear_latencies)
+    print(f"\nTop matches for 'shadwo empire': {[movie.title for movie in index.search('shadwo empire', 5)]}")
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,10 @@ import time
 import logging
 import argparse
 from src.slack_bot import start_slack_bot
+from src.api_client import ApiClient
+from src.command_runner import command_runner
+from src.handlers.cache_management import save_cache_snapshots
+from src.config import COMMAND_DRAIN_TIMEOUT
 
 # Set up logging
 logging.basicConfig(
@@ -26,6 +30,19 @@ logger = logging.getLogger('movie-club-bot')
 # Handle termination signals properly
 def signal_handler(sig, frame):
     logger.info("Received signal to terminate, shutting down gracefully...")
+    # Let commands already accepted finish before the process exits
+    metrics = command_runner.metrics()
+    logger.info(f"Draining {metrics['queued']} queued and {metrics['in_flight']} running commands...")
+    drained = command_runner.shutdown(COMMAND_DRAIN_TIMEOUT)
+    # So the next start is warm
+    save_cache_snapshots()
+    logger.info(f"Command metrics: {command_runner.metrics()}")
+    for endpoint, stats in sorted(ApiClient.latency_stats().items()):
+        logger.info(f"API {endpoint}: {stats}")
+    if not drained:
+        # sys.exit would wait for the stuck workers to return
+        logger.warning(f"Commands still running after {COMMAND_DRAIN_TIMEOUT:.0f} seconds, exiting anyway")
+        os._exit(1)
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
@@ -1,35 +1,165 @@
 import requests
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import json
-from cachetools import TTLCache
-from src.config import API_BASE_URL
+from cachetools import LRUCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config import API_BASE_URL, API_CONNECT_TIMEOUT, API_POOL_SIZE, API_READ_TIMEOUT, API_RETRIES
 from src.models.movie import Movie
+from src.persistent_cache import SnapshotTTLCache
+
+def _create_session() -> requests.Session:
+    """
+    Create the keep-alive session shared by every ApiClient.
+    
+    Connections are pooled (up to API_POOL_SIZE kept open), so requests
+    after the first skip the TCP handshake. It is shared by all threads,
+    so it must not be changed once created. Failed connects are retried
+    for any method, since nothing was sent; GETs are also retried on read
+    errors and 502/503/504, with exponential backoff plus jitter.
+    """
+    retry = Retry(
+        total=API_RETRIES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        status_forcelist=(502, 503, 504),
+        backoff_factor=0.2,
+        backoff_jitter=0.2,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 class ApiClient:
     """Client for communicating with the Movie Club API"""
     
     # Static cache shared across all instances 
-    _users_cache = TTLCache(maxsize=100, ttl=300)  # 5 minutes TTL
+    _users_cache = SnapshotTTLCache(maxsize=100, ttl=300)  # 5 minutes TTL, saved across restarts
+    # URL -> (ETag, parsed response) for conditional GETs
+    _etag_cache = LRUCache(maxsize=256)
+    # Guards both caches above; command workers (and their event loops) use them from many threads
+    _cache_lock = threading.Lock()
+    # One connection pool for the whole process, used from every thread.
+    # Only request() is called on it after setup, and urllib3's pool is
+    # thread-safe; don't set cookies, headers or auth on it per request.
+    _session = _create_session()
+    # Endpoint -> [calls, errors, total seconds, max seconds]
+    _latency: Dict[str, List[float]] = {}
+    _latency_lock = threading.Lock()
     
     def __init__(self, base_url=None):
         self.base_url = base_url or API_BASE_URL
     
-    def get_all_movies(self) -> Dict[str, Movie]:
-        """Fetch all movies from the API"""
+    def _request(self, method: str, path: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session with connect and read
+        timeouts, counting its latency under `endpoint` (a route template
+        such as "/api/movies/{id}"; defaults to the path).
+        """
+        kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self._session.request(method, f"{self.base_url}{path}", **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self._record_latency(f"{method} {endpoint or path}", time.perf_counter() - start, failed)
+    
+    @classmethod
+    def _record_latency(cls, endpoint: str, elapsed: float, failed: bool) -> None:
+        with cls._latency_lock:
+            counters = cls._latency.setdefault(endpoint, [0, 0, 0.0, 0.0])
+            counters[0] += 1
+            counters[1] += failed
+            counters[2] += elapsed
+            counters[3] = max(counters[3], elapsed)
+    
+    @classmethod
+    def latency_stats(cls) -> Dict[str, Dict[str, float]]:
+        """Get call counts, errors and average/max latency (ms) per endpoint since startup."""
+        with cls._latency_lock:
+            return {
+                endpoint: {
+                    "calls": calls,
+                    "errors": errors,
+                    "avg_ms": round(total / calls * 1000, 1),
+                    "max_ms": round(longest * 1000, 1),
+                }
+                for endpoint, (calls, errors, total, longest) in cls._latency.items()
+            }
+    
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None,
+             parse: Callable[[Any], Any] = lambda data: data, endpoint: Optional[str] = None) -> Any:
+        """
+        GET a read endpoint, revalidating with If-None-Match.
+        
+        The parsed result is cached with the response's ETag; when the API
+        answers 304 Not Modified the cached objects are returned as-is, so
+        nothing is downloaded or deserialized again.
+        """
+        cache_key = (f"{self.base_url}{path}", tuple(sorted((params or {}).items())))
+        with self._cache_lock:
+            cached = self._etag_cache.get(cache_key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        
+        response = self._request("GET", path, endpoint, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        
+        result = parse(response.json())
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._cache_lock:
+                self._etag_cache[cache_key] = (etag, result)
+        return result
+    
+    def get_movies_page(self, limit: int = 50, cursor: Optional[str] = None, sort: str = "title",
+                        fields: Optional[List[str]] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Movie], Optional[str], int]:
+        """
+        Fetch one page of movies. Returns (movies, next_cursor, total).
+        `filters` are passed through as query parameters, e.g.
+        {"min_year": 1990, "max_year": 1999, "min_rating": 7.5}.
+        """
+        params = {"limit": limit, "sort": sort}
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
+        if filters:
+            params.update({key: value for key, value in filters.items() if value is not None})
+        
+        return self._get("/api/movies", params, self._parse_page)
+    
+    @staticmethod
+    def _parse_page(page: Dict[str, Any]) -> Tuple[List[Movie], Optional[str], int]:
+        movies = []
+        for movie_data in page.get("items", []):
+            try:
+                movies.append(Movie(movie_data))
+            except Exception as nested_e:
+                print(f"Error parsing movie {movie_data.get('id')}: {nested_e}")
+                # Continue with other movies even if one fails
+        
+        return movies, page.get("next_cursor"), page.get("total", len(movies))
+    
+    def get_all_movies(self, fields: Optional[List[str]] = None) -> Dict[str, Movie]:
+        """Fetch all movies from the API, following page cursors"""
         try:
-            response = requests.get(f"{self.base_url}/api/movies")
-            response.raise_for_status()
-            movies_dict = response.json()
-            
-            # Convert API response to Movie objects
             result = {}
-            for movie_id, movie_data in movies_dict.items():
-                try:
-                    result[movie_id] = Movie(movie_data)
-                except Exception as nested_e:
-                    print(f"Error parsing movie {movie_id}: {nested_e}")
-                    # Continue with other movies even if one fails
+            cursor = None
+            while True:
+                movies, cursor, _ = self.get_movies_page(limit=500, cursor=cursor, fields=fields)
+                for movie in movies:
+                    result[str(movie.id)] = movie
+                if not cursor:
+                    break
             
             return result
         except Exception as e:
@@ -39,10 +169,7 @@ class ApiClient:
     def get_movie(self, movie_id: int) -> Optional[Movie]:
         """Fetch a specific movie by ID"""
         try:
-            response = requests.get(f"{self.base_url}/api/movies/{movie_id}")
-            response.raise_for_status()
-            movie_data = response.json()
-            return Movie(movie_data)
+            return self._get(f"/api/movies/{movie_id}", parse=Movie, endpoint="/api/movies/{id}")
         except Exception as e:
             print(f"Error fetching movie {movie_id} from API: {e}")
             return None
@@ -50,10 +177,7 @@ class ApiClient:
     def add_movie(self, movie_data: Dict[str, Any]) -> Optional[Movie]:
         """Add a new movie to the API"""
         try:
-            response = requests.post(
-                f"{self.base_url}/api/movies", 
-                json=movie_data
-            )
+            response = self._request("POST", "/api/movies", json=movie_data)
             
             if response.status_code in (200, 201):
                 return Movie(response.json())
@@ -68,7 +192,7 @@ class ApiClient:
     def get_random_movie(self) -> Optional[Movie]:
         """Get a random movie from the API"""
         try:
-            response = requests.get(f"{self.base_url}/api/random")
+            response = self._request("GET", "/api/random")
             response.raise_for_status()
             movie_data = response.json()
             print(f"Retrieved random movie: {movie_data.get('title', 'unknown')}")
@@ -80,44 +204,117 @@ class ApiClient:
         except Exception as e:
             print(f"Error fetching random movie from API: {e}")
             return None
+    
+    def get_random_movies(self, n: int, exclude: Optional[List[int]] = None,
+                          genre_id: Optional[int] = None, weight: Optional[str] = None) -> List[Movie]:
+        """
+        Get up to n distinct random movies in a single request.
+        
+        `weight` makes the picks weighted, e.g. "popularity" or
+        "vote_average:1,members:2" (see /api/random).
+        """
+        params = {"n": n}
+        if exclude:
+            params["exclude"] = ",".join(str(movie_id) for movie_id in exclude)
+        if genre_id is not None:
+            params["genre"] = genre_id
+        if weight:
+            params["weight"] = weight
+        
+        try:
+            response = self._request("GET", "/api/random", params=params)
+            response.raise_for_status()
+            return [Movie(movie_data) for movie_data in response.json()]
+        except Exception as e:
+            print(f"Error fetching {n} random movies from API: {e}")
+            return []
             
     def get_all_genres(self) -> List[Dict]:
         """Get all available genres with counts"""
         try:
-            response = requests.get(f"{self.base_url}/api/genres")
-            response.raise_for_status()
-            return response.json()
+            return self._get("/api/genres")
         except Exception as e:
             print(f"Error fetching genres from API: {e}")
             return []
     
+    def get_similar_movies(self, movie_id: int, k: int = 5) -> List[Movie]:
+        """Get the k movies most like a movie"""
+        try:
+            return self._get(f"/api/movies/{movie_id}/similar", {"k": k},
+                             parse=lambda data: [Movie(movie_data) for movie_data in data],
+                             endpoint="/api/movies/{id}/similar")
+        except Exception as e:
+            print(f"Error fetching movies similar to {movie_id}: {e}")
+            return []
+    
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Get catalog statistics (per genre, decade and user, histograms and totals)"""
+        try:
+            return self._get("/api/stats")
+        except Exception as e:
+            print(f"Error fetching stats from API: {e}")
+            return None
+    
+    def get_user_movies(self, user_id: str) -> List[Movie]:
+        """Get the movies a user added, sorted by title"""
+        try:
+            return self._get(f"/api/users/{user_id}/movies",
+                             parse=lambda data: [Movie(movie_data) for movie_data in data],
+                             endpoint="/api/users/{id}/movies")
+        except Exception as e:
+            print(f"Error fetching movies for user {user_id}: {e}")
+            return []
+    
     def get_movie_users(self, movie_id: int) -> List[str]:
         """Get users who have added a movie with caching"""
         cache_key = f"movie_users_{movie_id}"
         
         # Check cache first
-        if cache_key in self._users_cache:
-            return self._users_cache[cache_key]
+        with self._cache_lock:
+            users = self._users_cache.get(cache_key)
+        if users is not None:
+            return users
             
         try:
-            response = requests.get(f"{self.base_url}/api/movies/{movie_id}/users")
-            response.raise_for_status()
-            users = response.json()
+            users = self._get(f"/api/movies/{movie_id}/users", endpoint="/api/movies/{id}/users")
             
             # Update cache
-            self._users_cache[cache_key] = users
+            with self._cache_lock:
+                self._users_cache[cache_key] = users
             
             return users
         except Exception as e:
             print(f"Error fetching users for movie {movie_id}: {e}")
             return []
     
+    def get_all_movie_users(self) -> Optional[Dict[int, List[str]]]:
+        """Get the users of every movie in a single request; None on error"""
+        try:
+            users_by_id = self._get("/api/movies/users")
+            return {int(movie_id): users for movie_id, users in users_by_id.items()}
+        except Exception as e:
+            print(f"Error fetching all movie users: {e}")
+            return None
+    
+    def get_changes(self, since: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the movies and movie users changed after a catalog version.
+        Returns None on error; a "reset" response means `since` is too old
+        and everything must be reloaded.
+        """
+        try:
+            response = self._request("GET", "/api/changes", params={"since": since} if since else None)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"Error fetching catalog changes from API: {e}")
+            return None
+    
     def add_user_to_movie(self, movie_id: int, user_id: str) -> bool:
         """Add a user to a movie's user list"""
         try:
-            response = requests.post(
-                f"{self.base_url}/api/movies/{movie_id}/users?user_id={user_id}"
-            )
+            response = self._request("POST", f"/api/movies/{movie_id}/users", "/api/movies/{id}/users",
+                                     params={"user_id": user_id})
             response.raise_for_status()
             return True
         except Exception as e:
@@ -0,0 +1,243 @@
+import asyncio
+import random
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.api_client import ApiClient
+from src.config import (
+    API_BASE_URL, API_CONCURRENCY, API_CONNECT_TIMEOUT, API_POOL_SIZE, API_READ_TIMEOUT, API_RETRIES,
+)
+from src.models.movie import Movie
+
+# Worth retrying for idempotent requests; connect failures are retried by the transport
+_RETRY_STATUSES = (502, 503, 504)
+_RETRY_ERRORS = (httpx.ReadError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+class AsyncApiClient:
+    """
+    Asyncio twin of ApiClient for async command handlers.
+
+    Requests go through an httpx.AsyncClient, so awaiting one lets the
+    event loop run other work, and the *_many methods fan out with
+    asyncio.gather, at most API_CONCURRENCY requests at a time. Timeouts,
+    retries, the ETag cache and the latency counters match ApiClient (and
+    the last two are shared with it).
+
+    httpx clients belong to the event loop that created them, so each loop
+    gets its own pool and semaphore, created on first use.
+    """
+
+    _pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url or API_BASE_URL
+
+    @classmethod
+    def _pool(cls) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        pool = cls._pools.get(loop)
+        if pool is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(API_READ_TIMEOUT, connect=API_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=API_POOL_SIZE, max_keepalive_connections=API_POOL_SIZE),
+                transport=httpx.AsyncHTTPTransport(retries=API_RETRIES),
+            )
+            pool = cls._pools[loop] = (client, asyncio.Semaphore(API_CONCURRENCY))
+        return pool
+
+    @classmethod
+    async def close_pool(cls) -> None:
+        """Close the running loop's connections; call before closing the loop."""
+        pool = cls._pools.pop(asyncio.get_running_loop(), None)
+        if pool:
+            await pool[0].aclose()
+
+    async def _request(self, method: str, path: str, endpoint: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request with the loop's pooled client, counting its latency
+        under `endpoint` like ApiClient._request. GETs are retried on read
+        errors and 502/503/504 with jittered exponential backoff.
+        """
+        client, semaphore = self._pool()
+        attempts = 1 + (API_RETRIES if method == "GET" else 0)
+        async with semaphore:
+            start = time.perf_counter()
+            failed = True
+            try:
+                for attempt in range(attempts):
+                    last = attempt == attempts - 1
+                    try:
+                        response = await client.request(method, f"{self.base_url}{path}", **kwargs)
+                    except _RETRY_ERRORS:
+                        if last or method != "GET":
+                            raise
+                    else:
+                        if response.status_code not in _RETRY_STATUSES or last:
+                            failed = response.status_code >= 500
+                            return response
+                    await asyncio.sleep(0.2 * 2 ** attempt + random.uniform(0, 0.2))
+            finally:
+                ApiClient._record_latency(f"{method} {endpoint or path}", time.perf_counter() - start, failed)
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None,
+                   parse: Callable[[Any], Any] = lambda data: data, endpoint: Optional[str] = None) -> Any:
+        """GET a read endpoint, revalidating with If-None-Match (see ApiClient._get)."""
+        cache_key = (f"{self.base_url}{path}", tuple(sorted((params or {}).items())))
+        with ApiClient._cache_lock:
+            cached = ApiClient._etag_cache.get(cache_key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        response = await self._request("GET", path, endpoint, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+
+        result = parse(response.json())
+        etag = response.headers.get("ETag")
+        if etag:
+            with ApiClient._cache_lock:
+                ApiClient._etag_cache[cache_key] = (etag, result)
+        return result
+
+    async def get_movies_page(self, limit: int = 50, cursor: Optional[str] = None, sort: str = "title",
+                              fields: Optional[List[str]] = None,
+                              filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Movie], Optional[str], int]:
+        """Fetch one page of movies. Returns (movies, next_cursor, total)."""
+        params = {"limit": limit, "sort": sort}
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
+        if filters:
+            params.update({key: value for key, value in filters.items() if value is not None})
+
+        return await self._get("/api/movies", params, ApiClient._parse_page)
+
+    async def get_movie(self, movie_id: int) -> Optional[Movie]:
+        """Fetch a specific movie by ID"""
+        try:
+            return await self._get(f"/api/movies/{movie_id}", parse=Movie, endpoint="/api/movies/{id}")
+        except Exception as e:
+            print(f"Error fetching movie {movie_id} from API: {e}")
+            return None
+
+    async def get_movies_many(self, movie_ids: List[int]) -> Dict[int, Movie]:
+        """Fetch many movies by ID concurrently, skipping any that fail"""
+        movies = await asyncio.gather(*(self.get_movie(movie_id) for movie_id in movie_ids))
+        return {movie_id: movie for movie_id, movie in zip(movie_ids, movies) if movie}
+
+    async def get_random_movies(self, n: int, exclude: Optional[List[int]] = None,
+                                genre_id: Optional[int] = None, weight: Optional[str] = None) -> List[Movie]:
+        """Get up to n distinct random movies in a single request (see ApiClient.get_random_movies)."""
+        params = {"n": n}
+        if exclude:
+            params["exclude"] = ",".join(str(movie_id) for movie_id in exclude)
+        if genre_id is not None:
+            params["genre"] = genre_id
+        if weight:
+            params["weight"] = weight
+
+        try:
+            response = await self._request("GET", "/api/random", params=params)
+            response.raise_for_status()
+            return [Movie(movie_data) for movie_data in response.json()]
+        except Exception as e:
+            print(f"Error fetching {n} random movies from API: {e}")
+            return []
+
+    async def get_all_genres(self) -> List[Dict]:
+        """Get all available genres with counts"""
+        try:
+            return await self._get("/api/genres")
+        except Exception as e:
+            print(f"Error fetching genres from API: {e}")
+            return []
+
+    async def get_similar_movies(self, movie_id: int, k: int = 5) -> List[Movie]:
+        """Get the k movies most like a movie"""
+        try:
+            return await self._get(f"/api/movies/{movie_id}/similar", {"k": k},
+                                   parse=lambda data: [Movie(movie_data) for movie_data in data],
+                                   endpoint="/api/movies/{id}/similar")
+        except Exception as e:
+            print(f"Error fetching movies similar to {movie_id}: {e}")
+            return []
+
+    async def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Get catalog statistics (per genre, decade and user, histograms and totals)"""
+        try:
+            return await self._get("/api/stats")
+        except Exception as e:
+            print(f"Error fetching stats from API: {e}")
+            return None
+
+    async def get_user_movies(self, user_id: str) -> List[Movie]:
+        """Get the movies a user added, sorted by title"""
+        try:
+            return await self._get(f"/api/users/{user_id}/movies",
+                                   parse=lambda data: [Movie(movie_data) for movie_data in data],
+                                   endpoint="/api/users/{id}/movies")
+        except Exception as e:
+            print(f"Error fetching movies for user {user_id}: {e}")
+            return []
+
+    async def get_movie_users(self, movie_id: int) -> List[str]:
+        """Get users who have added a movie, through ApiClient's per-movie cache"""
+        cache_key = f"movie_users_{movie_id}"
+        with ApiClient._cache_lock:
+            users = ApiClient._users_cache.get(cache_key)
+        if users is not None:
+            return users
+
+        try:
+            users = await self._get(f"/api/movies/{movie_id}/users", endpoint="/api/movies/{id}/users")
+            with ApiClient._cache_lock:
+                ApiClient._users_cache[cache_key] = users
+            return users
+        except Exception as e:
+            print(f"Error fetching users for movie {movie_id}: {e}")
+            return []
+
+    async def get_movie_users_many(self, movie_ids: List[int]) -> Dict[int, List[str]]:
+        """Get the users of many movies concurrently, one request per uncached movie"""
+        users = await asyncio.gather(*(self.get_movie_users(movie_id) for movie_id in movie_ids))
+        return dict(zip(movie_ids, users))
+
+    async def get_changes(self, since: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the movies and movie users changed after a catalog version; None on error"""
+        try:
+            response = await self._request("GET", "/api/changes", params={"since": since} if since else None)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"Error fetching catalog changes from API: {e}")
+            return None
+
+    async def add_movie(self, movie_data: Dict[str, Any]) -> Optional[Movie]:
+        """Add a new movie to the API"""
+        try:
+            response = await self._request("POST", "/api/movies", json=movie_data)
+            if response.status_code in (200, 201):
+                return Movie(response.json())
+            print(f"Failed to add movie. Status code: {response.status_code}")
+            print(f"Response: {response.text}")
+            return None
+        except Exception as e:
+            print(f"Error adding movie to API: {e}")
+            return None
+
+    async def add_user_to_movie(self, movie_id: int, user_id: str) -> bool:
+        """Add a user to a movie's user list"""
+        try:
+            response = await self._request("POST", f"/api/movies/{movie_id}/users", "/api/movies/{id}/users",
+                                           params={"user_id": user_id})
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"Error adding user {user_id} to movie {movie_id}: {e}")
+            return False
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.async_api_client import AsyncApiClient
+from src.config import COMMAND_QUEUE_SIZE, COMMAND_TIMEOUT, COMMAND_WORKERS
+
+class CommandRunner:
+    """
+    Runs slash command coroutines on a fixed pool of worker threads.
+
+    Each worker keeps one event loop for its whole life, so commands no
+    longer pay for a new thread and loop each time. The loops also keep
+    AsyncApiClient's connections warm between commands. Commands still
+    make blocking Slack and API calls, so they get a thread each rather
+    than sharing a single loop. That caps concurrency at `workers`, and at
+    most `max_queue` commands wait behind them; more are turned away.
+
+    A command is cancelled when it runs past its timeout. A command
+    blocked in a synchronous call is only cancelled once that call
+    returns; ApiClient's read timeouts bound those.
+    """
+
+    def __init__(self, workers: int = COMMAND_WORKERS, max_queue: int = COMMAND_QUEUE_SIZE,
+                 timeout: float = COMMAND_TIMEOUT):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command",
+                                            initializer=self._start_worker)
+        self._local = threading.local()
+        self._loops: List[asyncio.AbstractEventLoop] = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._accepting = True
+        self._queued = 0
+        self._in_flight = 0
+        self._counts = {"completed": 0, "failed": 0, "timed_out": 0, "rejected": 0}
+        # Command -> [runs, total seconds, max seconds], measured from submission
+        self._latency: Dict[str, List[float]] = {}
+
+    def _start_worker(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._local.loop = loop
+        with self._lock:
+            self._loops.append(loop)
+
+    def submit(self, name: str, run: Callable[[], Awaitable[Any]], timeout: Optional[float] = None,
+               on_timeout: Optional[Callable[[], Any]] = None) -> bool:
+        """
+        Queue a command. `run` creates the coroutine once a worker picks it
+        up; `on_timeout` is called (on the worker) if it is cancelled for
+        running too long. Returns False when the queue is full or the
+        runner is shutting down.
+        """
+        with self._lock:
+            if not self._accepting or self._queued >= self.max_queue:
+                self._counts["rejected"] += 1
+                return False
+            self._queued += 1
+        self._executor.submit(self._run, name, run, timeout or self.timeout, on_timeout, time.perf_counter())
+        return True
+
+    def _run(self, name: str, run: Callable[[], Awaitable[Any]], timeout: float,
+             on_timeout: Optional[Callable[[], Any]], submitted: float) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._in_flight += 1
+
+        outcome = "completed"
+        try:
+            self._local.loop.run_until_complete(asyncio.wait_for(run(), timeout))
+        except asyncio.TimeoutError:
+            outcome = "timed_out"
+            print(f"Command /{name} timed out after {timeout:g} seconds")
+            if on_timeout:
+                try:
+                    on_timeout()
+                except Exception as e:
+                    print(f"Error reporting timeout of /{name}: {e}")
+        except Exception as e:
+            outcome = "failed"
+            print(f"Error running command /{name}: {e}")
+        finally:
+            elapsed = time.perf_counter() - submitted
+            with self._lock:
+                self._in_flight -= 1
+                self._counts[outcome] += 1
+                latency = self._latency.setdefault(name, [0, 0.0, 0.0])
+                latency[0] += 1
+                latency[1] += elapsed
+                latency[2] = max(latency[2], elapsed)
+                if not self._queued and not self._in_flight:
+                    self._idle.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get queue depth, commands in flight, outcome counts and per-command latency (ms)."""
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+                **self._counts,
+                "commands": {
+                    name: {"runs": runs, "avg_ms": round(total / runs * 1000, 1), "max_ms": round(longest * 1000, 1)}
+                    for name, (runs, total, longest) in self._latency.items()
+                },
+            }
+
+    def shutdown(self, timeout: float) -> bool:
+        """
+        Stop taking commands and wait up to `timeout` seconds for queued
+        and running ones to finish. Returns whether everything finished.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._accepting = False
+            while self._queued or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._idle.wait(remaining)
+            drained = not self._queued and not self._in_flight
+
+        self._executor.shutdown(wait=drained, cancel_futures=True)
+        if drained:
+            # Workers are idle now, so their loops can be closed from here
+            loops, self._loops = self._loops, []
+            for loop in loops:
+                loop.run_until_complete(AsyncApiClient.close_pool())
+                loop.close()
+        return drained
+
+# Shared by every slash command handler
+command_runner = CommandRunner()
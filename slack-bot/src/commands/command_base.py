@@ -4,6 +4,9 @@ from typing import Any, Callable, Dict, List, Optional, Set
 class SlackCommand(ABC):
     """Base class for all Slack commands."""
     
+    # Seconds execute() may run before it is cancelled; None uses COMMAND_TIMEOUT
+    timeout: Optional[float] = None
+    
     def __init__(self, name: str, description: str, examples: List[str] = None):
         self.name = name
         self.description = description
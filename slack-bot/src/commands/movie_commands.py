@@ -1,16 +1,26 @@
 from typing import Any, Callable, Dict, List, Optional
 
 from src.api_client import ApiClient
+from src.async_api_client import AsyncApiClient
 from src.commands.command_base import SlackCommand, register_command
 from src.handlers.cache_management import get_all_movie_users, get_cached_movies
 from src.handlers.pagination import handle_pagination
 
+# /pickmovie keywords for weighted polls -> API weight specification
+PICK_WEIGHTS = {
+    "popular": "popularity",
+    "rated": "vote_average",
+    "members": "members",
+}
+
 class MovieCommand(SlackCommand):
     """Base class for movie-related commands."""
     
     def __init__(self, name: str, description: str, examples: List[str] = None):
         super().__init__(name, description, examples)
         self.api_client = ApiClient()
+        # For awaiting API calls inside execute() without blocking the loop
+        self.async_api_client = AsyncApiClient()
     
     def get_movies(self):
         """Get cached movies."""
@@ -76,11 +86,8 @@ class RandomMovieCommand(MovieCommand):
     
     async def execute(self, ack: Callable, respond: Callable, command: Dict[str, Any], **kwargs) -> None:
         """Execute the command to get a random movie."""
-        import time
-        
         # Acknowledge command request
         ack()
-        start_time = time.time()
         
         # Get the Slack app client
         app_client = kwargs.get("app_client")
@@ -88,30 +95,40 @@ class RandomMovieCommand(MovieCommand):
             respond("Error: Slack client not available")
             return
         
+        self.show_random_movie(respond, app_client)
+    
+    def show_random_movie(self, respond: Callable, app_client, genre_id: Optional[int] = None) -> None:
+        """Respond with a random movie (optionally from one genre) and a genre picker."""
+        import time
+        start_time = time.time()
+        
         # Get a random movie
-        movie = self.api_client.get_random_movie()
+        if genre_id is None:
+            movie = self.api_client.get_random_movie()
+        else:
+            movies = self.api_client.get_random_movies(1, genre_id=genre_id)
+            movie = movies[0] if movies else None
         
         if not movie:
-            respond("No movies found in the database.")
+            respond("No movies found in the database." if genre_id is None else "No movies found in that genre.")
             return
         
-        # Get pre-fetched user data or create it for this single movie
-        from src.handlers.cache_management import movie_users_cache
-        
-        if movie.id and movie.id in movie_users_cache:
-            users_by_movie = movie_users_cache
-        else:
-            # For a single movie, we can fetch just its users
-            users_by_movie = {}
-            if movie.id:
-                user_ids = self.api_client.get_movie_users(movie.id)
-                if user_ids:
-                    from src.handlers.cache_management import get_user_names
-                    user_names = get_user_names(app_client, user_ids)
-                    users_by_movie[movie.id] = user_names
+        # User names come from the locally mirrored movie users
+        users_by_movie = get_all_movie_users([movie], app_client, self.api_client)
         
         from src.handlers.pagination import format_movie_detail
-        blocks = format_movie_detail(movie, app_client, users_by_movie)
+        blocks = format_movie_detail(movie, app_client, users_by_movie, self.api_client)
+        # Typeahead over genres for another pick (see the options handler in slack_bot)
+        blocks.append({
+            "type": "actions",
+            "block_id": "random_genre",
+            "elements": [{
+                "type": "external_select",
+                "action_id": "random_genre_select",
+                "placeholder": {"type": "plain_text", "text": "Another random pick from genre…"},
+                "min_query_length": 0
+            }]
+        })
         respond({"blocks": blocks})
         
         end_time = time.time()
@@ -172,7 +189,10 @@ class PickMovieCommand(MovieCommand):
             description="Creates a poll with random movies for users to vote on",
             examples=[
                 "/pickmovie",
-                "/pickmovie 5"  # Specify number of movies
+                "/pickmovie 5",  # Specify number of movies
+                "/pickmovie 4 popular",  # Favor popular movies
+                "/pickmovie rated",  # Favor highly rated movies; also: members
+                "/pickmovie choose"  # Pick the candidates by title
             ]
         )
     
@@ -187,115 +207,268 @@ class PickMovieCommand(MovieCommand):
             respond("Error: Slack client not available")
             return
             
-        # Parse command text for number of movies
-        command_text = command.get("text", "").strip()
-        try:
-            num_movies = int(command_text) if command_text else 3  # Default to 3 movies
-            # Set reasonable limits
-            num_movies = max(2, min(num_movies, 8))  # Between 2 and 8 movies
-        except ValueError:
-            num_movies = 3  # Default if parsing fails
-        
-        # Import our pool function and random
-        from src.handlers.cache_management import get_random_movie_pool
-        import random
+        # Parse command text for number of movies and an optional weighting
+        num_movies = 3  # Default to 3 movies
+        weight = None
+        for word in command.get("text", "").lower().split():
+            if word == "choose":
+                respond({"blocks": build_candidate_picker_blocks()})
+                return
+            if word in PICK_WEIGHTS:
+                weight = PICK_WEIGHTS[word]
+                continue
+            try:
+                # Set reasonable limits
+                num_movies = max(2, min(int(word), 8))  # Between 2 and 8 movies
+            except ValueError:
+                pass  # Keep the default if parsing fails
         
-        # Get pool of random movies (much faster than individual API calls)
-        movie_pool = get_random_movie_pool(self.api_client)
+        # The API samples distinct movies for us in a single request
+        movies = await self.async_api_client.get_random_movies(num_movies, weight=weight)
         
-        if not movie_pool or len(movie_pool) < num_movies:
+        if len(movies) < num_movies:
             respond("Could not retrieve enough movies to create a poll.")
             return
         
-        # Shuffle and select the requested number of movies
-        random.shuffle(movie_pool)
-        movies = movie_pool[:num_movies]
-            
-        # Create poll message blocks
+        post_movie_poll(app_client, command["channel_id"], movies, respond)
+
+def build_candidate_picker_blocks() -> List[Dict[str, Any]]:
+    """Blocks that let a user pick poll candidates by title (see the options handler in slack_bot)."""
+    return [
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": "Pick 2 to 8 movies for the poll:"}
+        },
+        {
+            "type": "actions",
+            "block_id": "poll_candidates",
+            "elements": [
+                {
+                    "type": "multi_external_select",
+                    "action_id": "movie_title_select",
+                    "placeholder": {"type": "plain_text", "text": "Start typing a title…"},
+                    "min_query_length": 1,
+                    "max_selected_items": 8
+                },
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "Create poll", "emoji": True},
+                    "style": "primary",
+                    "action_id": "create_manual_poll"
+                }
+            ]
+        }
+    ]
+
+def build_poll_blocks(movies) -> List[Dict[str, Any]]:
+    """Build the blocks of a movie poll message."""
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"Movie Poll: Vote for our next movie! 🍿",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "Click a button below to vote for which movie we should watch next. *Click again to remove your vote.*"
+            }
+        },
+        {"type": "divider"}
+    ]
+    
+    # Create movie info sections
+    for i, movie in enumerate(movies):
+        # Add movie details section
+        release_year = movie.release_date[:4] if hasattr(movie, 'release_date') and movie.release_date else 'N/A'
+        rating = f"{movie.vote_average:.1f}" if hasattr(movie, 'vote_average') else 'N/A'
+        
+        movie_text = (
+            f"*{i+1}. {movie.title}* ({release_year})\n"
+            f"Rating: {rating}/10\n"
+            f"<https://www.themoviedb.org/movie/{movie.id}|View on TMDB>"
+        )
+        
+        movie_block = {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": movie_text
+            }
+        }
+        
+        # Add movie poster if available
+        if hasattr(movie, 'get_poster_url'):
+            poster_url = movie.get_poster_url("w92")
+            if poster_url:
+                movie_block["accessory"] = {
+                    "type": "image",
+                    "image_url": poster_url,
+                    "alt_text": movie.title
+                }
+        
+        blocks.append(movie_block)
+    
+    # Add voting buttons
+    actions_block = {
+        "type": "actions",
+        "block_id": "movie_poll_votes",
+        "elements": []
+    }
+    
+    for i, movie in enumerate(movies):
+        actions_block["elements"].append({
+            "type": "button",
+            "text": {
+                "type": "plain_text",
+                "text": f"Vote #{i+1}",
+                "emoji": True
+            },
+            "value": f"vote_{movie.id}",
+            "action_id": f"vote_movie_{movie.id}"
+        })
+    
+    blocks.append({"type": "divider"})
+    blocks.append(actions_block)
+    return blocks
+
+def post_movie_poll(app_client, channel_id: str, movies, respond: Callable) -> None:
+    """Post a poll for the given movies to a channel."""
+    try:
+        result = app_client.chat_postMessage(
+            channel=channel_id,
+            blocks=build_poll_blocks(movies),
+            text="Vote for the next movie to watch!"
+        )
+        print(f"Posted movie poll: {result.get('ts')}")
+    except Exception as e:
+        respond(f"Error creating poll: {str(e)}")
+        print(f"Error creating poll: {e}")
+
+@register_command
+class MyMoviesCommand(MovieCommand):
+    """Command to list the movies the calling user added."""
+    
+    def __init__(self):
+        super().__init__(
+            name="mymovies",
+            description="List the movies you've added",
+            examples=["/mymovies"]
+        )
+    
+    async def execute(self, ack: Callable, respond: Callable, command: Dict[str, Any], **kwargs) -> None:
+        """Execute the command to list the user's movies."""
+        # Acknowledge command request
+        ack()
+        
+        movies = await self.async_api_client.get_user_movies(command["user_id"])
+        if not movies:
+            respond("You haven't added any movies yet. Share a movie link in the channel to add one.")
+            return
+        
         blocks = [
             {
                 "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"Movie Poll: Vote for our next movie! 🍿",
-                    "emoji": True
-                }
+                "text": {"type": "plain_text", "text": "Your Movies", "emoji": True}
             },
             {
                 "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "Click a button below to vote for which movie we should watch next. *Click again to remove your vote.*"
-                }
-            },
-            {"type": "divider"}
+                "text": {"type": "mrkdwn", "text": f"*You've added {len(movies)} movie{'s' if len(movies) != 1 else ''}*"}
+            }
         ]
         
-        # Create movie info sections
-        for i, movie in enumerate(movies):
-            # Add movie details section
-            release_year = movie.release_date[:4] if hasattr(movie, 'release_date') and movie.release_date else 'N/A'
-            rating = f"{movie.vote_average:.1f}" if hasattr(movie, 'vote_average') else 'N/A'
-            
-            movie_text = (
-                f"*{i+1}. {movie.title}* ({release_year})\n"
-                f"Rating: {rating}/10\n"
-                f"<https://www.themoviedb.org/movie/{movie.id}|View on TMDB>"
-            )
-            
-            movie_block = {
+        # Section text is limited to 3000 characters, so split long lists
+        movie_text = ""
+        for movie in movies:
+            release_year = movie.release_date[:4] if movie.release_date else "N/A"
+            line = f"• <https://www.themoviedb.org/movie/{movie.id}|{movie.title}> ({release_year})\n"
+            if len(movie_text) + len(line) > 2900:
+                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": movie_text}})
+                movie_text = ""
+            movie_text += line
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": movie_text}})
+        
+        # Messages are limited to 50 blocks
+        respond({"blocks": blocks[:50]})
+
+@register_command
+class StatsCommand(MovieCommand):
+    """Command to show catalog statistics."""
+    
+    def __init__(self):
+        super().__init__(
+            name="stats",
+            description="Show movie club statistics",
+            examples=["/stats"]
+        )
+    
+    async def execute(self, ack: Callable, respond: Callable, command: Dict[str, Any], **kwargs) -> None:
+        """Execute the command to show statistics."""
+        # Acknowledge command request
+        ack()
+        
+        # The API keeps these as running aggregates, so this is one small request
+        stats = await self.async_api_client.get_stats()
+        if not stats:
+            respond("Could not fetch statistics right now.")
+            return
+        
+        hours = stats.get("total_runtime", 0) // 60
+        average_rating = stats.get("average_rating")
+        blocks = [
+            {
+                "type": "header",
+                "text": {"type": "plain_text", "text": "Movie Club Stats", "emoji": True}
+            },
+            {
                 "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": movie_text
-                }
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Movies:*\n{stats.get('movies', 0)}"},
+                    {"type": "mrkdwn", "text": f"*Total runtime:*\n{hours:,} hours ({hours / 24:.1f} days)"},
+                    {"type": "mrkdwn", "text": f"*Average rating:*\n{average_rating if average_rating is not None else 'N/A'}/10"},
+                    {"type": "mrkdwn", "text": f"*Contributors:*\n{len(stats.get('users', {}))}"}
+                ]
             }
-            
-            # Add movie poster if available
-            if hasattr(movie, 'get_poster_url'):
-                poster_url = movie.get_poster_url("w92")
-                if poster_url:
-                    movie_block["accessory"] = {
-                        "type": "image",
-                        "image_url": poster_url,
-                        "alt_text": movie.title
-                    }
-            
-            blocks.append(movie_block)
+        ]
         
-        # Add voting buttons
-        actions_block = {
-            "type": "actions",
-            "block_id": "movie_poll_votes",
-            "elements": []
-        }
+        contributors = "\n".join(
+            f"{i + 1}. <@{entry['user_id']}>: {entry['count']} movie{'s' if entry['count'] != 1 else ''}"
+            for i, entry in enumerate(stats.get("top_contributors", [])[:5])
+        )
+        if contributors:
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*Top contributors*\n{contributors}"}})
         
-        for i, movie in enumerate(movies):
-            actions_block["elements"].append({
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"Vote #{i+1}",
-                    "emoji": True
-                },
-                "value": f"vote_{movie.id}",
-                "action_id": f"vote_movie_{movie.id}"
-            })
+        genres = ", ".join(f"{genre['name']} ({genre['count']})" for genre in stats.get("genres", [])[:8])
+        if genres:
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*Top genres*\n{genres}"}})
         
-        blocks.append({"type": "divider"})
-        blocks.append(actions_block)
+        decades = ", ".join(f"{entry['decade']}s ({entry['count']})" for entry in stats.get("decades", []))
+        if decades:
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*By decade*\n{decades}"}})
         
-        # Post the poll
-        try:
-            result = app_client.chat_postMessage(
-                channel=command["channel_id"],
-                blocks=blocks,
-                text="Vote for the next movie to watch!"
-            )
-            print(f"Posted movie poll: {result.get('ts')}")
-        except Exception as e:
-            respond(f"Error creating poll: {str(e)}")
-            print(f"Error creating poll: {e}")
+        histogram = stats.get("rating_histogram", [])
+        if histogram:
+            blocks.append({
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*Ratings*\n{self._format_histogram(histogram)}"}
+            })
+        
+        respond({"blocks": blocks})
+    
+    @staticmethod
+    def _format_histogram(histogram: List[Dict[str, Any]], width: int = 20) -> str:
+        """Render histogram bins as a monospace bar chart."""
+        largest = max(entry["count"] for entry in histogram) or 1
+        lines = []
+        for entry in histogram:
+            label = f"{entry['min']:g}+" if entry["max"] is None else f"{entry['min']:g}-{entry['max']:g}"
+            bar = "█" * round(entry["count"] / largest * width)
+            lines.append(f"{label:>6} {bar} {entry['count']}")
+        return "```" + "\n".join(lines) + "```"
 
 @register_command
 class GenresCommand(MovieCommand):
@@ -315,7 +488,7 @@ class GenresCommand(MovieCommand):
         
         try:
             # Get all genres from the API
-            response = self.api_client.get_all_genres()
+            response = await self.async_api_client.get_all_genres()
             
             if not response or len(response) == 0:
                 respond("No genres found in the database.")
@@ -19,6 +19,17 @@ SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID")  # Channel to monitor
 # API Configuration
 # In Docker Compose environment, use the service name as the host
 API_BASE_URL = os.getenv("API_BASE_URL", "http://movie-api:8000")
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))  # Keep-alive connections shared by all ApiClients
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))  # Seconds
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "10"))  # Seconds
+API_RETRIES = int(os.getenv("API_RETRIES", "2"))  # Retries for GETs and failed connects, with jittered backoff
+API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", "8"))  # Requests one AsyncApiClient fan-out runs at once
+
+# Slash command execution
+COMMAND_WORKERS = int(os.getenv("COMMAND_WORKERS", "16"))  # Commands run at once, each worker with its own event loop
+COMMAND_QUEUE_SIZE = int(os.getenv("COMMAND_QUEUE_SIZE", "100"))  # Commands waiting beyond this are turned away
+COMMAND_TIMEOUT = float(os.getenv("COMMAND_TIMEOUT", "60"))  # Seconds, unless a command sets its own
+COMMAND_DRAIN_TIMEOUT = float(os.getenv("COMMAND_DRAIN_TIMEOUT", "8"))  # Seconds to finish commands on SIGTERM
 
 # Application Configuration
 DEBUG = True
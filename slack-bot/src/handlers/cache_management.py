@@ -1,19 +1,32 @@
 import time
 import os
+import threading
 from functools import wraps
-from cachetools import TTLCache
+from typing import Dict, List, Optional
+from src.api_client import ApiClient
+from src.models.movie import Movie
+from src.persistent_cache import CacheSnapshotStore, SnapshotTTLCache
 
-# Cache for user information to reduce API calls - TTL 24 hours
-user_cache = TTLCache(maxsize=1000, ttl=86400)
+# User ID -> {"display_name", "real_name"}, preloaded from users.list - TTL 24 hours
+user_cache = SnapshotTTLCache(maxsize=20000, ttl=86400)
+# TTLCache isn't thread-safe and commands run on several workers
+user_cache_lock = threading.Lock()
 
-# Cache for movie data - TTL 2 minutes
-movie_cache = TTLCache(maxsize=100, ttl=120)
-
-# Cache for movie users data - TTL 5 minutes
-movie_users_cache = TTLCache(maxsize=100, ttl=300)
+# Seconds between change-feed polls of the catalog mirror
+MIRROR_SYNC_INTERVAL = float(os.getenv("MIRROR_SYNC_INTERVAL", "5"))
 
 # Cache for random movie pool - TTL 30 minutes
-random_movie_pool_cache = TTLCache(maxsize=1, ttl=1800)
+random_movie_pool_cache = SnapshotTTLCache(maxsize=1, ttl=1800)
+
+# SQLite file the caches above and the catalog mirror are saved to, so a
+# restart starts warm; empty disables it. It lives in its own directory:
+# data/ is shared with the API, which treats any change there as new movies
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", "data/bot/bot_cache.db")
+# Seconds between snapshots; they are also saved on shutdown
+CACHE_SNAPSHOT_INTERVAL = float(os.getenv("CACHE_SNAPSHOT_INTERVAL", "60"))
+
+# Fields needed to render movie lists and polls; full details are fetched per movie
+LIST_FIELDS = ["id", "title", "release_date", "vote_average", "poster_path"]
 
 def ttl_cached(cache_obj, key_func=None):
     """
@@ -42,81 +55,272 @@ def ttl_cached(cache_obj, key_func=None):
         return wrapper
     return decorator
 
-# Helper to generate user cache key based on user_id
-def _user_key(client, user_ids):
-    if isinstance(user_ids, list):
-        return ','.join(sorted(user_ids))
-    return str(user_ids)
+class CatalogMirror:
+    """
+    Local copy of the API's movies and movie users, kept fresh with deltas.
+    
+    The first sync loads everything. Later syncs fetch only what changed
+    since the last seen catalog version from /api/changes, which is
+    usually an empty response. If the API can no longer serve that delta
+    (restart, or the change log moved past our version) it reloads
+    everything again. Syncs run at most every `sync_interval` seconds.
+    """
+    
+    def __init__(self, sync_interval: float = MIRROR_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self.movies: Dict[int, Movie] = {}
+        self.movie_users: Dict[int, List[str]] = {}
+        self.version: Optional[str] = None
+        self._movie_list: Optional[List[Movie]] = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+    
+    def sync(self, api_client, force: bool = False) -> None:
+        """Bring the mirror up to date, unless it was synced very recently."""
+        with self._lock:
+            if not force and self.version is not None and time.monotonic() - self._synced_at < self.sync_interval:
+                return
+            
+            changes = api_client.get_changes(self.version)
+            if changes is None:
+                return  # Keep serving what we have; retry on the next call
+            
+            if changes["reset"]:
+                self._reload(api_client, changes["version"])
+            else:
+                self._apply(changes)
+            self._synced_at = time.monotonic()
+    
+    def get_movies(self) -> List[Movie]:
+        """Get the mirrored movies; the same list is returned until something changes."""
+        with self._lock:
+            if self._movie_list is None:
+                self._movie_list = list(self.movies.values())
+            return self._movie_list
+    
+    def snapshot(self) -> Dict:
+        """Get the mirror's contents as JSON-serializable data."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "movies": [movie.to_dict() for movie in self.movies.values()],
+                "movie_users": {str(movie_id): users for movie_id, users in self.movie_users.items()},
+            }
+    
+    def restore(self, data: Dict) -> None:
+        """
+        Load a snapshot. The next sync asks for the changes since its
+        version, so a recent snapshot only needs a small delta.
+        """
+        with self._lock:
+            self.movies = {movie.id: movie for movie in map(Movie, data["movies"])}
+            self.movie_users = {int(movie_id): users for movie_id, users in data["movie_users"].items()}
+            self.version = data["version"]
+            self._movie_list = None
+            self._synced_at = 0.0
+    
+    def _reload(self, api_client, version: str) -> None:
+        # Fetched after reading the version, so anything that changes in
+        # between is applied (again, harmlessly) by the next delta
+        start_time = time.time()
+        movies = api_client.get_all_movies(fields=LIST_FIELDS)
+        self.movies = {movie.id: movie for movie in movies.values()}
+        movie_users = api_client.get_all_movie_users()
+        if movie_users is not None:
+            self.movie_users = movie_users
+        self._movie_list = None
+        # Deltas only name new users, so a missing users map (like an empty
+        # movie list, which may be an API error) means a full load next time
+        self.version = version if movies and movie_users is not None else None
+        print(f"Reloaded catalog mirror with {len(self.movies)} movies in {time.time() - start_time:.2f} seconds")
+    
+    def _apply(self, changes) -> None:
+        for movie_data in changes["movies"]:
+            # The feed sends full records; keep only what _reload fetches so every mirrored movie looks the same
+            movie = Movie({field: movie_data[field] for field in LIST_FIELDS if field in movie_data})
+            self.movies[movie.id] = movie
+        for movie_id in changes["removed"]:
+            self.movies.pop(movie_id, None)
+        for movie_id, user_ids in changes["movie_users"].items():
+            users = self.movie_users.setdefault(int(movie_id), [])
+            users.extend(user_id for user_id in user_ids if user_id not in users)
+        
+        if changes["movies"] or changes["removed"]:
+            self._movie_list = None
+        if changes["movies"] or changes["removed"] or changes["movie_users"]:
+            print(f"Applied catalog changes up to {changes['version']}: {len(changes['movies'])} movies, "
+                  f"{len(changes['removed'])} removed, {len(changes['movie_users'])} movies with new users")
+        self.version = changes["version"]
 
-# Helper to generate movie users cache key
-def _movie_users_key(movies, client, api_client):
-    # Use the first few movie IDs as the key
-    movie_ids = sorted([str(movie.id) for movie in movies if movie.id])[:5]
-    return ','.join(movie_ids)
+# Shared by every command and handler in the bot process
+catalog_mirror = CatalogMirror()
 
-@ttl_cached(user_cache, key_func=_user_key)
-def get_user_names(client, user_ids):
-    """Convert user IDs to display names with caching."""
-    user_names = []
+_snapshot_store: Optional[CacheSnapshotStore] = None
+# Catalog version in the last saved mirror snapshot
+_saved_mirror_version: Optional[str] = None
+
+def _get_snapshot_store() -> Optional[CacheSnapshotStore]:
+    global _snapshot_store
+    if _snapshot_store is None and CACHE_SNAPSHOT_PATH:
+        _snapshot_store = CacheSnapshotStore(CACHE_SNAPSHOT_PATH)
+    return _snapshot_store
+
+def save_cache_snapshots():
+    """Save the caches and the catalog mirror (when it changed) to CACHE_SNAPSHOT_PATH."""
+    global _saved_mirror_version
+    try:
+        store = _get_snapshot_store()
+        if store is None:
+            return
+        with user_cache_lock:
+            store.save("user_names", user_cache.dump())
+        store.save("random_movie_pool",
+                   random_movie_pool_cache.dump(lambda movies: [movie.to_dict() for movie in movies]))
+        with ApiClient._cache_lock:
+            movie_users = ApiClient._users_cache.dump()
+        store.save("movie_users", movie_users)
+        if catalog_mirror.version and catalog_mirror.version != _saved_mirror_version:
+            mirror = catalog_mirror.snapshot()
+            store.save("catalog_mirror", mirror)
+            _saved_mirror_version = mirror["version"]
+    except Exception as e:
+        print(f"Error saving cache snapshots: {e}")
+
+def restore_cache_snapshots():
+    """Reload the caches and the catalog mirror saved by a previous run."""
+    global _saved_mirror_version
+    start = time.time()
+    try:
+        store = _get_snapshot_store()
+        if store is None:
+            return
+        with user_cache_lock:
+            users = user_cache.restore(store.load("user_names") or [])
+        pools = random_movie_pool_cache.restore(store.load("random_movie_pool") or [],
+                                                lambda movies: [Movie(movie_data) for movie_data in movies])
+        with ApiClient._cache_lock:
+            movie_users = ApiClient._users_cache.restore(store.load("movie_users") or [])
+        mirror = store.load("catalog_mirror")
+        if mirror:
+            catalog_mirror.restore(mirror)
+            _saved_mirror_version = mirror["version"]
+        print(f"Restored {users} user names, {pools} movie pools, {movie_users} movie user lists and "
+              f"{len(catalog_mirror.movies)} mirrored movies in {time.time() - start:.2f} seconds")
+    except Exception as e:
+        print(f"Error restoring cache snapshots: {e}")
+
+def start_cache_snapshots():
+    """Save the caches every CACHE_SNAPSHOT_INTERVAL seconds in a background thread."""
+    def run():
+        while True:
+            time.sleep(CACHE_SNAPSHOT_INTERVAL)
+            save_cache_snapshots()
     
-    for user_id in user_ids:
-        try:
-            # This function will only be called on cache miss
-            if os.getenv("DEBUG_SLACK_API"):
-                print(f"Cache miss for user {user_id}, fetching from Slack API")
-                
-            user_info = client.users_info(user=user_id)
-
-            # Debug the response if needed
-            if os.getenv("DEBUG_SLACK_API"):
-                print(f"User info for {user_id}: {user_info.data}")
-
-            # Try different fields in order of preference
-            user_data = user_info.get("user", {})
-            profile = user_data.get("profile", {})
-
-            # Try several name options in order of preference
-            display_name = profile.get("display_name_normalized") or profile.get(
-                "display_name"
-            )
-            if not display_name or display_name == "":
-                display_name = user_data.get("real_name") or profile.get("real_name")
-            if not display_name or display_name == "":
-                display_name = user_data.get("name")  # Fallback to username
-
-            # If still nothing, use a better formatted fallback
-            if not display_name or display_name == "":
-                display_name = f"@{user_id.replace('U', '')}"
-            
-            user_names.append(display_name)
+    if CACHE_SNAPSHOT_PATH:
+        threading.Thread(target=run, daemon=True).start()
+
+def _user_names(user_data):
+    """Pick the names shown for a Slack user object."""
+    user_id = user_data.get("id", "")
+    profile = user_data.get("profile", {})
+
+    # Try several name options in order of preference
+    display_name = profile.get("display_name_normalized") or profile.get("display_name")
+    if not display_name:
+        display_name = user_data.get("real_name") or profile.get("real_name")
+    if not display_name:
+        display_name = user_data.get("name")  # Fallback to username
+    if not display_name:
+        # If still nothing, use a better formatted fallback
+        display_name = f"@{user_id.replace('U', '')}"
 
-        except Exception as e:
-            print(f"Error getting user info for {user_id}: {str(e)}")
-            # Use a more friendly fallback
-            user_names.append("@unknown-user")
+    return {
+        "display_name": display_name,
+        # Poll votes are shown with the real name
+        "real_name": user_data.get("real_name") or user_data.get("name") or f"<@{user_id}>",
+    }
 
+def update_user(user_data):
+    """Cache the names of a Slack user object (from users.list, users.info or a user_change event)."""
+    if not user_data.get("id"):
+        return
+    names = _user_names(user_data)
+    with user_cache_lock:
+        user_cache[user_data["id"]] = names
+
+def load_user_directory(client):
+    """
+    Fill the user cache from users.list, a page of up to 200 users per
+    call, so later name lookups rarely need a users.info request.
+    """
+    start = time.time()
+    count = 0
+    cursor = None
+    try:
+        while True:
+            response = client.users_list(limit=200, cursor=cursor)
+            for user_data in response.get("members", []):
+                update_user(user_data)
+                count += 1
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+    except Exception as e:
+        print(f"Error loading the user directory: {e}")
+    print(f"Cached names of {count} users in {time.time() - start:.2f} seconds")
+    return count
+
+def _get_user(client, user_id):
+    """Get a user's cached names, calling users.info on a miss."""
+    with user_cache_lock:
+        names = user_cache.get(user_id)
+    if names is not None:
+        return names
+
+    try:
+        if os.getenv("DEBUG_SLACK_API"):
+            print(f"Cache miss for user {user_id}, fetching from Slack API")
+        user_info = client.users_info(user=user_id)
+        if os.getenv("DEBUG_SLACK_API"):
+            print(f"User info for {user_id}: {user_info.data}")
+        user_data = user_info.get("user", {})
+        update_user(user_data)
+        return _user_names(user_data)
+    except Exception as e:
+        print(f"Error getting user info for {user_id}: {str(e)}")
+        return None
+
+def get_user_names(client, user_ids):
+    """Convert user IDs to display names, in the same order, from the per-user cache."""
+    user_names = []
+    for user_id in user_ids:
+        names = _get_user(client, user_id)
+        # Use a more friendly fallback
+        user_names.append(names["display_name"] if names else "@unknown-user")
     return user_names
 
-@ttl_cached(movie_users_cache, key_func=_movie_users_key)
+def get_user_real_name(client, user_id):
+    """Get the name a user's poll votes are shown with."""
+    names = _get_user(client, user_id)
+    return names["real_name"] if names else f"<@{user_id}>"
+
 def get_all_movie_users(movies, client, api_client):
-    """Get all users for a list of movies with efficient caching."""
-    print("Prefetching all movie users data...")
+    """Get the user names for a list of movies from the catalog mirror."""
     fetch_start = time.time()
     
     result = {}
     all_user_ids = set()
     movie_user_map = {}
     
-    # First, collect all user IDs for all movies in one pass
+    # User IDs come from the local mirror, kept current by the change feed
+    catalog_mirror.sync(api_client)
     for movie in movies:
-        if movie.id:
-            user_ids = api_client.get_movie_users(movie.id)
-            if user_ids:
-                movie_user_map[movie.id] = user_ids
-                all_user_ids.update(user_ids)
+        user_ids = catalog_mirror.movie_users.get(movie.id) if movie.id else None
+        if user_ids:
+            movie_user_map[movie.id] = list(user_ids)
+            all_user_ids.update(user_ids)
     
     fetch_api_time = time.time()
-    print(f"API fetching took {fetch_api_time - fetch_start:.2f} seconds")
     
     # Now get user names for all users at once
     all_user_names = {}
@@ -134,12 +338,10 @@ def get_all_movie_users(movies, client, api_client):
     print(f"Total user data prefetch took {time.time() - fetch_start:.2f} seconds")
     return result
 
-@ttl_cached(movie_cache)
 def get_cached_movies(api_client):
-    """Get all movies from the API with caching."""
-    # This function will only be called on cache miss
-    movies_dict = api_client.get_all_movies()
-    return list(movies_dict.values())
+    """Get all movies from the local catalog mirror, synced with the API's change feed."""
+    catalog_mirror.sync(api_client)
+    return catalog_mirror.get_movies()
 
 def get_random_movie_pool(api_client, min_pool_size=20):
     """
@@ -170,24 +372,11 @@ def get_random_movie_pool(api_client, min_pool_size=20):
     except Exception as e:
         print(f"Error building pool from all movies: {e}")
     
-    # Option 2: Fallback to fetching individual random movies
-    movies = []
-    ids_seen = set()
-    max_attempts = min_pool_size * 2
-    attempts = 0
-    
-    while len(movies) < min_pool_size and attempts < max_attempts:
-        attempts += 1
-        try:
-            movie = api_client.get_random_movie()
-            if movie and movie.id not in ids_seen:
-                movies.append(movie)
-                ids_seen.add(movie.id)
-        except Exception as e:
-            print(f"Error fetching random movie: {e}")
+    # Option 2: Fall back to sampling on the API side in one request
+    movies = api_client.get_random_movies(50)
     
     if movies:
         random_movie_pool_cache["movie_pool"] = movies
-        print(f"Built random movie pool with {len(movies)} movies via API calls")
+        print(f"Built random movie pool with {len(movies)} movies via the API")
     
     return movies
@@ -5,8 +5,8 @@ def format_movie_list(movies, client=None, page=1, page_size=25, users_by_movie=
     if not movies:
         return "No movies found in the database."
 
-    # Sort movies alphabetically
-    movies.sort(key=lambda x: x.title)
+    # Sort a copy alphabetically; the list may be the catalog mirror's shared one
+    movies = sorted(movies, key=lambda x: x.title)
     
     # Calculate total pages
     total_pages = (len(movies) + page_size - 1) // page_size
@@ -35,8 +35,11 @@ def format_movie_list(movies, client=None, page=1, page_size=25, users_by_movie=
 
     return "\n".join(movie_lines)
 
-def format_movie_detail(movie, client=None, users_by_movie=None):
-    """Format a single movie for detailed slack display."""
+def format_movie_detail(movie, client=None, users_by_movie=None, api_client=None):
+    """
+    Format a single movie for detailed slack display. When users_by_movie
+    has no entry for it, its users are looked up with api_client.
+    """
     blocks = [
         {
             "type": "header",
@@ -87,7 +90,7 @@ def format_movie_detail(movie, client=None, users_by_movie=None):
         from src.handlers.cache_management import get_user_names
         from src.api_client import ApiClient
         
-        api_client = ApiClient()
+        api_client = api_client or ApiClient()
         user_ids = api_client.get_movie_users(movie.id)
         if user_ids:
             user_names = get_user_names(client, user_ids)
@@ -138,6 +141,49 @@ def format_movie_detail(movie, client=None, users_by_movie=None):
         }
     )
 
+    if movie.id:
+        blocks.append(
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "More like this", "emoji": True},
+                        "value": str(movie.id),
+                        "action_id": "movie_more_like_this",
+                    }
+                ],
+            }
+        )
+
+    return blocks
+
+def format_similar_movies(movies):
+    """Format a "more like this" list, each with a button to keep exploring."""
+    blocks = [
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": "*More like this:*"},
+        }
+    ]
+    for movie in movies:
+        year = movie.release_date[:4] if movie.release_date else "N/A"
+        genres = f" · {', '.join(movie.genres)}" if movie.genres else ""
+        blocks.append(
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"<https://www.themoviedb.org/movie/{movie.id}|*{movie.title}*> ({year}) - {movie.vote_average}/10{genres}",
+                },
+                "accessory": {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "More like this", "emoji": True},
+                    "value": str(movie.id),
+                    "action_id": "movie_more_like_this",
+                },
+            }
+        )
     return blocks
 
 def handle_pagination(page, respond, app_client, get_all_movies_func, get_all_movie_users_func):
@@ -0,0 +1,158 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Dict, List, Optional
+
+from src.handlers.cache_management import MIRROR_SYNC_INTERVAL, get_cached_movies
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+def normalize_title(text):
+    """Casefold, strip accents and collapse punctuation to single spaces."""
+    text = (text or "").casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", text).strip()
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleIndex:
+    """
+    Typeahead index over movie titles.
+
+    Every title word is kept in one sorted (word, movie ID) list, so the
+    movies with a word starting with a prefix are a single bisect range.
+    A query matches when each of its words is a prefix of some title word.
+    If that finds too few movies, a trigram index fills in fuzzy matches,
+    which tolerates typos and matches in the middle of words.
+    """
+
+    def __init__(self, movies):
+        self.movies = {movie.id: movie for movie in movies if movie.id is not None}
+        self._titles: Dict[int, str] = {
+            movie_id: normalize_title(movie.title) for movie_id, movie in self.movies.items()
+        }
+
+        entries = sorted(
+            (word, movie_id) for movie_id, title in self._titles.items() for word in set(title.split())
+        )
+        self._words = [word for word, _ in entries]
+        self._word_ids = array("q", (movie_id for _, movie_id in entries))
+
+        self._trigram_ids: Dict[str, array] = {}
+        for movie_id, title in self._titles.items():
+            for trigram in _trigrams(title):
+                self._trigram_ids.setdefault(trigram, array("q")).append(movie_id)
+
+        # Shown before anything is typed
+        self._alphabetical = sorted(self._titles, key=lambda movie_id: self._titles[movie_id])
+
+    def __len__(self):
+        return len(self.movies)
+
+    def search(self, query, limit=20):
+        """Get up to `limit` movies matching a partially typed title, best first."""
+        query = normalize_title(query)
+        if not query:
+            return [self.movies[movie_id] for movie_id in self._alphabetical[:limit]]
+
+        words = query.split()
+        # Start from the word with the fewest matches, then check the others
+        ranges = sorted((self._prefix_range(word) for word in words), key=lambda r: r[1] - r[0])
+        low, high = ranges[0]
+        candidates = set(self._word_ids[low:high])
+        if len(words) > 1:
+            candidates = {
+                movie_id for movie_id in candidates
+                if all(any(title_word.startswith(word) for title_word in self._titles[movie_id].split())
+                       for word in words)
+            }
+
+        ranked = heapq.nsmallest(limit, candidates, key=lambda movie_id: (
+            not self._titles[movie_id].startswith(query), len(self._titles[movie_id]), self._titles[movie_id]
+        ))
+        if len(ranked) < limit and len(query) >= 3:
+            ranked.extend(self._fuzzy(query, limit - len(ranked), set(ranked)))
+        return [self.movies[movie_id] for movie_id in ranked]
+
+    def _prefix_range(self, prefix):
+        low = bisect.bisect_left(self._words, prefix)
+        high = bisect.bisect_left(self._words, prefix + "\uffff", low)
+        return low, high
+
+    def _fuzzy(self, query, limit, skip, threshold=0.3):
+        """Rank titles by trigram (Jaccard) similarity to the query."""
+        query_trigrams = _trigrams(query)
+        shared: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            for movie_id in self._trigram_ids.get(trigram, ()):
+                shared[movie_id] = shared.get(movie_id, 0) + 1
+
+        scored = []
+        for movie_id, count in shared.items():
+            if movie_id in skip:
+                continue
+            title_size = len(self._titles[movie_id]) + 1  # Trigrams in a padded title
+            similarity = count / (len(query_trigrams) + title_size - count)
+            if similarity >= threshold:
+                scored.append((similarity, movie_id))
+        return [movie_id for _, movie_id in heapq.nlargest(limit, scored)]
+
+_index: Optional[TitleIndex] = None
+_index_source = None
+_index_built_at = 0.0
+_rebuild_lock = threading.Lock()
+_rebuilding = False
+
+def _rebuild(api_client):
+    global _index, _index_source, _index_built_at, _rebuilding
+    try:
+        movies = get_cached_movies(api_client)
+        # get_cached_movies returns the same list until the mirror changes
+        if movies is not _index_source:
+            start = time.perf_counter()
+            index = TitleIndex(movies)
+            _index, _index_source = index, movies
+            print(f"Built title index for {len(index)} movies in {time.perf_counter() - start:.2f} seconds")
+        _index_built_at = time.monotonic()
+    finally:
+        _rebuilding = False
+
+def get_title_index(api_client):
+    """
+    Get the title index, rebuilding it when the cached catalog changes.
+
+    Only the very first call blocks on building the index. Once the
+    mirror's sync interval has passed, the current index is still returned
+    and a background thread syncs and (if needed) rebuilds it, so typeahead
+    requests never wait on the API.
+    """
+    global _rebuilding
+    if _index is None:
+        with _rebuild_lock:
+            if _index is None:
+                _rebuild(api_client)
+        return _index
+
+    if time.monotonic() - _index_built_at >= MIRROR_SYNC_INTERVAL:
+        with _rebuild_lock:
+            if not _rebuilding:
+                _rebuilding = True
+                threading.Thread(target=_rebuild, args=(api_client,), daemon=True).start()
+    return _index
+
+def movie_option(movie):
+    """Format a movie as a Slack select option."""
+    year = movie.release_date[:4] if movie.release_date else "N/A"
+    # Option text is limited to 75 characters
+    label = f"{movie.title} ({year})"
+    if len(label) > 75:
+        label = f"{movie.title[:75 - len(year) - 4]}… ({year})"
+    return {"text": {"type": "plain_text", "text": label}, "value": str(movie.id)}
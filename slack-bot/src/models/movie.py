@@ -47,6 +47,10 @@ class Movie:
             self.genres = []
             self.runtime = None
     
+    def to_dict(self):
+        """Get the movie's fields as a dict that Movie() accepts again (genres as names)."""
+        return dict(vars(self))
+    
     def get_poster_url(self, size="w500"):
         """Generate the full URL for the movie poster."""
         if self.poster_path:
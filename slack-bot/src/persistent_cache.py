@@ -0,0 +1,91 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+class SnapshotTTLCache(TTLCache):
+    """
+    TTLCache whose entries can be saved and restored along with their
+    expiry times, so a restart doesn't make them live longer (or shorter).
+    """
+
+    def __init__(self, maxsize, ttl):
+        # While restoring, the clock is pinned so an entry expires when it originally would have
+        self._pinned: Optional[float] = None
+        self._expires = {}
+        super().__init__(maxsize, ttl, timer=self._now)
+
+    def _now(self) -> float:
+        return time.monotonic() if self._pinned is None else self._pinned
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._expires[key] = self._now() + self.ttl
+
+    def dump(self, encode: Callable[[Any], Any] = lambda value: value) -> List[Tuple[Any, Any, float]]:
+        """Get (key, encoded value, expiry as a Unix time) for every live entry."""
+        offset = time.time() - time.monotonic()
+        entries = []
+        for key in list(self):
+            expires = self._expires.get(key)
+            value = self.get(key)
+            if expires is not None and value is not None:
+                entries.append((key, encode(value), expires + offset))
+        # Drop expiry times of entries the cache has evicted since
+        self._expires = {key: self._expires[key] for key, _, _ in entries}
+        return entries
+
+    def restore(self, entries, decode: Callable[[Any], Any] = lambda value: value) -> int:
+        """
+        Add entries from dump() that haven't expired yet. Returns how many
+        were added. Meant for a fresh cache: TTLCache expects entries in
+        expiry order, so they are added soonest-expiring first.
+        """
+        now = time.time()
+        live = sorted((entry for entry in entries if entry[2] > now), key=lambda entry: entry[2])
+        try:
+            for key, value, expires in live:
+                # Never longer than a fresh entry, in case the wall clock went back
+                remaining = min(expires - now, self.ttl)
+                self._pinned = time.monotonic() + remaining - self.ttl
+                self[key] = decode(value)
+        finally:
+            self._pinned = None
+        return len(live)
+
+class CacheSnapshotStore:
+    """
+    Named JSON snapshots in a small SQLite database.
+
+    Each save replaces one snapshot in its own transaction, so a crash
+    mid-save leaves the previous snapshot intact.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots (name TEXT PRIMARY KEY, saved_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def save(self, name: str, data: Any) -> None:
+        payload = json.dumps(data, separators=(",", ":"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (name, saved_at, data) VALUES (?, ?, ?)",
+                (name, time.time(), payload),
+            )
+
+    def load(self, name: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM snapshots WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
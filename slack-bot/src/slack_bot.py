@@ -1,3 +1,4 @@
+import asyncio
 import os
 import importlib
 import inspect
@@ -6,12 +7,18 @@ from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from src.config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN, SLACK_CHANNEL_ID, BOT_ENVIRONMENT, ENV_PREFIX
 from src.api_client import ApiClient
+from src.async_api_client import AsyncApiClient
+from src.command_runner import command_runner
 from src.models.movie import Movie
 from src.handlers.message_handlers import handle_message_event, initialize as init_message_handlers
-from src.handlers.cache_management import get_cached_movies, get_all_movie_users
-from src.handlers.pagination import handle_pagination
+from src.handlers.cache_management import (
+    get_cached_movies, get_all_movie_users, get_user_real_name, load_user_directory, update_user,
+    restore_cache_snapshots, start_cache_snapshots,
+)
+from src.handlers.pagination import handle_pagination, format_similar_movies
 from src.commands.command_base import SlackCommand, registry
 from src.handlers.command_handlers import handle_next_page, handle_prev_page
+from src.handlers.title_index import get_title_index, movie_option
 
 # Import all command modules to register commands
 from src.commands import movie_commands
@@ -19,8 +26,9 @@ from src.commands import movie_commands
 # Initialize Slack Bolt app
 app = App(token=SLACK_BOT_TOKEN)
 
-# Initialize API client
+# Initialize API clients
 api_client = ApiClient()
+async_api_client = AsyncApiClient()
 
 # Register all commands with Slack
 for command_name, command_obj in registry.get_all_commands().items():
@@ -57,30 +65,21 @@ for command_name, command_obj in registry.get_all_commands().items():
                     text_or_blocks["text"] = f"{ENV_PREFIX}{text_or_blocks['text']}"
                 return original_respond(text_or_blocks, **kwargs)
             
-            # Execute the command asynchronously using a thread-safe approach
-            import asyncio
+            # Run the command on the shared worker pool
+            def run_command():
+                return cmd.execute(
+                    ack=lambda: None,  # We already acked
+                    respond=prefixed_respond,
+                    command=command,
+                    app_client=app.client
+                )
             
-            def run_async_command():
-                # Create a new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    # Run the command in the new loop with prefixed respond
-                    loop.run_until_complete(
-                        cmd.execute(
-                            ack=lambda: None,  # We already acked
-                            respond=prefixed_respond,
-                            command=command,
-                            app_client=app.client
-                        )
-                    )
-                finally:
-                    loop.close()
+            def report_timeout():
+                prefixed_respond(f"⚠️ /{cmd.name} took too long and was stopped. Please try again.")
             
-            # Run in a separate thread to avoid blocking
-            import threading
-            thread = threading.Thread(target=run_async_command)
-            thread.start()
+            if not command_runner.submit(cmd.name, run_command, cmd.timeout, report_timeout):
+                logger.warning(f"Command /{cmd.name} rejected - runner busy: {command_runner.metrics()}")
+                prefixed_respond("⚠️ The bot is busy right now. Please try again in a moment.")
         
         return command_handler
     
@@ -89,6 +88,12 @@ for command_name, command_obj in registry.get_all_commands().items():
     app.command(f"/{command_name}")(handler)
     print(f"Registered handler for /{command_name}")
 
+@app.event("user_change")
+@app.event("team_join")
+def handle_user_change(event):
+    """Keep cached user names current when someone edits their profile or joins."""
+    update_user(event.get("user", {}))
+
 @app.event("message")
 def handle_message_events(event, client):
     """Handle message events in the specified channel."""
@@ -168,12 +173,7 @@ def handle_movie_vote(ack, body, client):
     # Get user info
     user_id = body["user"]["id"]
     
-    try:
-        # Get user name
-        user_info = client.users_info(user=user_id)
-        user_name = user_info["user"]["real_name"] or user_info["user"]["name"]
-    except:
-        user_name = f"<@{user_id}>"
+    user_name = get_user_real_name(client, user_id)
     
     # Update the message to show vote
     blocks = body["message"]["blocks"]
@@ -247,6 +247,105 @@ def handle_movie_vote(ack, body, client):
     except Exception as e:
         print(f"Error updating poll vote: {e}")
 
+@app.action("movie_more_like_this")
+def more_like_this(ack, body, respond):
+    """Show the movies most like the one whose button was clicked."""
+    ack()
+    
+    # Check if action was triggered in the configured channel
+    action_channel = body.get("channel", {}).get("id")
+    if action_channel != SLACK_CHANNEL_ID:
+        respond({"text": "⚠️ This action is only available in the designated movie channel.", "replace_original": False})
+        return
+    
+    movie_id = int(body["actions"][0]["value"])
+    movies = api_client.get_similar_movies(movie_id, 5)
+    if not movies:
+        respond({"text": "No similar movies found.", "replace_original": False})
+        return
+    
+    respond({"blocks": format_similar_movies(movies), "replace_original": False})
+
+# Typeahead options for the movie pickers; Slack drops the request after 3 seconds
+@app.options("movie_title_select")
+def movie_title_options(ack, payload):
+    """Suggest movies whose titles match what the user has typed so far."""
+    import time
+    start_time = time.perf_counter()
+    movies = get_title_index(api_client).search(payload.get("value", ""), limit=20)
+    ack(options=[movie_option(movie) for movie in movies])
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    if elapsed_ms > 500:
+        print(f"Warning: title typeahead for {payload.get('value', '')!r} took {elapsed_ms:.0f} ms")
+
+@app.options("random_genre_select")
+def random_genre_options(ack, payload):
+    """Suggest genres whose names contain what the user has typed so far."""
+    query = payload.get("value", "").casefold()
+    genres = sorted(api_client.get_all_genres(), key=lambda genre: genre["name"])
+    ack(options=[
+        {"text": {"type": "plain_text", "text": f"{genre['name']} ({genre['count']})"}, "value": str(genre["id"])}
+        for genre in genres if query in genre["name"].casefold()
+    ][:100])  # Slack shows at most 100 options
+
+@app.action("random_genre_select")
+def random_from_genre(ack, body, respond):
+    """Show another random movie from the picked genre."""
+    ack()
+    
+    # Check if action was triggered in the configured channel
+    action_channel = body.get("channel", {}).get("id")
+    if action_channel != SLACK_CHANNEL_ID:
+        respond({"text": "⚠️ This action is only available in the designated movie channel.", "replace_original": False})
+        return
+    
+    genre_id = int(body["actions"][0]["selected_option"]["value"])
+    registry.get_command("random").show_random_movie(respond, app.client, genre_id=genre_id)
+
+@app.action("movie_title_select")
+def select_poll_candidate(ack):
+    """Selections are read from the message state when the poll is created."""
+    ack()
+
+@app.action("create_manual_poll")
+def create_manual_poll(ack, body, respond):
+    """Post a poll for the movies picked with the title typeahead."""
+    ack()
+    
+    # Check if action was triggered in the configured channel
+    action_channel = body.get("channel", {}).get("id")
+    if action_channel != SLACK_CHANNEL_ID:
+        respond({"text": "⚠️ This action is only available in the designated movie channel.", "replace_original": False})
+        return
+    
+    selected = (
+        body.get("state", {}).get("values", {})
+        .get("poll_candidates", {}).get("movie_title_select", {})
+        .get("selected_options") or []
+    )
+    if len(selected) < 2:
+        respond({"text": "Pick at least 2 movies for the poll.", "replace_original": False})
+        return
+    
+    index = get_title_index(api_client)
+    movie_ids = [int(option["value"]) for option in selected]
+    missing = [movie_id for movie_id in movie_ids if movie_id not in index.movies]
+    fetched = asyncio.run(fetch_movies(missing)) if missing else {}
+    movies = [movie for movie_id in movie_ids if (movie := index.movies.get(movie_id) or fetched.get(movie_id))]
+    if len(movies) < 2:
+        respond({"text": "Could not retrieve enough movies to create a poll.", "replace_original": False})
+        return
+    
+    movie_commands.post_movie_poll(app.client, action_channel, movies, respond)
+    respond({"text": f"Created a poll with {len(movies)} movies.", "replace_original": True})
+
+async def fetch_movies(movie_ids):
+    """Fetch movies the title index doesn't have yet, all at once."""
+    try:
+        return await async_api_client.get_movies_many(movie_ids)
+    finally:
+        await AsyncApiClient.close_pool()
+
 def start_slack_bot():
     """Start the Slack bot in Socket Mode."""
     # Check if required env variables are set
@@ -258,6 +357,16 @@ def start_slack_bot():
     # Initialize message handlers (loads processed URLs)
     init_message_handlers()
 
+    # Start from the caches saved by the last run, then keep saving them
+    restore_cache_snapshots()
+    start_cache_snapshots()
+
+    # Build the title typeahead index in the background so the first keystroke is fast
+    import threading
+    threading.Thread(target=get_title_index, args=(api_client,), daemon=True).start()
+    # Likewise load every user's name so "Added by" lines don't wait on users.info
+    threading.Thread(target=load_user_directory, args=(app.client,), daemon=True).start()
+
     # Log available commands
     print(f"Bot running in {BOT_ENVIRONMENT.upper()} environment")
     print("Registered commands:")
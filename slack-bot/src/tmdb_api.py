@@ -16,8 +16,11 @@ def save_to_json(data, filename="sample_movie_data.json"):
         filename = re.sub(r'[\\/*?:"<>|]', "", filename)
     
     filepath = os.path.join("data", filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
+    # Write to a temp file and rename so the API never reads a half-written file
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
     
     print(f"Data saved to {filepath}")
     return filepath
@@ -0,0 +1,58 @@
+from src.handlers.cache_management import CatalogMirror
+from src.models.movie import Movie
+
+class FakeApi:
+    def __init__(self, movies, movie_users, changes):
+        self.movies = movies
+        self.movie_users = movie_users
+        self.changes = changes
+
+    def get_changes(self, since=None):
+        return self.changes.pop(0)
+
+    def get_all_movies(self, fields=None):
+        return {movie["id"]: Movie({key: movie[key] for key in fields if key in movie}) for movie in self.movies}
+
+    def get_all_movie_users(self):
+        return self.movie_users
+
+def _reset(version):
+    return {"version": version, "reset": True, "movies": [], "removed": [], "movie_users": {}}
+
+def test_failed_users_load_forces_another_full_load():
+    api = FakeApi([{"id": 1, "title": "One"}], None, [_reset("e-1"), _reset("e-1")])
+    mirror = CatalogMirror(sync_interval=0)
+
+    mirror.sync(api)
+    assert mirror.version is None
+    assert mirror.movie_users == {}
+
+    api.movie_users = {1: ["U1"]}
+    mirror.sync(api)
+    assert mirror.version == "e-1"
+    assert mirror.movie_users == {1: ["U1"]}
+
+def test_failed_users_reload_keeps_previous_users():
+    api = FakeApi([{"id": 1, "title": "One"}], {1: ["U1"]}, [_reset("e-1"), _reset("f-1")])
+    mirror = CatalogMirror(sync_interval=0)
+    mirror.sync(api)
+
+    api.movie_users = None
+    mirror.sync(api)
+
+    assert mirror.movie_users == {1: ["U1"]}
+    assert mirror.version is None
+
+def test_deltas_are_stored_like_reloads():
+    delta = {"version": "e-2", "reset": False, "removed": [], "movie_users": {"1": ["U2"]},
+             "movies": [{"id": 2, "title": "Two", "overview": "Long text", "vote_average": 7.0}]}
+    api = FakeApi([{"id": 1, "title": "One"}], {1: ["U1"]}, [_reset("e-1"), delta])
+    mirror = CatalogMirror(sync_interval=0)
+    mirror.sync(api)
+    mirror.sync(api)
+
+    assert mirror.version == "e-2"
+    assert mirror.movie_users == {1: ["U1", "U2"]}
+    # Only LIST_FIELDS are kept, as in a reload
+    assert mirror.movies[2].overview == mirror.movies[1].overview == ""
+    assert mirror.movies[2].vote_average == 7.0
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.command_runner import CommandRunner
+
+@pytest.fixture
+def runners():
+    created = []
+
+    def create(**kwargs):
+        runner = CommandRunner(**{"workers": 2, "max_queue": 10, "timeout": 5, **kwargs})
+        created.append(runner)
+        return runner
+
+    yield create
+    for runner in created:
+        runner.shutdown(timeout=5)
+
+def _blocking_command(started: threading.Event, release: threading.Event):
+    async def run():
+        started.set()
+        # Commands make blocking Slack and API calls, which hold their worker
+        release.wait(5)
+    return run
+
+def test_queue_is_bounded(runners):
+    runner = runners(workers=1, max_queue=2)
+    started, release = threading.Event(), threading.Event()
+
+    assert runner.submit("slow", _blocking_command(started, release))
+    assert started.wait(5)
+    assert runner.submit("queued", _blocking_command(threading.Event(), release))
+    assert runner.submit("queued", _blocking_command(threading.Event(), release))
+    assert not runner.submit("rejected", _blocking_command(threading.Event(), release))
+
+    metrics = runner.metrics()
+    assert (metrics["in_flight"], metrics["queued"], metrics["rejected"]) == (1, 2, 1)
+
+    release.set()
+    assert runner.shutdown(timeout=5)
+    metrics = runner.metrics()
+    assert (metrics["in_flight"], metrics["queued"], metrics["completed"]) == (0, 0, 3)
+    assert metrics["commands"]["queued"]["runs"] == 2
+
+def test_workers_reuse_their_event_loop(runners):
+    runner = runners(workers=2, max_queue=20)
+    seen = []
+    lock = threading.Lock()
+
+    async def command():
+        await asyncio.sleep(0.001)
+        with lock:
+            seen.append((threading.get_ident(), asyncio.get_running_loop()))
+
+    for _ in range(20):
+        assert runner.submit("ping", command)
+    assert runner.shutdown(timeout=5)
+
+    assert len(seen) == 20
+    loops_by_thread = {}
+    for thread_id, loop in seen:
+        loops_by_thread.setdefault(thread_id, set()).add(loop)
+    assert len(loops_by_thread) <= 2
+    # One loop per worker, kept for every command it ran
+    assert all(len(loops) == 1 for loops in loops_by_thread.values())
+    assert len({loop for _, loop in seen}) == len(loops_by_thread)
+    assert all(loop.is_closed() for _, loop in seen)
+
+def test_timeout_cancels_the_command(runners):
+    runner = runners(workers=1)
+    cancelled, reported = threading.Event(), threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    assert runner.submit("slow", slow, timeout=0.05, on_timeout=reported.set)
+    assert runner.shutdown(timeout=5)
+
+    assert cancelled.is_set() and reported.is_set()
+    assert runner.metrics()["timed_out"] == 1
+
+def test_failures_are_counted_and_the_worker_keeps_going(runners):
+    runner = runners(workers=1)
+    done = threading.Event()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def succeed():
+        done.set()
+
+    assert runner.submit("fail", fail)
+    assert runner.submit("succeed", succeed)
+    assert runner.shutdown(timeout=5)
+
+    assert done.is_set()
+    metrics = runner.metrics()
+    assert (metrics["failed"], metrics["completed"]) == (1, 1)
+
+def test_shutdown_stops_taking_commands(runners):
+    runner = runners(workers=1)
+    started, release = threading.Event(), threading.Event()
+    assert runner.submit("slow", _blocking_command(started, release))
+    assert started.wait(5)
+
+    # Still running when the drain timeout passes
+    assert not runner.shutdown(timeout=0.05)
+    assert not runner.submit("late", _blocking_command(threading.Event(), release))
+    assert runner.metrics()["rejected"] == 1
+    release.set()